@@ -2,6 +2,10 @@
 ASGI config for connect project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Set ASYNC_VIEWS=True when serving through it so login, signup and password
+changes hash passwords off the event loop, and the catalog and profile reads
+use the async ORM instead of a thread each (see users.async_views and
+services.async_views).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
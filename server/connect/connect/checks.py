@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error
+
+
+def shared_cache_errors(alias, purpose, id_prefix):
+    """
+    System check messages for a cache whose version counters must reach
+    every worker. Outside DEBUG the cache URL must be set explicitly
+    (settings.UNCONFIGURED_CACHES), and a local-memory backend only sees
+    invalidations made by its own process, which is an error with more
+    than one worker (WEB_CONCURRENCY).
+    """
+    if alias in settings.UNCONFIGURED_CACHES:
+        return [Error(
+            f"CACHES['{alias}'] has no URL configured and DEBUG is off.",
+            hint=(
+                f"Set {settings.UNCONFIGURED_CACHES[alias]} to Redis or Memcached, "
+                "or to locmemcache:// to run a single worker on local memory."
+            ),
+            id=f"{id_prefix}.E002",
+        )]
+    if settings.WEB_CONCURRENCY <= 1 or not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Error(
+        f"CACHES['{alias}'] is process-local but WEB_CONCURRENCY is {settings.WEB_CONCURRENCY}: "
+        f"{purpose} would only be invalidated in the worker that made the change.",
+        hint=f"Point CACHES['{alias}'] at Redis or Memcached; local memory is for development only.",
+        id=f"{id_prefix}.E001",
+    )]
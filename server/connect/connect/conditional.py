@@ -0,0 +1,93 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .streaming import requested_stream_format
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the values that determine a response body.
+    """
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def _timestamp(value):
+    return timegm(value.utctimetuple()) if value else None
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(_timestamp(last_modified))
+    return response
+
+
+def _conditional_state(view, request, state):
+    last_modified, *parts = state
+    # JSON and NDJSON bodies of one URL are told apart by Accept alone.
+    etag = make_etag(
+        view.__name__, last_modified, *parts, request.META.get("QUERY_STRING", ""),
+        requested_stream_format(request) or "",
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=_timestamp(last_modified)
+    )
+    return etag, last_modified, response
+
+
+def _finish(response, etag, last_modified, vary):
+    if response.status_code not in (200, 304):
+        return response
+    set_validators(response, etag, last_modified)
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
+
+
+def conditional_view(validator, vary=()):
+    """
+    Answer ``If-None-Match``/``If-Modified-Since`` with a 304 before the
+    view serializes anything.
+
+    ``validator(request, *args, **kwargs)`` must be cheap (an aggregate or a
+    single-column lookup) and return ``(last_modified, *parts)`` describing
+    the current state of the data, or ``None`` to skip conditional handling.
+    ``last_modified`` is sent as Last-Modified and answers
+    ``If-Modified-Since``, so it must only move forward: aggregates over
+    rows that can be deleted pass ``None`` and keep their timestamps in
+    ``parts``, which revalidates them on the ETag alone.
+    Place the decorator below ``@api_view`` so it runs after authentication.
+    Async views take an async validator.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapped(request, *args, **kwargs):
+                state = await validator(request, *args, **kwargs)
+                if state is None:
+                    return await view(request, *args, **kwargs)
+
+                etag, last_modified, response = _conditional_state(view, request, state)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag, last_modified, vary)
+            return async_wrapped
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            state = validator(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+
+            etag, last_modified, response = _conditional_state(view, request, state)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(response, etag, last_modified, vary)
+        return wrapped
+    return decorator
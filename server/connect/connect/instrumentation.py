@@ -0,0 +1,214 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Metrics of the request being handled, or None when it isn't sampled.
+# Context variables follow sync_to_async into its threads, so queries run
+# by async views are attributed to the right request.
+current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "serialize_time", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+
+# =====================================================
+# 🔽 SQL AND SERIALIZER HOOKS
+# =====================================================
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def _add_query_hook(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializing():
+    """
+    Count the time spent in the block (including any queries it runs) as
+    serializer time. Nested blocks count once.
+    """
+    metrics = current_metrics.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def timed_serialization(fget):
+    """
+    ``serializing`` for a serializer's ``data`` property.
+    """
+    @functools.wraps(fget)
+    def data(self):
+        with serializing():
+            return fget(self)
+    return data
+
+
+def time_rendering(response):
+    """
+    Count rendering a ``SimpleTemplateResponse`` (DRF's ``Response``, about
+    to be rendered by its renderer) as serializer time.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return response
+    start = time.perf_counter()
+
+    def rendered(response):
+        metrics.serialize_time += time.perf_counter() - start
+
+    response.add_post_render_callback(rendered)
+    return response
+
+
+_installed = False
+
+
+def install():
+    """
+    Hook every database connection, current and future. Idempotent; called
+    when the middleware is loaded. Serializer time comes from rendering
+    (``time_rendering``) and from the code that opts in with ``serializing``
+    or ``timed_serialization``; DRF's classes are left alone.
+    """
+    global _installed
+    if _installed:
+        return
+    connection_created.connect(_add_query_hook, dispatch_uid="connect.instrumentation")
+    for connection in connections.all(initialized_only=True):
+        _add_query_hook(connection)
+    _installed = True
+
+
+# =====================================================
+# 🔽 HISTOGRAMS
+# =====================================================
+class Histogram:
+    """
+    Prometheus-style cumulative histogram, one series per label tuple.
+    """
+
+    def __init__(self, name, help_text, buckets, labels=("route", "method")):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(counts), total, n) for key, (counts, total, n) in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, n) in sorted(self.snapshot().items()):
+            labels = ",".join(
+                f'{label}="{_escape(value)}"' for label, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {n}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {n}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HISTOGRAMS = {
+    "duration": Histogram(
+        "connect_request_duration_seconds", "Time from middleware entry to response.", SECONDS
+    ),
+    "view": Histogram(
+        "connect_request_view_seconds", "Time spent in the view, including rendering.", SECONDS
+    ),
+    "db": Histogram(
+        "connect_request_db_seconds", "Time spent executing SQL.", SECONDS
+    ),
+    "serialize": Histogram(
+        "connect_request_serialize_seconds", "Time spent serializing and rendering the response.", SECONDS
+    ),
+    "queries": Histogram(
+        "connect_request_queries", "SQL statements per request.", (0, 1, 2, 3, 5, 10, 20, 50, 100)
+    ),
+    "size": Histogram(
+        "connect_response_size_bytes", "Response body size (buffered responses only).",
+        (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+    ),
+}
+
+
+def observe(route, method, durations, metrics, size):
+    key = (route, method)
+    HISTOGRAMS["duration"].observe(key, durations["total"])
+    HISTOGRAMS["view"].observe(key, durations["view"])
+    HISTOGRAMS["db"].observe(key, metrics.db_time)
+    HISTOGRAMS["serialize"].observe(key, metrics.serialize_time)
+    HISTOGRAMS["queries"].observe(key, metrics.queries)
+    if size is not None:
+        HISTOGRAMS["size"].observe(key, size)
+
+
+def exposition():
+    return "\n".join(histogram.exposition() for histogram in HISTOGRAMS.values()) + "\n"
+
+
+def server_timing(durations, metrics):
+    return ", ".join((
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f"serialize;dur={metrics.serialize_time * 1000:.1f}",
+        f"view;dur={durations['view'] * 1000:.1f}",
+        f"total;dur={durations['total'] * 1000:.1f}",
+    ))
@@ -0,0 +1,97 @@
+import hmac
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+
+from . import instrumentation
+
+
+def is_internal(request):
+    """
+    Whether the request carries ``METRICS_TOKEN`` in an ``X-Metrics-Token``
+    header. The peer address is no use here: behind a reverse proxy every
+    client arrives from the proxy. Without a configured token nothing is
+    internal.
+    """
+    token = settings.METRICS_TOKEN
+    supplied = request.META.get("HTTP_X_METRICS_TOKEN", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def pool_stats():
+    """
+    Connection pool statistics for each database alias that has a pool,
+    as seen by this worker process. psycopg counts only non-zero values.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            continue
+        raw = pool.get_stats()
+        requests = raw.get("requests_num", 0)
+        stats[alias] = {
+            "min_size": raw.get("pool_min", 0),
+            "max_size": raw.get("pool_max", 0),
+            "size": raw.get("pool_size", 0),
+            "available": raw.get("pool_available", 0),
+            "in_use": raw.get("pool_size", 0) - raw.get("pool_available", 0),
+            "waiting": raw.get("requests_waiting", 0),
+            "checkouts": requests,
+            "checkouts_queued": raw.get("requests_queued", 0),
+            "checkout_errors": raw.get("requests_errors", 0),
+            "avg_checkout_wait_ms": round(raw.get("requests_wait_ms", 0) / requests, 3) if requests else 0.0,
+            "connections_opened": raw.get("connections_num", 0),
+            "avg_connect_ms": (
+                round(raw.get("connections_ms", 0) / raw["connections_num"], 3)
+                if raw.get("connections_num") else 0.0
+            ),
+            "connections_lost": raw.get("connections_lost", 0),
+            "returns_bad": raw.get("returns_bad", 0),
+        }
+    return stats
+
+
+# =====================================================
+# 🔽 DATABASE POOL METRICS (internal)
+# =====================================================
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def DatabasePoolMetrics(request):
+    # Only answered with the metrics token; everyone else sees a plain 404.
+    if not is_internal(request):
+        return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"pools": pool_stats()}, status=status.HTTP_200_OK)
+
+
+# =====================================================
+# 🔽 PROMETHEUS METRICS (internal)
+# =====================================================
+def pool_exposition():
+    pools = pool_stats()
+    lines = []
+    for name, key, help_text in (
+        ("connect_db_pool_connections_in_use", "in_use", "Pooled connections checked out."),
+        ("connect_db_pool_connections_available", "available", "Idle pooled connections."),
+        ("connect_db_pool_requests_waiting", "waiting", "Clients waiting for a connection."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{alias="{alias}"}} {stats[key]}' for alias, stats in pools.items()]
+    return "\n".join(lines) + "\n"
+
+
+@require_GET
+def PrometheusMetrics(request):
+    # Per-process values: scrape every worker, or run one worker per target.
+    if not is_internal(request):
+        raise Http404
+    return HttpResponse(
+        instrumentation.exposition() + pool_exposition(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,165 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import instrumentation
+from .metrics import is_internal
+from .routers import RoutingState, routing_state
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PrimaryPinningMiddleware:
+    """
+    Decide per request whether ``connect.routers.ReplicaRouter`` may read
+    from a replica, and give read-your-writes to clients that just wrote.
+
+    Unsafe methods, and safe ones carrying the ``REPLICA_PIN_COOKIE`` cookie,
+    read from the primary. When a request writes, the response sets that
+    cookie for ``REPLICA_PIN_SECONDS`` so the client's next reads don't hit
+    a replica that hasn't caught up yet. Does nothing without replicas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        pinned = settings.REPLICA_PIN_COOKIE in request.COOKIES
+        state = RoutingState(use_primary=pinned or request.method not in SAFE_METHODS)
+        return state, routing_state.set(state)
+
+    def finish(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Record SQL count and time, serializer time, view time and response size
+    for a ``PERF_SAMPLE_RATE`` fraction of requests. Sampled internal
+    requests (``connect.metrics.is_internal``) get a ``Server-Timing``
+    header, and every sample feeds the per-route histograms in
+    ``connect.instrumentation`` (served by
+    ``connect.metrics.PrometheusMetrics``). Routes are the URL names, or
+    the route pattern for unnamed URLs. Serializer time is the rendering
+    of DRF responses plus whatever the code marks with
+    ``instrumentation.serializing``. Keep it first in MIDDLEWARE so the
+    total covers the whole chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        instrumentation.install()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs hooks in the handler's mode and wraps the others in
+            # sync_to_async, a thread hop per request under ASGI.
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        metrics, token, start = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        metrics, token, start = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.current_metrics.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started(request)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.view_started(request)
+
+    def process_template_response(self, request, response):
+        return instrumentation.time_rendering(response)
+
+    async def aprocess_template_response(self, request, response):
+        return instrumentation.time_rendering(response)
+
+    @staticmethod
+    def view_started(request):
+        if hasattr(request, "_perf_view_start"):
+            request._perf_view_start = time.perf_counter()
+
+    def sampled(self):
+        rate = settings.PERF_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate
+
+    def start(self, request):
+        metrics = instrumentation.RequestMetrics()
+        start = time.perf_counter()
+        request._perf_view_start = None
+        return metrics, instrumentation.current_metrics.set(metrics), start
+
+    def finish(self, request, response, metrics, start):
+        end = time.perf_counter()
+        view_start = request._perf_view_start
+        durations = {"total": end - start, "view": end - view_start if view_start else 0.0}
+
+        match = request.resolver_match
+        route = (match.url_name or match.route) if match else "unmatched"
+        size = None if response.streaming else len(response.content)
+        instrumentation.observe(route, request.method, durations, metrics, size)
+
+        if settings.PERF_SERVER_TIMING and is_internal(request):
+            response["Server-Timing"] = instrumentation.server_timing(durations, metrics)
+        return response
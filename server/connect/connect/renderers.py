@@ -0,0 +1,128 @@
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import instrumentation
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json path is used without it
+    orjson = None
+
+# Datetimes go through the encoder's default() like everything orjson
+# doesn't know, so they keep DRF's "Z" suffix; non-str keys are stringified
+# as json.dumps does.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+    if orjson else 0
+)
+
+# orjson and json.dumps agree on every float except those written with an
+# exponent (orjson: 1e16 in some versions, 1e-7; stdlib: 1e+16, 1e-07) and
+# positional ones below 1e-4 (orjson: 0.00001; stdlib: 1e-05). Both are
+# found with substring searches, which run at memory speed where a regex
+# doesn't: a digit followed by "e", and a number token starting "0.0000".
+# A match inside a string only costs a stdlib render.
+ZERO_DIGITS = bytes.maketrans(b'123456789', b'000000000')
+TOKEN_STARTS = b':,[-'
+
+
+def divergent_floats(content):
+    if b'0e' in content.translate(ZERO_DIGITS):
+        return True
+    i = content.find(b'0.0000')
+    while i != -1:
+        # "12:30:15.000012Z" holds the needle too, after another digit.
+        if i == 0 or content[i - 1] in TOKEN_STARTS:
+            return True
+        i = content.find(b'0.0000', i + 1)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in ``JSONRenderer`` backed by orjson, producing the same bytes for
+    the compact UTF-8 output the API uses (COMPACT_JSON and UNICODE_JSON,
+    DRF's defaults). Types orjson doesn't serialize natively go through
+    ``encoder_class().default``, as they do under the stdlib encoder.
+
+    Falls back to ``JSONRenderer`` for indented output (browsable API,
+    ``; indent=`` media types), for non-default DRF JSON settings, when
+    orjson isn't installed, for values orjson rejects (integers beyond 64
+    bits), and when the output holds a float orjson may spell differently
+    (exponent forms, values below 1e-4; see divergent_floats). The one known
+    difference, not reachable from this API's models: NaN and Infinity
+    render as ``null`` instead of raising.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if divergent_floats(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping JSONRenderer applies for JavaScript-embedded JSON.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    One JSON value per line for ``Accept: application/x-ndjson``. The list
+    views stream NDJSON themselves (connect.streaming); listing this
+    renderer on them lets DRF's content negotiation accept the header
+    instead of answering 406, and renders their error bodies.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        render = super().render
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(render(row) + b'\n' for row in rows)
+
+
+def render_response(request, data, status=200, headers=None):
+    """
+    The response a DRF ``Response`` would become in an ``@api_view``, for
+    the async views, which bypass DRF's response path: the configured
+    renderers (FastJSONRenderer under FAST_JSON) chosen by DRF's content
+    negotiation, with the same body bytes, Content-Type and
+    ``Vary: Accept``. The browsable API is not offered; a client that
+    accepts nothing else gets a 406, as from DRF.
+    """
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.format != 'api']
+    negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+    try:
+        renderer, accepted_media_type = negotiator.select_renderer(Request(request), renderers)
+    except NotAcceptable as exc:
+        renderer, accepted_media_type = renderers[0], renderers[0].media_type
+        data, status = {'detail': exc.detail}, exc.status_code
+
+    with instrumentation.serializing():
+        content = renderer.render(data, accepted_media_type, {'request': request})
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f'{content_type}; charset={renderer.charset}'
+    response = HttpResponse(content, status=status, content_type=content_type, headers=headers)
+    if len(api_settings.DEFAULT_RENDERER_CLASSES) > 1:
+        patch_vary_headers(response, ('Accept',))
+    return response
@@ -0,0 +1,145 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Apps whose reads may be served by a replica. Everything else (sessions,
+# token blacklist, admin, ...) stays on the primary.
+REPLICA_APPS = {"services", "users"}
+
+
+class RoutingState:
+    """
+    Per-request routing decision, set by ``PrimaryPinningMiddleware``.
+    ``wrote`` is flipped by the router and read back by the middleware, so
+    it is an attribute on a shared object rather than a context variable of
+    its own: changes made inside ``sync_to_async`` must reach the caller.
+    """
+
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+routing_state = ContextVar("routing_state", default=None)
+
+# Set while a versioned cache (catalog_cache, user_cache, the search index)
+# builds an entry. The entry is stored under the version current after the
+# last invalidation, so it must come from rows at least that new, which a
+# lagging replica can't promise.
+primary_reads = ContextVar("primary_reads", default=False)
+
+
+@contextmanager
+def reading_primary():
+    """
+    Route every read inside the block to the primary. Works across
+    ``await`` and ``sync_to_async``, which copy the context.
+    """
+    token = primary_reads.set(True)
+    try:
+        yield
+    finally:
+        primary_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send safe-method reads of ``REPLICA_APPS`` to ``DATABASE_REPLICAS`` and
+    everything else to the primary.
+
+    Reads outside a request (management commands, the shell, tests without
+    the middleware) and reads that fill a cache (``reading_primary``)
+    always use the primary. ``REPLICA_SELECTION`` picks a
+    replica per query: ``"round_robin"``, or ``"least_lag"``, which measures
+    replication lag at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds and
+    skips replicas further behind than ``REPLICA_MAX_LAG``.
+    """
+
+    def __init__(self):
+        self._cycle = None
+        self._cycle_aliases = None
+        self._lag = {}
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Router API
+    # -------------------------------------------------
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if state is None or state.use_primary or primary_reads.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label not in REPLICA_APPS:
+            return DEFAULT_DB_ALIAS
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        if settings.REPLICA_SELECTION == "least_lag":
+            return self.least_lagging(replicas)
+        return self.next_replica(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+            # Later reads in the same request must see the write.
+            state.use_primary = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any of them can relate.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+    # -------------------------------------------------
+    # Replica selection
+    # -------------------------------------------------
+    def next_replica(self, replicas):
+        with self._lock:
+            if self._cycle_aliases != replicas:
+                self._cycle = itertools.cycle(replicas)
+                self._cycle_aliases = list(replicas)
+            return next(self._cycle)
+
+    def least_lagging(self, replicas):
+        lags = {alias: self.lag(alias) for alias in replicas}
+        healthy = [alias for alias in replicas if lags[alias] <= settings.REPLICA_MAX_LAG]
+        if not healthy:
+            return DEFAULT_DB_ALIAS
+        return min(healthy, key=lags.__getitem__)
+
+    def lag(self, alias):
+        now = time.monotonic()
+        measured = self._lag.get(alias)
+        if measured and now - measured[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return measured[1]
+        lag = measure_lag(alias)
+        self._lag[alias] = (now, lag)
+        return lag
+
+
+def measure_lag(alias):
+    """
+    Seconds the replica is behind its primary; unreachable replicas count as
+    infinitely behind. Only Postgres reports lag, other backends return 0.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            # A replica that has replayed everything it received is current,
+            # however old its last replayed transaction is.
+            cursor.execute(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        return float("inf")
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'users',
     'services',
     'rest_framework',
@@ -47,7 +48,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'connect.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'connect.middleware.PrimaryPinningMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -85,9 +88,122 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST', default='localhost'),
         'PORT': env('DB_PORT', default='5432'),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connection reuse. DB_POOL keeps a psycopg pool (needs psycopg[pool]) per
+# worker process, shared by its threads and, under ASGI, its requests; it
+# replaces persistent connections, which Django only keeps per thread and
+# which ASGI does not reuse between requests. Without it, connections live
+# for DB_CONN_MAX_AGE seconds and are health-checked before reuse.
+DB_POOL = env.bool('DB_POOL', default=False)
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),  # wait for a free connection
+            'max_lifetime': env.float('DB_POOL_MAX_LIFETIME', default=1800.0),
+            'max_idle': env.float('DB_POOL_MAX_IDLE', default=300.0),
+            # Ping each connection as it is checked out, like CONN_HEALTH_CHECKS.
+            'check': ConnectionPool.check_connection if env.bool('DB_POOL_CHECK', default=True) else None,
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+
+# Read replicas, e.g. DB_REPLICA_URLS=postgres://user:pw@replica1:5432/connectify,...
+# Safe-method reads of the services and users apps go to them (see
+# connect.routers); a client that writes is pinned to the primary for
+# REPLICA_PIN_SECONDS through the REPLICA_PIN_COOKIE cookie.
+for _i, _url in enumerate(env.list('DB_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica_{_i}'] = {
+        **DATABASES['default'],
+        **env.db_url_config(_url),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['connect.routers.ReplicaRouter']
+REPLICA_SELECTION = env.str('REPLICA_SELECTION', default='round_robin')  # or 'least_lag'
+REPLICA_MAX_LAG = env.float('REPLICA_MAX_LAG', default=5.0)  # seconds, least_lag only
+REPLICA_LAG_CHECK_INTERVAL = env.float('REPLICA_LAG_CHECK_INTERVAL', default=5.0)
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=10)
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+# Per-request instrumentation (connect.instrumentation): SQL count and time,
+# serializer/view time and response size for a sampled fraction of requests,
+# as a Server-Timing header and as per-route histograms at /internal/metrics/.
+# Both are served only to requests sending METRICS_TOKEN in X-Metrics-Token.
+PERF_INSTRUMENTATION = env.bool('PERF_INSTRUMENTATION', default=True)
+PERF_SAMPLE_RATE = env.float('PERF_SAMPLE_RATE', default=1.0)
+PERF_SERVER_TIMING = env.bool('PERF_SERVER_TIMING', default=True)
+
+# Shared secret for the /internal/metrics/ endpoints and Server-Timing;
+# empty disables both
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+# Worker processes serving the app (gunicorn and uvicorn read the same
+# variable). Above 1, caches holding invalidation versions must be shared;
+# the system checks refuse a local-memory backend for them.
+WEB_CONCURRENCY = env.int('WEB_CONCURRENCY', default=1)
+
+# Caches
+# The catalog cache fronts the public category/service reads and the
+# default cache holds the authenticated-user cache and token revocations.
+# Both are invalidated by bumping versions, which every worker must see.
+# Unset, they are per-process local memory for development; with DEBUG off
+# the system checks require CACHE_URL and CATALOG_CACHE_URL to be set
+# (e.g. redis://..., which needs the redis client installed).
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://default'),
+    'catalog': env.cache_url('CATALOG_CACHE_URL', default='locmemcache://catalog?MAX_ENTRIES=1000'),
+}
+# Cache aliases left on the development default outside DEBUG, with the
+# variable that configures each
+UNCONFIGURED_CACHES = {} if DEBUG else {
+    alias: var for alias, var in (('default', 'CACHE_URL'), ('catalog', 'CATALOG_CACHE_URL'))
+    if not env.str(var, default='')
+}
+CATALOG_CACHE_ENABLED = env.bool('CATALOG_CACHE_ENABLED', default=True)
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=300)
+
+# Authenticated users cached per process (LRU entries, kept LOCAL_TIMEOUT
+# seconds) and in the default cache (seconds)
+AUTH_USER_CACHE_SIZE = env.int('AUTH_USER_CACHE_SIZE', default=1024)
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', default=300)
+AUTH_USER_LOCAL_TIMEOUT = env.int('AUTH_USER_LOCAL_TIMEOUT', default=30)
+
+# Catalog pagination (opt-in with ?page_size= or ?cursor=)
+CATALOG_PAGE_SIZE = env.int('CATALOG_PAGE_SIZE', default=50)
+CATALOG_MAX_PAGE_SIZE = env.int('CATALOG_MAX_PAGE_SIZE', default=500)
+
+# Streamed list responses (?stream=json|ndjson): rows fetched and flushed per chunk
+STREAM_CHUNK_SIZE = env.int('STREAM_CHUNK_SIZE', default=2000)
+
+# Bulk catalog endpoints
+BULK_MAX_ROWS = env.int('BULK_MAX_ROWS', default=5000)
+BULK_BATCH_SIZE = env.int('BULK_BATCH_SIZE', default=1000)
+
+# Catalog search (Postgres full-text; in-memory index on other databases)
+CATALOG_SEARCH_CONFIG = env('CATALOG_SEARCH_CONFIG', default='english')
+CATALOG_SEARCH_MAX_RESULTS = env.int('CATALOG_SEARCH_MAX_RESULTS', default=50)
+
+# Precompressed catalog snapshot (services/catalog-snapshot/). Unset, the
+# endpoint serves the cached catalog tree instead. Rebuilds run DEBOUNCE
+# seconds after the last catalog write, at most MAX_DELAY after the first.
+CATALOG_SNAPSHOT_DIR = env('CATALOG_SNAPSHOT_DIR', default=None)
+CATALOG_SNAPSHOT_DEBOUNCE = env.float('CATALOG_SNAPSHOT_DEBOUNCE', default=2.0)
+CATALOG_SNAPSHOT_MAX_DELAY = env.float('CATALOG_SNAPSHOT_MAX_DELAY', default=30.0)
+
+# orjson-backed JSON renderer/parser for the API (connect.renderers,
+# connect.parsers). Output is byte-identical to DRF's; without orjson
+# installed both fall back to the stdlib encoder.
+FAST_JSON = env.bool('FAST_JSON', default=True)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -96,6 +212,32 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing profile: 'pbkdf2' (Django's default) or 'argon2', which
+# needs argon2-cffi and hashes new passwords with the cost below. Hashes made
+# under the other profile keep verifying and are upgraded on login.
+PASSWORD_HASHER_PROFILE = env.str('PASSWORD_HASHER_PROFILE', default='pbkdf2')
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=65536)  # KiB
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=2)
+_PBKDF2_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+_ARGON2_HASHERS = ['users.hashers.TunedArgon2PasswordHasher']
+PASSWORD_HASHERS = (
+    _ARGON2_HASHERS + _PBKDF2_HASHERS if PASSWORD_HASHER_PROFILE == 'argon2'
+    else _PBKDF2_HASHERS + _ARGON2_HASHERS
+) + [
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Async login/signup/password views (serve with connect.asgi). Hashing runs in
+# a bounded thread pool; requests beyond workers + queue get a 503.
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=4)
+PASSWORD_HASHING_QUEUE = env.int('PASSWORD_HASHING_QUEUE', default=64)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -124,16 +266,28 @@ SIMPLE_JWT = {
 
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+
+    # Refresh through the revocation cache (users.tokens.CachedRefreshToken)
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.MyTokenRefreshSerializer',
 }
 
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'connect.renderers.FastJSONRenderer' if FAST_JSON else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'connect.parsers.FastJSONParser' if FAST_JSON else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 
@@ -17,9 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from . import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('users/', include('users.urls')), 
     path('services/', include('services.urls')),  
+    path('internal/metrics/', metrics.PrometheusMetrics, name='prometheus-metrics'),
+    path('internal/metrics/db-pool/', metrics.DatabasePoolMetrics, name='db-pool-metrics'),
 ]
 
@@ -0,0 +1,133 @@
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import NotFound
+
+from connect.conditional import conditional_view
+from connect.renderers import render_response
+from connect.streaming import STREAM_VARY, astream_list, requested_stream_format
+
+from .cache import catalog_cache
+from .models import ServiceCategory, Service
+from .serializers import (
+    ServiceSerializer,
+    FastServiceCategorySerializer,
+    FastServiceSerializer,
+)
+from .views import active_filter, category_pagination, service_pagination
+
+# Async variants of the public catalog reads, selected in services/urls.py
+# when ASYNC_VIEWS is on. They use the async ORM and cache APIs end to end,
+# so under ASGI a read never occupies a thread; responses go through the same
+# renderer (connect.renderers.render_response), so bodies, ETags and cache
+# entries are the same as the DRF views'.
+
+
+# =====================================================
+# 🔽 CONDITIONAL GET VALIDATORS
+# =====================================================
+async def categories_state(request):
+    return None, await catalog_cache.aversion(ServiceCategory)
+
+
+async def services_state(request):
+    return (
+        None,
+        await catalog_cache.aversion(ServiceCategory),
+        await catalog_cache.aversion(Service),
+    )
+
+
+async def service_state(request, pk):
+    row = await Service.objects.filter(pk=pk).values_list(
+        "updated_at", "category__updated_at"
+    ).afirst()
+    return (max(row),) if row else None
+
+
+# =====================================================
+# 🔽 HELPERS
+# =====================================================
+async def list_response(request, rows, serializer_class, pagination, name, models, params=None):
+    """
+    Stream, paginate or return the whole list, as the DRF list views do.
+    """
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        return astream_list(rows, serializer_class.to_representation, stream_format)
+
+    if pagination.is_requested(request):
+        try:
+            page = await catalog_cache.aget_or_set(
+                f"{name}-page",
+                lambda: pagination.aget_page(rows, request, serializer_class),
+                models=models,
+                params={**(params or {}), **pagination.cache_params(request)},
+            )
+        except NotFound as exc:
+            return render_response(request, {"detail": exc.detail}, status=exc.status_code)
+        return render_response(request, pagination.get_paginated_data(request, page))
+
+    async def build():
+        return serializer_class([row async for row in rows], many=True).data
+
+    data = await catalog_cache.aget_or_set(name, build, models=models, params=params)
+    return render_response(request, data)
+
+
+# =====================================================
+# 🔽 SERVICE CATEGORY VIEWS
+# =====================================================
+@require_safe
+@conditional_view(categories_state, vary=STREAM_VARY)
+async def GetServiceCategories(request):
+    filters = active_filter(request.GET)
+    categories = FastServiceCategorySerializer.rows(ServiceCategory.objects.filter(**filters))
+    return await list_response(
+        request,
+        categories,
+        FastServiceCategorySerializer,
+        category_pagination,
+        "categories",
+        models=(ServiceCategory,),
+        params={"is_active": filters.get("is_active", "")},
+    )
+
+
+# =====================================================
+# 🔽 SERVICE VIEWS
+# =====================================================
+@require_safe
+@conditional_view(services_state, vary=STREAM_VARY)
+async def GetServices(request):
+    category_id = request.GET.get("category")
+    filters = active_filter(request.GET)
+
+    services = Service.objects.filter(**filters)
+    if category_id:
+        services = services.filter(category_id=category_id)
+    return await list_response(
+        request,
+        FastServiceSerializer.rows(services),
+        FastServiceSerializer,
+        service_pagination,
+        "services",
+        models=(ServiceCategory, Service),
+        params={"category": category_id or "", "is_active": filters.get("is_active", "")},
+    )
+
+
+@require_safe
+@conditional_view(service_state)
+async def GetServiceById(request, pk):
+    async def build():
+        return ServiceSerializer(await Service.objects.select_related("category").aget(pk=pk)).data
+
+    try:
+        data = await catalog_cache.aget_or_set(
+            f"service:{pk}",
+            build,
+            models=(ServiceCategory, Service),
+        )
+    except Service.DoesNotExist:
+        return render_response(request, {"error": "Service not found"}, status=404)
+
+    return render_response(request, data)
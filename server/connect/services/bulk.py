@@ -0,0 +1,211 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import catalog_cache
+from .models import ServiceCategory, Service
+from .search import update_search_vectors
+from .serializers import ServiceSerializer
+
+
+# =====================================================
+# 🔽 ROW SERIALIZERS
+# =====================================================
+# Database-free per-row validation. Lookups that need the database
+# (category existence, uniqueness) are done once per batch below.
+class BulkServiceCategoryRowSerializer(serializers.Serializer):
+    category_name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    is_active = serializers.BooleanField(required=False, default=True)
+
+
+class BulkServiceRowSerializer(serializers.Serializer):
+    category = serializers.IntegerField()
+    service_name = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    is_active = serializers.BooleanField(required=False, default=True)
+
+
+class BulkActiveRowSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    is_active = serializers.BooleanField()
+
+
+class BulkError(Exception):
+    """
+    Raised with a list of ``{"index": i, "errors": {...}}`` entries when any
+    row of a batch is invalid; nothing from the batch is written.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def validate_rows(rows, row_serializer):
+    if not isinstance(rows, list):
+        raise BulkError([{"index": None, "errors": {"non_field_errors": ["Expected a list of items."]}}])
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise BulkError([{
+            "index": None,
+            "errors": {"non_field_errors": [f"At most {settings.BULK_MAX_ROWS} items per request."]},
+        }])
+
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        serializer = row_serializer(data=row)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+    return valid, errors
+
+
+def _catalog_changed(*models):
+    transaction.on_commit(lambda: catalog_cache.invalidate(*models))
+
+
+# =====================================================
+# 🔽 BULK CREATE
+# =====================================================
+def bulk_create_categories(rows):
+    valid, errors = validate_rows(rows, BulkServiceCategoryRowSerializer)
+    if errors:
+        raise BulkError(errors)
+
+    names = [row["category_name"] for row in valid]
+    existing = set(
+        ServiceCategory.objects.filter(category_name__in=names).values_list("category_name", flat=True)
+    )
+    seen = set()
+    for index, name in enumerate(names):
+        if name in existing or name in seen:
+            errors.append({
+                "index": index,
+                "errors": {"category_name": ["service category with this category name already exists."]},
+            })
+        seen.add(name)
+    if errors:
+        raise BulkError(errors)
+
+    try:
+        with transaction.atomic():
+            created = ServiceCategory.objects.bulk_create(
+                [ServiceCategory(**row) for row in valid],
+                batch_size=settings.BULK_BATCH_SIZE,
+            )
+            _catalog_changed(ServiceCategory)
+    except IntegrityError:
+        # Lost a race with a concurrent writer after the batch lookup.
+        raise BulkError([{"index": None, "errors": {"non_field_errors": [
+            "The batch conflicts with categories created concurrently; retry it."
+        ]}}])
+    return created
+
+
+def bulk_create_services(rows):
+    valid, errors = validate_rows(rows, BulkServiceRowSerializer)
+    if errors:
+        raise BulkError(errors)
+
+    category_ids = {row["category"] for row in valid}
+    names = {row["service_name"].lower() for row in valid}
+    known_categories = set(
+        ServiceCategory.objects.filter(pk__in=category_ids).values_list("pk", flat=True)
+    )
+    # One lookup for the whole batch against the (lower(name), category) index.
+    existing = set(
+        Service.objects.annotate(name_lower=Lower("service_name"))
+        .filter(category_id__in=category_ids, name_lower__in=names)
+        .values_list("category_id", "name_lower")
+    )
+
+    seen = set()
+    for index, row in enumerate(valid):
+        key = (row["category"], row["service_name"].lower())
+        if row["category"] not in known_categories:
+            errors.append({
+                "index": index,
+                "errors": {"category": [f'Invalid pk "{row["category"]}" - object does not exist.']},
+            })
+        elif key in existing or key in seen:
+            errors.append({
+                "index": index,
+                "errors": {"non_field_errors": [ServiceSerializer.duplicate_message]},
+            })
+        seen.add(key)
+    if errors:
+        raise BulkError(errors)
+
+    try:
+        with transaction.atomic():
+            created = Service.objects.bulk_create(
+                [
+                    Service(
+                        category_id=row["category"],
+                        service_name=row["service_name"],
+                        description=row.get("description"),
+                        is_active=row["is_active"],
+                    )
+                    for row in valid
+                ],
+                batch_size=settings.BULK_BATCH_SIZE,
+            )
+            update_search_vectors(Service.objects.filter(pk__in=[s.pk for s in created]))
+            _catalog_changed(Service)
+    except IntegrityError:
+        raise BulkError([{"index": None, "errors": {"non_field_errors": [
+            "The batch conflicts with services created concurrently; retry it."
+        ]}}])
+    return created
+
+
+# =====================================================
+# 🔽 BULK UPDATE / DELETE
+# =====================================================
+def bulk_set_active(model, rows):
+    """
+    Apply ``[{"id": ..., "is_active": ...}, ...]`` with one existence
+    lookup and one ``bulk_update``. Returns the number of rows updated.
+    """
+    valid, errors = validate_rows(rows, BulkActiveRowSerializer)
+    if errors:
+        raise BulkError(errors)
+
+    ids = [row["id"] for row in valid]
+    known = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+    for index, pk in enumerate(ids):
+        if pk not in known:
+            errors.append({"index": index, "errors": {"id": [f'Invalid pk "{pk}" - object does not exist.']}})
+    if errors:
+        raise BulkError(errors)
+
+    # bulk_update skips auto_now, so updated_at is set by hand for the
+    # conditional GET validators.
+    now = timezone.now()
+    with transaction.atomic():
+        model.objects.bulk_update(
+            [model(pk=row["id"], is_active=row["is_active"], updated_at=now) for row in valid],
+            ["is_active", "updated_at"],
+            batch_size=settings.BULK_BATCH_SIZE,
+        )
+        _catalog_changed(model)
+    return len(valid)
+
+
+def bulk_delete(model, ids):
+    if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+        raise BulkError([{"index": None, "errors": {"ids": ["Expected a list of integer ids."]}}])
+    if len(ids) > settings.BULK_MAX_ROWS:
+        raise BulkError([{
+            "index": None,
+            "errors": {"ids": [f"At most {settings.BULK_MAX_ROWS} ids per request."]},
+        }])
+
+    with transaction.atomic():
+        _, per_model = model.objects.filter(pk__in=ids).delete()
+        _catalog_changed(ServiceCategory, Service)
+    return per_model.get(model._meta.label, 0)
+
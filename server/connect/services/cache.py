@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import Signal
+
+from connect.routers import reading_primary
+
+_MISSING = object()
+
+# Sent with ``models`` after CatalogCache.invalidate bumps their versions,
+# i.e. after every committed catalog write.
+catalog_invalidated = Signal()
+
+
+class CatalogCache:
+    """
+    Response cache for the public catalog reads.
+
+    Every entry is keyed by the current version of the models it was built
+    from, so bumping a model's version makes all dependent entries
+    unreachable without having to find and delete them. The backend is
+    whatever ``CACHES[alias]`` points at. Versions only reach every worker
+    through a shared backend (Redis, Memcached), the production default;
+    the local-memory LRU used under DEBUG sees only its own process's
+    invalidations, and services.checks rejects it with several workers.
+    Builds read from the primary (``connect.routers.reading_primary``), so
+    a lagging replica can't store old rows under a new version.
+    """
+
+    def __init__(self, alias="catalog"):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def enabled(self):
+        return settings.CATALOG_CACHE_ENABLED
+
+    def _version_key(self, model):
+        return f"catalog:version:{model._meta.label_lower}"
+
+    def version(self, model):
+        key = self._version_key(model)
+        version = self.backend.get(key)
+        if version is None:
+            # Seed from the clock so a version key evicted by the LRU never
+            # comes back at a number that older entries were built with.
+            self.backend.add(key, time.time_ns(), timeout=None)
+            version = self.backend.get(key)
+        return version
+
+    def invalidate(self, *models):
+        for model in models:
+            key = self._version_key(model)
+            try:
+                self.backend.incr(key)
+            except ValueError:
+                self.backend.add(key, time.time_ns(), timeout=None)
+        catalog_invalidated.send(sender=type(self), models=models)
+
+    async def aversion(self, model):
+        key = self._version_key(model)
+        version = await self.backend.aget(key)
+        if version is None:
+            await self.backend.aadd(key, time.time_ns(), timeout=None)
+            version = await self.backend.aget(key)
+        return version
+
+    def _key(self, name, versions, params):
+        key = f"catalog:{name}:{'.'.join(str(v) for v in versions)}"
+        if params:
+            encoded = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+            key += ":" + hashlib.md5(encoded.encode()).hexdigest()
+        return key
+
+    def make_key(self, name, models, params=None):
+        return self._key(name, [self.version(model) for model in models], params)
+
+    async def amake_key(self, name, models, params=None):
+        return self._key(name, [await self.aversion(model) for model in models], params)
+
+    def get_or_set(self, name, build, models, params=None):
+        """
+        Return the cached value for ``name``, calling ``build`` on a miss.
+        Exceptions raised by ``build`` propagate and nothing is cached.
+        """
+        if not self.enabled:
+            return build()
+
+        key = self.make_key(name, models, params)
+        value = self.backend.get(key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+
+        self._count(hit=False)
+        with reading_primary():
+            value = build()
+        self.backend.set(key, value, settings.CATALOG_CACHE_TIMEOUT)
+        return value
+
+    async def aget_or_set(self, name, build, models, params=None):
+        """
+        Async ``get_or_set`` for the async views; ``build`` is a coroutine
+        function.
+        """
+        if not self.enabled:
+            return await build()
+
+        key = await self.amake_key(name, models, params)
+        value = await self.backend.aget(key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+
+        self._count(hit=False)
+        with reading_primary():
+            value = await build()
+        await self.backend.aset(key, value, settings.CATALOG_CACHE_TIMEOUT)
+        return value
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.core.checks import register
+
+from connect.checks import shared_cache_errors
+
+from .cache import catalog_cache
+
+
+@register()
+def check_catalog_cache(app_configs, **kwargs):
+    if not settings.CATALOG_CACHE_ENABLED:
+        return []
+    return shared_cache_errors(catalog_cache.alias, "the catalog cache", "services")
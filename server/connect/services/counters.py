@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cache import catalog_cache
+from .models import ServiceCategory, Service
+
+
+def reconcile_service_counts(category_ids=None, dry_run=False):
+    """
+    Recount services per category and repair counters that drifted (raw
+    SQL, COPY loads, or writes that bypassed ``ServiceQuerySet``). Returns
+    ``(category_id, stored, actual)`` for every drifted category, where
+    the counts are ``(service_count, active_service_count)`` pairs.
+
+    The categories are locked first: service writes update their counters
+    under the same row locks, so the recount can't race them.
+    """
+    categories, services = ServiceCategory.objects.all(), Service.objects.all()
+    if category_ids is not None:
+        categories = categories.filter(pk__in=category_ids)
+        services = services.filter(category_id__in=category_ids)
+
+    with transaction.atomic():
+        stored = {
+            pk: (total, active)
+            for pk, total, active in categories.select_for_update().order_by("pk").values_list(
+                "pk", "service_count", "active_service_count"
+            )
+        }
+        actual = {
+            row["category_id"]: (row["total"], row["active"])
+            for row in services.values("category_id")
+            .annotate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+            .order_by()
+        }
+        drifted = [
+            (pk, counts, actual.get(pk, (0, 0)))
+            for pk, counts in stored.items()
+            if counts != actual.get(pk, (0, 0))
+        ]
+        if drifted and not dry_run:
+            # updated_at moves so category list ETags pick up the new counts.
+            now = timezone.now()
+            ServiceCategory.objects.bulk_update(
+                [
+                    ServiceCategory(pk=pk, service_count=total, active_service_count=active, updated_at=now)
+                    for pk, _, (total, active) in drifted
+                ],
+                ["service_count", "active_service_count", "updated_at"],
+                batch_size=1000,
+            )
+            transaction.on_commit(lambda: catalog_cache.invalidate(ServiceCategory))
+    return drifted
@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from services.models import ServiceCategory, Service
+from services.serializers import FastServiceCategorySerializer, FastServiceSerializer
+from services.views import category_pagination, service_pagination
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the active-catalog reads (first and deep keyset pages, "
+        "per-category pages, role filter) with the catalog and role "
+        "indexes, then again with them dropped inside a transaction that "
+        "is rolled back. Run it against a seeded database (seed_scale)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query.")
+        parser.add_argument("--page-size", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not Service.objects.exists():
+            raise CommandError("No services to read; seed the database first.")
+        self.options = options
+        queries = self.queries()
+
+        after = self.measure(queries)
+        try:
+            with transaction.atomic():
+                with connection.schema_editor(atomic=False) as editor:
+                    for model in (ServiceCategory, Service, User):
+                        for index in model._meta.indexes:
+                            editor.remove_index(model, index)
+                before = self.measure(queries)
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"{'query':<28} {'no index':>12} {'indexed':>12} {'speed-up':>9}")
+        for label in queries:
+            self.stdout.write(
+                f"{label:<28} {before[label] * 1e3:9.2f} ms {after[label] * 1e3:9.2f} ms"
+                f" {before[label] / after[label]:8.1f}x"
+            )
+
+    def queries(self):
+        size = self.options["page_size"] + 1
+        category_id = (
+            Service.objects.filter(is_active=True).values_list("category_id", flat=True).first()
+        )
+        active = Service.objects.filter(is_active=True)
+        middle = active.order_by("service_name", "id")[active.count() // 2]
+        in_category = active.filter(category_id=category_id)
+
+        def page(pagination, queryset, serializer_class, position=None):
+            rows = serializer_class.rows(pagination._page_queryset(queryset, position, False))
+            return lambda: list(rows[:size])
+
+        return {
+            "active categories": page(
+                category_pagination, ServiceCategory.objects.filter(is_active=True),
+                FastServiceCategorySerializer,
+            ),
+            "active services, page 1": page(service_pagination, active, FastServiceSerializer),
+            "active services, deep page": page(
+                service_pagination, active, FastServiceSerializer, [middle.service_name, middle.pk]
+            ),
+            "category active, page 1": page(service_pagination, in_category, FastServiceSerializer),
+            "users by role (count)": lambda: User.objects.filter(role="agent").count(),
+        }
+
+    def measure(self, queries):
+        medians = {}
+        for label, run in queries.items():
+            run()  # warm the buffer cache
+            timings = []
+            for _ in range(self.options["repeat"]):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+            medians[label] = statistics.median(timings)
+        return medians
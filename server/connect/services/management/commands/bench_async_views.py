@@ -0,0 +1,127 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with many concurrent keep-alive connections "
+        "and report throughput, latency and the server's peak memory. Run "
+        "it once against `uvicorn connect.asgi:application` with "
+        "ASYNC_VIEWS=True and once with ASYNC_VIEWS=False (or against the "
+        "WSGI server) to compare the async and sync read views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="e.g. http://127.0.0.1:8000/api/services/get-all-categories/")
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--header", action="append", default=[], help="Extra 'Name: value' header.")
+        parser.add_argument("--pid", type=int, help="Server process to sample peak RSS from (Linux).")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http":
+            raise CommandError("Only plain http:// URLs are supported.")
+        path = url.path + (f"?{url.query}" if url.query else "")
+        headers = "".join(f"{header}\r\n" for header in options["header"])
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n{headers}Connection: keep-alive\r\n\r\n"
+        ).encode()
+
+        latencies, errors, elapsed, rss = asyncio.run(
+            self.run(url.hostname, url.port or 80, request, options)
+        )
+        if not latencies:
+            raise CommandError(f"No successful responses ({errors} errors).")
+
+        latencies.sort()
+        line = (
+            f"{len(latencies) / elapsed:8.0f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.1f} ms  "
+            f"errors {errors}"
+        )
+        if rss is not None:
+            line += f"  peak RSS {rss / 1024:.0f} MiB"
+        self.stdout.write(line)
+
+    async def run(self, host, port, request, options):
+        latencies = []
+        errors = 0
+        deadline = time.perf_counter() + options["duration"]
+        peak_rss = [None]
+
+        async def connection():
+            nonlocal errors
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError:
+                errors += 1
+                return
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    writer.write(request)
+                    status = await self.read_response(reader)
+                    if status == 200 or status == 304:
+                        latencies.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+            finally:
+                writer.close()
+
+        async def sample_rss():
+            while time.perf_counter() < deadline:
+                rss = self.rss_kib(options["pid"])
+                if rss is not None:
+                    peak_rss[0] = max(peak_rss[0] or 0, rss)
+                await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        tasks = [connection() for _ in range(options["connections"])]
+        if options["pid"]:
+            tasks.append(sample_rss())
+        await asyncio.gather(*tasks)
+        return latencies, errors, time.perf_counter() - started, peak_rss[0]
+
+    async def read_response(self, reader):
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        length = 0
+        chunked = False
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+
+        if not chunked:
+            await reader.readexactly(length)
+            return status
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                return status
+
+    @staticmethod
+    def rss_kib(pid):
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
@@ -0,0 +1,202 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from services import views
+from services.cache import catalog_cache
+from services.models import ServiceCategory, Service
+from services.pagination import KeysetPagination
+from services.serializers import FastServiceSerializer, ServiceSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway catalog and measure requests/sec of the public "
+        "catalog views. Everything runs inside a transaction that is rolled "
+        "back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--services", type=int, default=10000)
+        parser.add_argument("--categories", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--bulk-rows", type=int, default=1000)
+        parser.add_argument(
+            "--memory", action="store_true",
+            help="Also compare tracemalloc peaks of the buffered and streamed GetServices.",
+        )
+
+    def handle(self, *args, **options):
+        self.factory = APIRequestFactory()
+
+        with transaction.atomic():
+            self.seed(options["categories"], options["services"])
+            self.stdout.write(
+                f"Catalog: {options['categories']} categories, {options['services']} services"
+            )
+            for label, view, kwargs in self.scenarios():
+                self.run_cache_comparison(label, view, kwargs, options["requests"])
+            self.run_serializer_comparison(options["requests"])
+            self.run_pagination_comparison(options["page_size"], options["requests"])
+            self.run_bulk_comparison(options["bulk_rows"])
+            if options["memory"]:
+                self.run_memory_comparison()
+            transaction.set_rollback(True)
+
+        catalog_cache.invalidate(ServiceCategory, Service)
+
+    def seed(self, n_categories, n_services):
+        categories = ServiceCategory.objects.bulk_create(
+            ServiceCategory(category_name=f"bench-category-{i:05d}")
+            for i in range(n_categories)
+        )
+        Service.objects.bulk_create(
+            (
+                Service(
+                    category=categories[i % n_categories],
+                    service_name=f"bench-service-{i:07d}",
+                    description="Benchmark service",
+                )
+                for i in range(n_services)
+            ),
+            batch_size=1000,
+        )
+        catalog_cache.invalidate(ServiceCategory, Service)
+        self.first_category = categories[0]
+        self.first_service = Service.objects.filter(category=categories[0]).first()
+
+    def scenarios(self):
+        return [
+            ("GetServiceCategories", views.GetServiceCategories, {}),
+            ("GetServiceCategoryById", views.GetServiceCategoryById, {"pk": self.first_category.pk}),
+            ("GetServices", views.GetServices, {}),
+            ("GetServiceById", views.GetServiceById, {"pk": self.first_service.pk}),
+        ]
+
+    def time_requests(self, view, kwargs, n, query=None):
+        started = time.perf_counter()
+        for _ in range(n):
+            response = view(self.factory.get("/", query or {}), **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        return n / (time.perf_counter() - started)
+
+    def run_cache_comparison(self, label, view, kwargs, n):
+        with override_settings(CATALOG_CACHE_ENABLED=False):
+            uncached = self.time_requests(view, kwargs, n)
+
+        catalog_cache.reset_stats()
+        cached = self.time_requests(view, kwargs, n)
+        stats = catalog_cache.stats()
+        self.stdout.write(
+            f"{label:<24} uncached {uncached:>9.1f} req/s   cached {cached:>9.1f} req/s   "
+            f"x{cached / uncached:.1f}   hits={stats['hits']} misses={stats['misses']}"
+        )
+
+    def run_serializer_comparison(self, n):
+        queryset = Service.objects.select_related("category")
+        total = queryset.count()
+        runs = max(1, n // 10)
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            ServiceSerializer(queryset.all(), many=True).data
+        drf = runs * total / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            FastServiceSerializer(FastServiceSerializer.rows(queryset.all()), many=True).data
+        fast = runs * total / (time.perf_counter() - started)
+
+        self.stdout.write(
+            f"Service rows/sec         ServiceSerializer {drf:>10.0f}   "
+            f"FastServiceSerializer {fast:>10.0f}   x{fast / drf:.1f}"
+        )
+
+    def run_pagination_comparison(self, page_size, n):
+        """
+        Fetch a page near the end of the services table with OFFSET and with
+        a keyset cursor; keyset cost should stay flat as depth grows.
+        """
+        ordering = ("service_name", "id")
+        queryset = Service.objects.select_related("category").order_by(*ordering)
+        total = queryset.count()
+        paginator = KeysetPagination(ordering=ordering)
+
+        for depth in (0.1, 0.5, 0.9):
+            offset = int(total * depth)
+            position = paginator.position(queryset[offset - 1])
+
+            started = time.perf_counter()
+            for _ in range(n):
+                list(queryset[offset:offset + page_size])
+            offset_ms = (time.perf_counter() - started) * 1000 / n
+
+            started = time.perf_counter()
+            for _ in range(n):
+                list(queryset.filter(paginator.seek(position, False))[:page_size])
+            keyset_ms = (time.perf_counter() - started) * 1000 / n
+
+            self.stdout.write(
+                f"page at offset {offset:>8}   OFFSET {offset_ms:>7.2f} ms   "
+                f"keyset {keyset_ms:>7.2f} ms"
+            )
+
+    def run_memory_comparison(self):
+        for label, query in (
+            ("Response(serializer.data)", {}),
+            ("stream=json", {"stream": "json"}),
+            ("stream=ndjson", {"stream": "ndjson"}),
+        ):
+            with override_settings(CATALOG_CACHE_ENABLED=False):
+                tracemalloc.start()
+                started = time.perf_counter()
+                response = views.GetServices(self.factory.get("/", query))
+                if response.streaming:
+                    size = sum(len(chunk) for chunk in response.streaming_content)
+                else:
+                    size = len(response.render().content)
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            self.stdout.write(
+                f"{label:<26} peak {peak / 2**20:>8.1f} MiB   body {size / 2**20:>7.1f} MiB   "
+                f"{elapsed:.2f} s"
+            )
+
+    def run_bulk_comparison(self, n_rows):
+        user = User.objects.create_user(
+            username="bench@example.com", email="bench@example.com", password="bench", role="admin"
+        )
+        category = ServiceCategory.objects.create(category_name="bench-bulk-category")
+
+        def post(view, data):
+            request = self.factory.post("/", data, format="json")
+            force_authenticate(request, user=user)
+            response = view(request)
+            assert response.status_code == 201, response.data
+
+        per_row = max(1, n_rows // 10)
+        started = time.perf_counter()
+        for i in range(per_row):
+            post(views.CreateService, {"category": category.pk, "service_name": f"bench-single-{i}"})
+        single = per_row / (time.perf_counter() - started)
+
+        rows = [
+            {"category": category.pk, "service_name": f"bench-bulk-{i}"}
+            for i in range(n_rows)
+        ]
+        started = time.perf_counter()
+        post(views.BulkServices, rows)
+        batched = n_rows / (time.perf_counter() - started)
+
+        self.stdout.write(
+            f"Service creates/sec      CreateService {single:>10.0f}   "
+            f"BulkServices {batched:>10.0f}   x{batched / single:.0f}"
+        )
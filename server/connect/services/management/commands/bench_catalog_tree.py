@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from services import views
+from services.cache import catalog_cache
+from services.models import ServiceCategory, Service
+from services.serializers import FastServiceCategorySerializer, FastServiceSerializer
+from services.tree import build_catalog_tree
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway catalog and compare building the catalog tree "
+        "against the per-category reads it replaces (one category list "
+        "plus one services query per category). Everything runs inside a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=500)
+        parser.add_argument("--services-per-category", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["categories"], options["services_per_category"])
+            self.stdout.write(
+                f"Catalog: {options['categories']} categories x "
+                f"{options['services_per_category']} services"
+            )
+
+            def per_category():
+                categories = FastServiceCategorySerializer(
+                    FastServiceCategorySerializer.rows(ServiceCategory.objects.all()), many=True
+                ).data
+                for category in categories:
+                    rows = FastServiceSerializer.rows(Service.objects.filter(category_id=category["id"]))
+                    category["services"] = FastServiceSerializer(rows, many=True).data
+                return categories
+
+            request = APIRequestFactory().get("/services/catalog-tree/")
+
+            def cached_view():
+                return views.GetCatalogTree(request)
+
+            for label, run in (
+                ("per-category reads (N+1)", per_category),
+                ("tree build", build_catalog_tree),
+                ("tree build, active only", lambda: build_catalog_tree({"is_active": True})),
+                ("tree view, cache hit", cached_view),
+            ):
+                run()  # warm up (and fill the cache for the view)
+                with CaptureQueriesContext(connection) as queries:
+                    run()
+                elapsed = self.measure(run, options["repeat"])
+                self.stdout.write(f"{label:<26} {elapsed * 1e3:9.1f} ms  {len(queries):4d} queries")
+            transaction.set_rollback(True)
+
+        catalog_cache.invalidate(ServiceCategory, Service)
+
+    def seed(self, n_categories, per_category):
+        categories = ServiceCategory.objects.bulk_create(
+            ServiceCategory(category_name=f"bench-tree-{i:05d}") for i in range(n_categories)
+        )
+        Service.objects.bulk_create(
+            (
+                Service(
+                    category=category,
+                    service_name=f"bench-tree-service-{j:04d}",
+                    description="Benchmark row",
+                    is_active=j % 10 != 0,
+                )
+                for category in categories
+                for j in range(per_category)
+            ),
+            batch_size=5000,
+        )
+        catalog_cache.invalidate(ServiceCategory, Service)
+
+    def measure(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
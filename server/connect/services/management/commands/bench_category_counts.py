@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Model, Q
+
+from services.counters import reconcile_service_counts
+from services.models import ServiceCategory, Service
+from services.serializers import FastServiceCategorySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare building the category list with per-request Count "
+        "annotations against reading the maintained counter columns, and "
+        "time what the counters add to a service insert. Writes are rolled "
+        "back. Run it against a seeded database (seed_scale)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if not Service.objects.exists():
+            raise CommandError("No services to count; seed the database first.")
+        repeat = options["repeat"]
+
+        def annotated():
+            return list(
+                ServiceCategory.objects.annotate(
+                    n=Count("services"), active=Count("services", filter=Q(services__is_active=True))
+                ).values_list("id", "category_name", "n", "active")
+            )
+
+        def counters():
+            rows = FastServiceCategorySerializer.rows(ServiceCategory.objects.all())
+            return FastServiceCategorySerializer(rows, many=True).data
+
+        category = ServiceCategory.objects.order_by("pk").first()
+
+        def insert():
+            with transaction.atomic():
+                Service.objects.create(category=category, service_name="bench-count-insert")
+                transaction.set_rollback(True)
+
+        def insert_uncounted():
+            # The same INSERT without the counter UPDATE.
+            with transaction.atomic():
+                Model.save(Service(category=category, service_name="bench-count-insert"))
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{ServiceCategory.objects.count()} categories, {Service.objects.count()} services"
+        )
+        for label, run in (
+            ("list, Count annotations", annotated),
+            ("list, counter columns", counters),
+            ("insert, without counters", insert_uncounted),
+            ("insert, with counters", insert),
+            ("reconcile (dry run)", lambda: reconcile_service_counts(dry_run=True)),
+        ):
+            self.stdout.write(f"{label:<26} {self.measure(run, repeat) * 1e3:9.2f} ms")
+
+    def measure(self, run, repeat):
+        run()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
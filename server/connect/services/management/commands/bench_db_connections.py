@@ -0,0 +1,99 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from rest_framework.test import APIRequestFactory
+
+from connect.metrics import pool_stats
+from services import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request latency of a catalog read with a new connection "
+        "per request, persistent connections (CONN_MAX_AGE) and the psycopg "
+        "pool. Each request is bracketed by close_old_connections(), as "
+        "Django's request_started/request_finished signals do."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark needs the PostgreSQL backend.")
+
+        self.factory = APIRequestFactory()
+        self.opened = 0
+        connection_created.connect(self.count_connection)
+        saved = dict(connection.settings_dict)
+        saved_options = dict(saved.get("OPTIONS", {}))
+        try:
+            for label, max_age, pool in (
+                ("new connection", 0, None),
+                ("CONN_MAX_AGE=60", 60, None),
+                ("psycopg pool", 0, {"min_size": options["pool_size"], "max_size": options["pool_size"]}),
+            ):
+                self.configure(max_age, pool, saved_options)
+                self.run(label, options)
+        finally:
+            connection_created.disconnect(self.count_connection)
+            self.reset()
+            connection.settings_dict.update(saved)
+            connection.settings_dict["OPTIONS"] = saved_options
+
+    def count_connection(self, **kwargs):
+        self.opened += 1
+
+    def reset(self):
+        connection.close()
+        connection.close_pool()
+
+    def configure(self, max_age, pool, saved_options):
+        self.reset()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        options = {key: value for key, value in saved_options.items() if key != "pool"}
+        if pool:
+            options["pool"] = pool
+        connection.settings_dict["OPTIONS"] = options
+
+    def request(self):
+        close_old_connections()
+        start = time.perf_counter()
+        try:
+            response = views.GetServiceCategories(self.factory.get("/"))
+            assert response.status_code == 200, response.status_code
+        finally:
+            close_old_connections()
+        return time.perf_counter() - start
+
+    def run(self, label, options):
+        self.opened = 0
+        for _ in range(10):
+            self.request()
+
+        self.opened = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["threads"]) as executor:
+            latencies = sorted(executor.map(lambda _: self.request(), range(options["requests"])))
+            # Worker threads keep their own persistent connections; close them here.
+            list(executor.map(lambda _: connection.close(), range(options["threads"])))
+        elapsed = time.perf_counter() - started
+
+        # connection_created fires on every pool checkout, so for the pool
+        # the real count comes from its own stats (warm-up included).
+        stats = pool_stats().get(connection.alias)
+        opened = stats["connections_opened"] if stats else self.opened
+        line = (
+            f"{label:<16} p50 {statistics.median(latencies) * 1000:6.2f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms  "
+            f"{len(latencies) / elapsed:7.0f} req/s  {opened:4d} connections opened"
+        )
+        if stats:
+            line += f"  avg checkout wait {stats['avg_checkout_wait_ms']:.2f} ms"
+        self.stdout.write(line)
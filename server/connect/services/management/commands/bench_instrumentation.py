@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+PERF_MIDDLEWARE = "connect.middleware.PerformanceMiddleware"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of PerformanceMiddleware on a "
+        "catalog read: off, on for every request, and sampled. Rounds are "
+        "interleaved so drift affects every mode alike."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per round.")
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--sample-rate", type=float, default=0.1)
+        parser.add_argument("--url", default=None, help="Defaults to get-all-categories.")
+
+    def handle(self, *args, **options):
+        url = options["url"] or reverse("get-all-service-categories")
+        without = [m for m in settings.MIDDLEWARE if m != PERF_MIDDLEWARE]
+        modes = (
+            ("off", {"MIDDLEWARE": without}),
+            ("on", {"MIDDLEWARE": [PERF_MIDDLEWARE, *without], "PERF_SAMPLE_RATE": 1.0}),
+            (
+                f"sampled {options['sample_rate']:g}",
+                {"MIDDLEWARE": [PERF_MIDDLEWARE, *without], "PERF_SAMPLE_RATE": options["sample_rate"]},
+            ),
+        )
+        timings = {label: [] for label, _ in modes}
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for _ in range(options["rounds"]):
+                for label, overrides in modes:
+                    with override_settings(PERF_INSTRUMENTATION=True, **overrides):
+                        timings[label].append(self.run(Client(), url, options["requests"]))
+
+        baseline = statistics.median(timings["off"])
+        for label, _ in modes:
+            per_request = statistics.median(timings[label])
+            self.stdout.write(
+                f"{label:<14} {per_request * 1e6:8.1f} µs/request  "
+                f"overhead {(per_request / baseline - 1) * 100:+5.1f}%"
+            )
+
+    def run(self, client, url, requests):
+        client.get(url)  # load the middleware chain and warm the caches
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+        return (time.perf_counter() - start) / requests
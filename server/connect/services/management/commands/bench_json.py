@@ -0,0 +1,87 @@
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from connect.parsers import FastJSONParser
+from connect.renderers import FastJSONRenderer, orjson
+from services.cache import catalog_cache
+from services.models import ServiceCategory, Service
+from services.serializers import FastServiceSerializer
+from services.tree import build_catalog_tree
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare render and parse throughput of DRF's stdlib JSON "
+        "renderer/parser against the orjson-backed ones on catalog-sized "
+        "payloads (the service list and the catalog tree). Seed rows are "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000, help="Services to seed.")
+        parser.add_argument("--per-category", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write("orjson is not installed; the fast classes use the stdlib path.")
+
+        with transaction.atomic():
+            self.seed(options["rows"], options["per_category"])
+            rows = FastServiceSerializer.rows(Service.objects.select_related("category"))
+            payloads = {
+                "service list": FastServiceSerializer(rows, many=True).data,
+                "catalog tree": build_catalog_tree(),
+            }
+            transaction.set_rollback(True)
+        catalog_cache.invalidate(ServiceCategory, Service)
+
+        repeat = options["repeat"]
+        context = {"encoding": "utf-8"}
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            assert FastJSONRenderer().render(data) == body
+            self.stdout.write(f"{name}: {len(body) / 1e6:.2f} MB")
+            for label, run in (
+                ("render, JSONRenderer", lambda: JSONRenderer().render(data)),
+                ("render, FastJSONRenderer", lambda: FastJSONRenderer().render(data)),
+                ("parse, JSONParser", lambda: JSONParser().parse(io.BytesIO(body), None, context)),
+                ("parse, FastJSONParser", lambda: FastJSONParser().parse(io.BytesIO(body), None, context)),
+            ):
+                elapsed = self.measure(run, repeat)
+                self.stdout.write(
+                    f"  {label:<26} {elapsed * 1e3:9.2f} ms  {len(body) / elapsed / 1e6:8.1f} MB/s"
+                )
+
+    def seed(self, n_services, per_category):
+        categories = ServiceCategory.objects.bulk_create(
+            ServiceCategory(category_name=f"bench-json-{i:05d}", description="Catégorie “bench”")
+            for i in range(max(1, -(-n_services // per_category)))
+        )
+        Service.objects.bulk_create(
+            (
+                Service(
+                    category=categories[i // per_category],
+                    service_name=f"bench-json-service-{i:06d}",
+                    description="Benchmark row — ünïcode and\nnewlines",
+                    is_active=i % 10 != 0,
+                )
+                for i in range(n_services)
+            ),
+            batch_size=5000,
+        )
+
+    def measure(self, run, repeat):
+        run()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
@@ -0,0 +1,407 @@
+import itertools
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from services.models import ServiceCategory, Service
+from users.models import User, ServiceProvider, SystemManager
+
+PREFIX = "loadtest"
+PASSWORD = "loadtest-password"
+QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+RUN_OPTIONS = ("requests", "concurrency", "providers", "managers", "categories", "services", "seed")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a loadtest dataset, drive every API route of a running server "
+        "at the given concurrency and report throughput, p50/p95/p99 latency "
+        "and queries per request (from the Server-Timing header, sent only "
+        "with the metrics token). Scenarios are named after the URL names "
+        "that label the route metrics; variants of one route are suffixed "
+        "\":variant\". "
+        "--save-baseline stores the results; --baseline compares against "
+        "them and exits non-zero when a route regresses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--routes", help="Comma-separated route names to run (default: all).")
+        parser.add_argument("--providers", type=int, default=1000)
+        parser.add_argument("--managers", type=int, default=20)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--services", type=int, default=2000)
+        parser.add_argument(
+            "--metrics-token", default=settings.METRICS_TOKEN,
+            help="Token for Server-Timing query counts (default: METRICS_TOKEN).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for request choices.")
+        parser.add_argument("--baseline", help="JSON file to compare against.")
+        parser.add_argument("--save-baseline", help="Write this run's results to a JSON file.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Allowed relative slowdown of p95 and drop in throughput (default 0.2).",
+        )
+        parser.add_argument("--cleanup", action="store_true", help="Delete all loadtest data and exit.")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            self.cleanup(f"{PREFIX}-")
+            return
+
+        self.base_url = options["base_url"].rstrip("/")
+        self.metrics_token = options["metrics_token"]
+        self.random = random.Random(options["seed"])
+        self.run_id = uuid.uuid4().hex[:8]
+        self.counter = itertools.count()
+
+        self.seed_dataset(options)
+        self.login_fixtures()
+
+        scenarios = self.scenarios()
+        if options["routes"]:
+            wanted = set(options["routes"].split(","))
+            unknown = wanted - {name for name, *_ in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario[0] in wanted]
+
+        run = {key: options[key] for key in RUN_OPTIONS}
+        results = {}
+        try:
+            for name, build, expected, prepare in scenarios:
+                if prepare:
+                    prepare(options)
+                results[name] = self.run_route(name, build, expected, options)
+        finally:
+            # Keep the dataset identical between runs.
+            self.cleanup(f"-{self.run_id}-")
+
+        if options["save_baseline"]:
+            # "_run" records how the numbers were produced.
+            with open(options["save_baseline"], "w") as fh:
+                json.dump({"_run": run, **results}, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+        if options["baseline"]:
+            self.compare(results, options["baseline"], options["threshold"], run)
+
+    # -------------------------------------------------
+    # Dataset
+    # -------------------------------------------------
+    def seed_dataset(self, options):
+        """
+        Create the fixed part of the dataset once; reruns reuse it. All
+        seeded users share one password hash, so seeding doesn't hash per row.
+        """
+        password = make_password(PASSWORD)
+        with transaction.atomic():
+            self.admin = self.ensure_users("admin", 1, "admin", password, SystemManager)[0]
+            self.providers = self.ensure_users(
+                "provider", options["providers"], "service_provider", password, ServiceProvider
+            )
+            self.ensure_users("manager", options["managers"], "agent", password, SystemManager)
+
+            existing = ServiceCategory.objects.filter(category_name__startswith=f"{PREFIX}-category-").count()
+            ServiceCategory.objects.bulk_create(
+                ServiceCategory(category_name=f"{PREFIX}-category-{i:05d}")
+                for i in range(existing, options["categories"])
+            )
+            self.category_ids = list(
+                ServiceCategory.objects.filter(category_name__startswith=f"{PREFIX}-category-")
+                .order_by("pk").values_list("pk", flat=True)
+            )
+            existing = Service.objects.filter(service_name__startswith=f"{PREFIX}-service-").count()
+            Service.objects.bulk_create(
+                Service(
+                    category_id=self.category_ids[i % len(self.category_ids)],
+                    service_name=f"{PREFIX}-service-{i:06d}",
+                    description="Seeded by the loadtest command",
+                )
+                for i in range(existing, options["services"])
+            )
+            self.service_ids = list(
+                Service.objects.filter(service_name__startswith=f"{PREFIX}-service-")
+                .order_by("pk").values_list("pk", flat=True)
+            )
+        self.stdout.write(
+            f"Dataset: {len(self.providers)} providers, {options['managers']} managers, "
+            f"{len(self.category_ids)} categories, {options['services']} services"
+        )
+
+    def ensure_users(self, kind, count, role, password, profile_model):
+        emails = [f"{PREFIX}-{kind}-{i:06d}@example.com" for i in range(count)]
+        existing = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+        users = User.objects.bulk_create(
+            User(username=email, email=email, password=password, role=role)
+            for email in emails if email not in existing
+        )
+        profile_model.objects.bulk_create(
+            profile_model(user=user, phone_number="0700000000") for user in users
+        )
+        return emails
+
+    def cleanup(self, marker):
+        with transaction.atomic():
+            users = User.objects.filter(email__contains=marker).delete()[0]
+            services = Service.objects.filter(service_name__contains=marker).delete()[0]
+            categories = ServiceCategory.objects.filter(category_name__contains=marker).delete()[0]
+        self.stdout.write(f"Deleted {users + services + categories} loadtest rows")
+
+    # -------------------------------------------------
+    # HTTP
+    # -------------------------------------------------
+    def request(self, method, path, body=None, token=None, extra_headers=None):
+        headers = {"Content-Type": "application/json", **(extra_headers or {})}
+        if self.metrics_token:
+            headers["X-Metrics-Token"] = self.metrics_token
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.headers, exc.read()
+
+    def login(self, email):
+        status, _, body = self.request("POST", "/users/auth/token/", {"email": email, "password": PASSWORD})
+        if status != 200:
+            raise CommandError(f"Login as {email} failed with {status}: {body[:200]!r}")
+        return json.loads(body)
+
+    def login_fixtures(self):
+        self.admin_token = self.login(self.admin)["access"]
+        self.provider_token = self.login(self.providers[0])["access"]
+
+    def unique(self, kind):
+        return f"{PREFIX}-{kind}-{self.run_id}-{next(self.counter)}"
+
+    def throwaway_categories(self, count):
+        """
+        Categories for the write routes to edit; named with the run id, so
+        the cleanup at the end of the run deletes them with their services.
+        """
+        created = ServiceCategory.objects.bulk_create(
+            ServiceCategory(category_name=self.unique("new-category")) for _ in range(count)
+        )
+        return [category.pk for category in created]
+
+    def throwaway_provider(self):
+        """A provider of this run only, for the routes that edit the caller."""
+        email = f"{self.unique('provider')}@example.com"
+        user = User.objects.create_user(
+            username=email, email=email, password=PASSWORD, role="service_provider"
+        )
+        ServiceProvider.objects.create(user=user, phone_number="0700000000")
+        return self.login(email)["access"]
+
+    # -------------------------------------------------
+    # Scenarios: (route name, build request, expected statuses, prepare)
+    # A build returns (method, path, body, token[, extra headers]).
+    # -------------------------------------------------
+    def scenarios(self):
+        provider, admin = (lambda: self.provider_token), (lambda: self.admin_token)
+
+        def signup(kind):
+            return lambda: ("POST", f"/users/create-{kind}/", {
+                "first_name": "Load", "last_name": "Test", "email": f"{self.unique(kind)}@example.com",
+                "password": PASSWORD, "phone_number": "0700000000",
+            }, admin() if kind == "system-manager" else None)
+
+        def refresh():
+            # Rotation blacklists the old token, so every thread follows its own chain.
+            if not hasattr(self.local, "refresh"):
+                self.local.refresh = self.refresh_tokens.pop()
+            return "POST", "/users/auth/token/refresh/", {"refresh": self.local.refresh}, None
+
+        def prepare_refresh(options):
+            self.refresh_tokens = [
+                self.login(self.providers[0])["refresh"] for _ in range(options["concurrency"])
+            ]
+
+        # Writes only touch rows of this run, so the seeded dataset reads
+        # the same on every run.
+        def prepare_deletes(options):
+            self.deletable = self.throwaway_categories(options["requests"])
+
+        def prepare_writes(options):
+            self.writable = self.throwaway_categories(options["concurrency"])
+            self.writer_token = self.throwaway_provider()
+
+        def category():
+            return self.random.choice(self.category_ids)
+
+        def writable():
+            return self.random.choice(self.writable)
+
+        def get(path, headers=None):
+            return lambda: ("GET", path, None, None, headers or {})
+
+        self.etags = {}
+
+        def revalidate(name, path, headers=None):
+            # The ETag is read once up front; these scenarios run before any
+            # catalog write of the run, so every request should get a 304.
+            headers = headers or {}
+
+            def prepare(options):
+                status, response_headers, _ = self.request("GET", path, extra_headers=headers)
+                if status != 200 or "ETag" not in response_headers:
+                    raise CommandError(f"GET {path} answered {status} without an ETag")
+                self.etags[name] = response_headers["ETag"]
+
+            def build():
+                return "GET", path, None, None, {**headers, "If-None-Match": self.etags[name]}
+
+            return name, build, {304}, prepare
+
+        tree, snapshot = "/services/catalog-tree/", "/services/catalog-snapshot/"
+
+        return [
+            ("token_obtain_pair", lambda: (
+                "POST", "/users/auth/token/",
+                {"email": self.random.choice(self.providers), "password": PASSWORD}, None,
+            ), {200}, None),
+            ("token_refresh", refresh, {200}, prepare_refresh),
+            ("service-provider-create", signup("service-provider"), {201}, None),
+            ("service-provider-fetch", lambda: ("GET", "/users/fetch-service-provider/", None, provider()), {200}, None),
+            ("update-user-info", lambda: (
+                "PATCH", "/users/update-info/", {"company_name": self.unique("company")}, self.writer_token,
+            ), {200}, prepare_writes),
+            ("update-user-password", lambda: (
+                "PATCH", "/users/update-password/",
+                {"previous_password": PASSWORD, "new_password": PASSWORD, "confirm_password": PASSWORD},
+                self.writer_token,
+            ), {200}, prepare_writes),
+            ("system-manager-create", signup("system-manager"), {201}, None),
+            ("system-manager-fetch", lambda: ("GET", "/users/fetch-system-manager/", None, admin()), {200}, None),
+            ("catalog-tree", get(tree), {200}, None),
+            ("catalog-tree:fields", get(
+                f"{tree}?fields=id,category_name&service_fields=id,service_name"
+            ), {200}, None),
+            revalidate("catalog-tree:304", tree),
+            ("catalog-snapshot", get(snapshot), {200}, None),
+            ("catalog-snapshot:gzip", get(snapshot, {"Accept-Encoding": "gzip"}), {200}, None),
+            ("catalog-snapshot:br", get(snapshot, {"Accept-Encoding": "br"}), {200}, None),
+            revalidate("catalog-snapshot:304", snapshot, {"Accept-Encoding": "gzip, br"}),
+            ("service-category-create", lambda: (
+                "POST", "/services/add-new-category/", {"category_name": self.unique("new-category")}, admin(),
+            ), {201}, None),
+            ("get-all-service-categories", lambda: ("GET", "/services/get-all-categories/", None, None), {200}, None),
+            ("get-category", lambda: ("GET", f"/services/get-category/{category()}/", None, None), {200}, None),
+            ("update-category", lambda: (
+                "PATCH", f"/services/categories/{writable()}/update/",
+                {"description": self.unique("description")}, admin(),
+            ), {200}, prepare_writes),
+            ("delete-category", lambda: (
+                "DELETE", f"/services/categories/{self.deletable.pop()}/delete/", None, admin(),
+            ), {200}, prepare_deletes),
+            ("service-category-bulk", lambda: (
+                "POST", "/services/categories/bulk/",
+                [{"category_name": self.unique("new-category")} for _ in range(10)], admin(),
+            ), {201}, None),
+            ("service-bulk", lambda: (
+                "POST", "/services/bulk/",
+                [{"category": writable(), "service_name": self.unique("new-service")} for _ in range(10)], admin(),
+            ), {201}, prepare_writes),
+            ("get-all-services", lambda: ("GET", "/services/get-all-services/", None, None), {200}, None),
+            ("get-service", lambda: (
+                "GET", f"/services/get-service/{self.random.choice(self.service_ids)}/", None, None,
+            ), {200}, None),
+            ("catalog-search", lambda: ("GET", f"/services/search/?q={PREFIX}", None, None), {200}, None),
+        ]
+
+    # -------------------------------------------------
+    # Running and reporting
+    # -------------------------------------------------
+    def run_route(self, name, build, expected, options):
+        builds = threading.Lock()
+        self.local = threading.local()
+
+        def one(_):
+            with builds:  # request builders share the RNG and fixture lists
+                method, path, body, token, *extra_headers = build()
+            start = time.perf_counter()
+            status, headers, content = self.request(method, path, body, token, *extra_headers)
+            elapsed = time.perf_counter() - start
+            if name == "token_refresh" and status == 200:
+                self.local.refresh = json.loads(content)["refresh"]
+            match = QUERIES.search(headers.get("Server-Timing", "") if headers else "")
+            return elapsed, status in expected, int(match.group(1)) if match else None
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as executor:
+            samples = list(executor.map(one, range(options["requests"])))
+        wall = time.perf_counter() - started
+
+        latencies = sorted(elapsed for elapsed, _, _ in samples)
+        queries = [count for _, _, count in samples if count is not None]
+        result = {
+            "throughput": round(len(samples) / wall, 1),
+            "p50_ms": round(self.percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(self.percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(self.percentile(latencies, 99) * 1000, 2),
+            "queries": round(statistics.mean(queries), 2) if queries else None,
+            "errors": sum(1 for _, ok, _ in samples if not ok),
+        }
+        self.stdout.write(
+            f"{name:<28} {result['throughput']:8.1f} req/s  p50 {result['p50_ms']:8.2f}  "
+            f"p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  "
+            f"queries {result['queries'] if result['queries'] is not None else '-':>5}  "
+            f"errors {result['errors']}"
+        )
+        return result
+
+    @staticmethod
+    def percentile(values, pct):
+        return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+    def compare(self, results, path, threshold, run=None):
+        with open(path) as fh:
+            baseline = json.load(fh)
+
+        recorded = baseline.pop("_run", None)
+        if run and recorded:
+            differing = sorted(key for key in run if recorded.get(key) != run[key])
+            if differing:
+                self.stderr.write(
+                    f"Baseline {path} was recorded with different {', '.join(differing)}; "
+                    "numbers may not be comparable."
+                )
+
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result["errors"] > base["errors"]:
+                regressions.append(f"{name}: {result['errors']} errors (baseline {base['errors']})")
+            if result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p95 {result['p95_ms']} ms (baseline {base['p95_ms']} ms)")
+            if result["throughput"] < base["throughput"] * (1 - threshold):
+                regressions.append(
+                    f"{name}: {result['throughput']} req/s (baseline {base['throughput']} req/s)"
+                )
+            if None not in (result["queries"], base["queries"]) and result["queries"] > base["queries"] + 0.5:
+                regressions.append(f"{name}: {result['queries']} queries (baseline {base['queries']})")
+
+        if regressions:
+            for line in regressions:
+                self.stderr.write(f"REGRESSION {line}")
+            raise CommandError(f"{len(regressions)} regression(s) against {path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {path}"))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.counters import reconcile_service_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount services per category and repair service_count / "
+        "active_service_count where they drifted. Categories are locked "
+        "while they are recounted, so it is safe to run while serving."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category", type=int, action="append", dest="categories",
+            help="Only reconcile this category id (repeatable).",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report drifted categories.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drifted = reconcile_service_counts(options["categories"], dry_run=options["dry_run"])
+
+        for pk, (total, active), (actual_total, actual_active) in drifted:
+            self.stdout.write(
+                f"category {pk}: service_count {total} -> {actual_total}, "
+                f"active_service_count {active} -> {actual_active}"
+            )
+        verb = "would be repaired" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {len(drifted)} categories {verb} in {time.perf_counter() - started:.1f}s"
+        ))
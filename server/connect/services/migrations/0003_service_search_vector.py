@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-18 11:40
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# GIN indexes only exist on Postgres; other databases fall back to the
+# in-memory index in services.search. The trigram indexes match the
+# UPPER(col::text) LIKE form Django emits for icontains/istartswith, which
+# also serves the admin search_fields.
+SEARCH_INDEXES = [
+    (
+        "services_service_search_vector_gin",
+        "CREATE INDEX IF NOT EXISTS services_service_search_vector_gin "
+        "ON services_service USING gin (search_vector)",
+    ),
+    (
+        "services_service_name_trgm",
+        "CREATE INDEX IF NOT EXISTS services_service_name_trgm "
+        "ON services_service USING gin (UPPER(service_name::text) gin_trgm_ops)",
+    ),
+    (
+        "services_category_name_trgm",
+        "CREATE INDEX IF NOT EXISTS services_category_name_trgm "
+        "ON services_servicecategory USING gin (UPPER(category_name::text) gin_trgm_ops)",
+    ),
+]
+
+BACKFILL = """
+UPDATE services_service AS s SET search_vector =
+    setweight(to_tsvector(%(config)s, coalesce(s.service_name, '')), 'A') ||
+    setweight(to_tsvector(%(config)s, coalesce(s.description, '')), 'B') ||
+    setweight(to_tsvector(%(config)s, coalesce(c.category_name, '')), 'C')
+FROM services_servicecategory AS c
+WHERE c.id = s.category_id
+"""
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(BACKFILL, {"config": settings.CATALOG_SEARCH_CONFIG})
+    for _, sql in SEARCH_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_service_updated_at_servicecategory_updated_at'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-18 13:05
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='service',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='service',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('service_name'), models.F('category'), name='unique_service_name_per_category_ci', violation_error_message='This service already exists in the selected category.'),
+        ),
+    ]
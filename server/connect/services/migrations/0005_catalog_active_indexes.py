@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_service_name_unique_ci'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['category', 'is_active', 'service_name', 'id'], name='service_cat_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['service_name', 'id'], name='service_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicecategory',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category_name', 'id'], name='category_active_name_idx'),
+        ),
+    ]
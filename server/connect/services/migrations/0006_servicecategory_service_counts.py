@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    ServiceCategory = apps.get_model("services", "ServiceCategory")
+    Service = apps.get_model("services", "Service")
+
+    def counted(**filters):
+        services = (
+            Service.objects.filter(category=OuterRef("pk"), **filters)
+            .values("category").annotate(n=Count("id")).values("n")
+        )
+        return Coalesce(Subquery(services), 0)
+
+    ServiceCategory.objects.update(
+        service_count=counted(),
+        active_service_count=counted(is_active=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_catalog_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicecategory',
+            name='active_service_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='servicecategory',
+            name='service_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,14 @@
-from django.db import models
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .cache import catalog_cache
+
+COUNTER_FIELDS = ("service_count", "active_service_count")
 
 
 class ServiceCategory(models.Model):
@@ -6,15 +16,131 @@ class ServiceCategory(models.Model):
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by Service and ServiceQuerySet writes (see
+    # adjust_service_counts); repaired by `manage.py reconcile_service_counts`.
+    service_count = models.PositiveIntegerField(default=0, editable=False)
+    active_service_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = "Service Category"
         verbose_name_plural = "Service Categories"
         ordering = ["category_name"]
+        indexes = [
+            # ?is_active=true lists in list/keyset order.
+            models.Index(
+                fields=["category_name", "id"],
+                condition=Q(is_active=True),
+                name="category_active_name_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.category_name
 
+    def save(self, *args, **kwargs):
+        # A full save would write back counters read before concurrent
+        # service writes moved them.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+# =====================================================
+# 🔽 SERVICE COUNTERS
+# =====================================================
+def count_deltas(rows, sign):
+    """
+    ``(category_id, is_active)`` pairs of services added (sign 1) or
+    removed (sign -1), as ``{category_id: [total, active]}`` changes.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for category_id, is_active in rows:
+        deltas[category_id][0] += sign
+        if is_active:
+            deltas[category_id][1] += sign
+    return deltas
+
+
+def adjust_service_counts(*changes):
+    """
+    Apply ``count_deltas`` results to the category counters inside the
+    caller's transaction. updated_at moves too, so category list ETags and
+    cache entries that embed the counts change with them.
+    """
+    merged = defaultdict(lambda: [0, 0])
+    for deltas in changes:
+        for category_id, (total, active) in deltas.items():
+            merged[category_id][0] += total
+            merged[category_id][1] += active
+    merged = {pk: delta for pk, delta in merged.items() if delta != [0, 0]}
+    if not merged:
+        return
+
+    now = timezone.now()
+    # Ascending id order, so writers touching several categories lock
+    # them in the same order and can't deadlock.
+    for category_id in sorted(merged):
+        total, active = merged[category_id]
+        ServiceCategory.objects.filter(pk=category_id).update(
+            service_count=F("service_count") + total,
+            active_service_count=F("active_service_count") + active,
+            updated_at=now,
+        )
+    transaction.on_commit(lambda: catalog_cache.invalidate(ServiceCategory))
+
+
+class ServiceQuerySet(models.QuerySet):
+    """
+    Keeps the category counters right for bulk writes: ``bulk_create``,
+    ``update`` (and so ``bulk_update``) of ``is_active``/``category``, and
+    ``delete``. Affected rows are locked first, so concurrent writers
+    can't both count the same change.
+    """
+
+    def _counted_rows(self, lock=True):
+        queryset = self.select_for_update(of=("self",)) if lock else self
+        return list(queryset.order_by("pk").values_list("pk", "category_id", "is_active"))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            adjust_service_counts(count_deltas(((s.category_id, s.is_active) for s in created), 1))
+        return created
+
+    def update(self, **kwargs):
+        if not {"is_active", "category", "category_id"} & kwargs.keys():
+            return super().update(**kwargs)
+
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            before = self._counted_rows()
+            pks = [pk for pk, _, _ in before]
+            updated = super().update(**kwargs)
+            after = self.model.objects.using(self.db).filter(pk__in=pks)._counted_rows(lock=False)
+            adjust_service_counts(
+                count_deltas((row[1:] for row in before), -1),
+                count_deltas((row[1:] for row in after), 1),
+            )
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            rows = self._counted_rows()
+            deleted = super().delete()
+            adjust_service_counts(count_deltas((row[1:] for row in rows), -1))
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Service(models.Model):
     category = models.ForeignKey(
@@ -26,12 +152,72 @@ class Service(models.Model):
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Weighted name/description/category tsvector, kept current by
+    # services.search on Postgres and unused elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ServiceQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Service"
         verbose_name_plural = "Services"
         ordering = ["service_name"]
-        unique_together = ("category", "service_name")
+        indexes = [
+            # ?category= lists, filtered on is_active and read in
+            # service_name order (keyset pagination adds id) without a sort.
+            models.Index(
+                fields=["category", "is_active", "service_name", "id"],
+                name="service_cat_active_name_idx",
+            ),
+            # ?is_active=true lists across all categories.
+            models.Index(
+                fields=["service_name", "id"],
+                condition=Q(is_active=True),
+                name="service_active_name_idx",
+            ),
+        ]
+        # Case-insensitive per category; enforced by a functional unique
+        # index rather than a pre-insert query (see ServiceSerializer).
+        constraints = [
+            models.UniqueConstraint(
+                Lower("service_name"),
+                "category",
+                name="unique_service_name_per_category_ci",
+                violation_error_message="This service already exists in the selected category.",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.service_name} ({self.category.category_name})"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        adding = self._state.adding
+        counted_fields = {"is_active", "category", "category_id"}
+        if not adding and update_fields is not None and not counted_fields & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get("using") or router.db_for_write(Service, instance=self)
+        with transaction.atomic(using=using):
+            old = None if adding else self._counted_row(using)
+            super().save(*args, **kwargs)
+            adjust_service_counts(
+                count_deltas([old] if old else [], -1),
+                count_deltas([(self.category_id, self.is_active)], 1),
+            )
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(Service, instance=self)
+        with transaction.atomic(using=using):
+            old = self._counted_row(using)
+            deleted = super().delete(*args, **kwargs)
+            adjust_service_counts(count_deltas([old] if old else [], -1))
+        return deleted
+
+    def _counted_row(self, using):
+        # The stored row, locked: the in-memory instance may be stale.
+        return (
+            Service.objects.using(using).select_for_update().filter(pk=self.pk)
+            .values_list("category_id", "is_active").first()
+        )
@@ -0,0 +1,203 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination:
+    """
+    Keyset ("seek") pagination over a fixed, unique ordering such as
+    ``("service_name", "id")``.
+
+    Each page is fetched with a ``WHERE (a, b) > (x, y) ORDER BY a, b LIMIT n``
+    style query, so the cost of a page does not grow with its depth the way
+    ``OFFSET`` does. Cursors are opaque base64 tokens holding the position of
+    the row a page starts after (or, going backwards, before).
+
+    Pagination is opt-in: it is only applied when the request carries a
+    ``cursor`` or ``page_size`` parameter, so existing clients keep getting
+    the plain list. Requests may be DRF requests or, for the async views,
+    plain ``HttpRequest`` objects.
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+
+    def is_requested(self, request):
+        params = request.GET
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.CATALOG_PAGE_SIZE
+        if page_size <= 0:
+            return settings.CATALOG_PAGE_SIZE
+        return min(page_size, settings.CATALOG_MAX_PAGE_SIZE)
+
+    # -------------------------------------------------
+    # Cursor encoding
+    # -------------------------------------------------
+    def encode_cursor(self, position, reverse=False):
+        payload = json.dumps({"p": list(position), "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.GET.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    # -------------------------------------------------
+    # Query building
+    # -------------------------------------------------
+    def seek(self, position, reverse):
+        """
+        Build the filter for rows strictly after (or before) ``position``.
+        The leading column gets its own range condition so the planner can
+        use it as an index bound.
+        """
+        op = "lt" if reverse else "gt"
+        first = self.ordering[0]
+        condition = Q()
+        for i in range(len(self.ordering) - 1, -1, -1):
+            equal = {field: position[j] for j, field in enumerate(self.ordering[:i])}
+            step = Q(**equal, **{f"{self.ordering[i]}__{op}": position[i]})
+            condition = step if i == len(self.ordering) - 1 else step | condition
+        return Q(**{f"{first}__{op}e": position[0]}) & condition
+
+    def clean_position(self, model, position):
+        """
+        Convert a decoded cursor position to the ordering fields' types.
+        Cursors come from the client, so a value the field rejects (or a
+        null, which no ordering column holds) is an invalid cursor rather
+        than a query error.
+        """
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def position(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.ordering]
+        return [getattr(row, field) for field in self.ordering]
+
+    def _page_queryset(self, queryset, position, reverse):
+        if reverse:
+            queryset = queryset.order_by(*(f"-{field}" for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            position = self.clean_position(queryset.model, position)
+            queryset = queryset.filter(self.seek(position, reverse))
+        return queryset
+
+    def _page(self, rows, page_size, position, reverse):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            # The next page starts after this page's last row, not after
+            # the cursor row, which would skip the row at ``position``.
+            next_cursor = self.encode_cursor(self.position(rows[-1])) if rows else None
+            previous_cursor = (
+                self.encode_cursor(self.position(rows[0]), reverse=True)
+                if has_more and rows else None
+            )
+        else:
+            next_cursor = self.encode_cursor(self.position(rows[-1])) if has_more else None
+            previous_cursor = (
+                self.encode_cursor(self.position(rows[0]), reverse=True)
+                if position is not None and rows else None
+            )
+        return rows, next_cursor, previous_cursor
+
+    def paginate(self, queryset, request):
+        """
+        Return ``(rows, next_cursor, previous_cursor)`` for the requested
+        page. ``queryset`` may be a model or ``values()`` queryset; it must
+        expose every ordering field.
+        """
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        queryset = self._page_queryset(queryset, position, reverse)
+        rows = list(queryset[:page_size + 1])
+        return self._page(rows, page_size, position, reverse)
+
+    async def apaginate(self, queryset, request):
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        queryset = self._page_queryset(queryset, position, reverse)
+        rows = [row async for row in queryset[:page_size + 1]]
+        return self._page(rows, page_size, position, reverse)
+
+    def get_page(self, queryset, request, serializer_class):
+        """
+        Paginate and serialize in one step, keeping the cursors raw so the
+        result can be cached independently of the host it was requested on.
+        """
+        rows, next_cursor, previous_cursor = self.paginate(queryset, request)
+        return {
+            "results": serializer_class(rows, many=True).data,
+            "next": next_cursor,
+            "previous": previous_cursor,
+        }
+
+    async def aget_page(self, queryset, request, serializer_class):
+        rows, next_cursor, previous_cursor = await self.apaginate(queryset, request)
+        return {
+            "results": serializer_class(rows, many=True).data,
+            "next": next_cursor,
+            "previous": previous_cursor,
+        }
+
+    def cache_params(self, request):
+        return {
+            "cursor": request.GET.get(self.cursor_query_param, ""),
+            "page_size": self.get_page_size(request),
+        }
+
+    def get_link(self, request, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(
+            request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def get_paginated_data(self, request, page):
+        """
+        The body for a page produced by ``get_page``, with absolute links.
+        """
+        return {
+            "next": self.get_link(request, page["next"]),
+            "previous": self.get_link(request, page["previous"]),
+            "results": page["results"],
+        }
+
+    def get_paginated_response(self, request, page):
+        return Response(self.get_paginated_data(request, page))
@@ -0,0 +1,178 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery
+
+from connect.routers import reading_primary
+
+from .cache import catalog_cache
+from .models import ServiceCategory, Service
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Same relative weights Postgres' ts_rank uses for labels A, B and C.
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def uses_postgres():
+    return connection.vendor == "postgresql"
+
+
+# =====================================================
+# 🔽 POSTGRES FULL-TEXT SEARCH
+# =====================================================
+def service_search_vector():
+    config = settings.CATALOG_SEARCH_CONFIG
+    category_name = Subquery(
+        ServiceCategory.objects.filter(pk=OuterRef("category_id")).values("category_name")[:1]
+    )
+    return (
+        SearchVector("service_name", weight="A", config=config)
+        + SearchVector("description", weight="B", config=config)
+        + SearchVector(category_name, weight="C", config=config)
+    )
+
+
+def update_search_vectors(services):
+    """
+    Recompute ``Service.search_vector`` for ``services`` in one UPDATE.
+    A no-op outside Postgres, where the in-memory index is used instead.
+    """
+    if uses_postgres():
+        services.update(search_vector=service_search_vector())
+
+
+def _postgres_search(q, prefix, limit):
+    config = settings.CATALOG_SEARCH_CONFIG
+    if prefix:
+        # Every word is matched as a prefix; tokens are \w+ so they are safe
+        # to splice into a raw tsquery.
+        raw = " & ".join(f"{token}:*" for token in tokenize(q))
+        query = SearchQuery(raw, search_type="raw", config=config)
+        match = Q(search_vector=query) | Q(service_name__istartswith=q)
+        categories = ServiceCategory.objects.filter(category_name__istartswith=q)
+    else:
+        query = SearchQuery(q, search_type="websearch", config=config)
+        match = Q(search_vector=query)
+        categories = ServiceCategory.objects.filter(category_name__icontains=q)
+
+    services = (
+        Service.objects.select_related("category")
+        .filter(match)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "service_name", "id")[:limit]
+    )
+    return list(categories[:limit]), list(services)
+
+
+# =====================================================
+# 🔽 IN-MEMORY FALLBACK INDEX
+# =====================================================
+class InMemorySearchIndex:
+    """
+    Pure-Python inverted index used when the database is not Postgres
+    (SQLite test runs). Postings map each lowercase token to document
+    scores; a sorted token list answers prefix queries with ``bisect``.
+
+    The index is rebuilt lazily whenever the catalog cache versions of
+    ``ServiceCategory`` or ``Service`` move.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._services = {}
+        self._categories = {}
+        self._tokens = []
+
+    def _build(self):
+        services = defaultdict(lambda: defaultdict(float))
+        categories = defaultdict(lambda: defaultdict(float))
+
+        rows = Service.objects.values_list(
+            "id", "service_name", "description", "category__category_name"
+        )
+        for pk, name, description, category_name in rows.iterator(chunk_size=2000):
+            for weight, text in (("A", name), ("B", description), ("C", category_name)):
+                for token in tokenize(text):
+                    services[token][pk] += WEIGHTS[weight]
+
+        for pk, name in ServiceCategory.objects.values_list("id", "category_name"):
+            for token in tokenize(name):
+                categories[token][pk] += WEIGHTS["A"]
+
+        self._services = {token: dict(docs) for token, docs in services.items()}
+        self._categories = {token: dict(docs) for token, docs in categories.items()}
+        self._tokens = sorted(set(self._services) | set(self._categories))
+
+    def _ensure_current(self):
+        version = (catalog_cache.version(ServiceCategory), catalog_cache.version(Service))
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    with reading_primary():
+                        self._build()
+                    self._version = version
+
+    def _expand(self, token, prefix):
+        if not prefix:
+            return [token]
+        start = bisect_left(self._tokens, token)
+        matches = []
+        for candidate in self._tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def _score(self, postings, tokens, prefix):
+        scores = None
+        for token in tokens:
+            token_scores = defaultdict(float)
+            for term in self._expand(token, prefix):
+                for pk, score in postings.get(term, {}).items():
+                    token_scores[pk] += score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {pk: scores[pk] + s for pk, s in token_scores.items() if pk in scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def search(self, q, prefix, limit):
+        self._ensure_current()
+        tokens = tokenize(q)
+        results = []
+        for model, postings in ((ServiceCategory, self._categories), (Service, self._services)):
+            scores = self._score(postings, tokens, prefix)
+            ranked = heapq.nlargest(limit, scores, key=lambda pk: (scores[pk], -pk))
+            queryset = model.objects.all()
+            if model is Service:
+                queryset = queryset.select_related("category")
+            objects = queryset.in_bulk(ranked)
+            results.append([objects[pk] for pk in ranked if pk in objects])
+        return results
+
+
+memory_index = InMemorySearchIndex()
+
+
+def search_catalog(q, prefix=False, limit=20):
+    """
+    Return ``(categories, services)`` matching ``q``, best match first.
+    ``prefix`` treats every word as a prefix, for typeahead.
+    """
+    if uses_postgres():
+        return _postgres_search(q, prefix, limit)
+    return memory_index.search(q, prefix, limit)
@@ -1,4 +1,9 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from connect.instrumentation import timed_serialization
+
 from .models import ServiceCategory, Service
 
 
@@ -10,9 +15,11 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
             "category_name",
             "description",
             "is_active",
+            "service_count",
+            "active_service_count",
             "created_at",
         ]
-        read_only_fields = ("id", "created_at")
+        read_only_fields = ("id", "service_count", "active_service_count", "created_at")
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -34,27 +41,113 @@ class ServiceSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ("id", "created_at")
 
-    def validate(self, attrs):
+    # Name of the functional unique index on (lower(service_name), category).
+    unique_constraint = "unique_service_name_per_category_ci"
+    duplicate_message = "This service already exists in the selected category."
+
+    def create(self, validated_data):
+        return self._save_unique(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_unique(super().update, instance, validated_data)
+
+    def _save_unique(self, save, *args):
         """
-        Prevent duplicate service names under the same category
+        Let the database enforce case-insensitive uniqueness and turn its
+        IntegrityError into the validation error clients already expect.
         """
-        category = attrs.get("category")
-        service_name = attrs.get("service_name")
-
-        if self.instance:
-            exists = Service.objects.filter(
-                category=category,
-                service_name__iexact=service_name
-            ).exclude(id=self.instance.id).exists()
-        else:
-            exists = Service.objects.filter(
-                category=category,
-                service_name__iexact=service_name
-            ).exists()
-
-        if exists:
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as exc:
+            if self.unique_constraint not in str(exc):
+                raise
             raise serializers.ValidationError(
-                "This service already exists in the selected category."
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.duplicate_message]}
             )
 
-        return attrs
+
+# =====================================================
+# 🔽 FAST READ SERIALIZERS
+# =====================================================
+class FastReadSerializer:
+    """
+    Read-only stand-in for a ModelSerializer on list endpoints.
+
+    The field mapping is compiled once from ``serializer_class``: each
+    readable field becomes a ``values_list()`` lookup (``source`` dots turned
+    into ``__`` joins) plus, for the few field types that reformat their
+    value, that field's own ``to_representation``. Rows are then built from
+    plain tuples instead of model instances and per-field dispatch, and
+    render to the same JSON as ``serializer_class``.
+    """
+    serializer_class = None
+
+    PASSTHROUGH_FIELDS = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.PrimaryKeyRelatedField,
+        serializers.ReadOnlyField,
+    )
+    CONVERTED_FIELDS = (
+        serializers.DateTimeField,
+        serializers.DateField,
+        serializers.DecimalField,
+    )
+
+    def __init__(self, instance=None, many=False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def compiled(cls):
+        if "_compiled" not in cls.__dict__:
+            keys, lookups, converters = [], [], []
+            for name, field in cls.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if isinstance(field, cls.CONVERTED_FIELDS):
+                    converters.append((name, field.to_representation))
+                elif not isinstance(field, cls.PASSTHROUGH_FIELDS):
+                    raise TypeError(
+                        f"{cls.__name__} cannot compile {type(field).__name__} '{name}'"
+                    )
+                keys.append(name)
+                lookups.append(field.source.replace(".", "__"))
+            cls._compiled = (tuple(keys), tuple(lookups), tuple(converters))
+        return cls._compiled
+
+    @classmethod
+    def rows(cls, queryset):
+        """
+        Turn a model queryset into the ``values_list`` rows this serializer
+        reads. Rows are named tuples, so paginators can read ordering fields
+        by attribute.
+        """
+        _, lookups, _ = cls.compiled()
+        return queryset.values_list(*lookups, named=True)
+
+    @classmethod
+    def to_representation(cls, row):
+        keys, _, converters = cls.compiled()
+        item = dict(zip(keys, row))
+        for key, convert in converters:
+            if item[key] is not None:
+                item[key] = convert(item[key])
+        return item
+
+    @property
+    @timed_serialization
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class FastServiceCategorySerializer(FastReadSerializer):
+    serializer_class = ServiceCategorySerializer
+
+
+class FastServiceSerializer(FastReadSerializer):
+    serializer_class = ServiceSerializer
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import catalog_cache, catalog_invalidated
+from .models import ServiceCategory, Service
+from .search import update_search_vectors
+from .snapshot import snapshot_scheduler
+
+
+# =====================================================
+# 🔽 CATALOG CACHE INVALIDATION
+# =====================================================
+# Saves and deletes from the views, the admin and plain ORM calls all go
+# through these signals. Queryset ``update()`` and ``bulk_create()`` do not,
+# so callers using them must invalidate explicitly.
+@receiver([post_save, post_delete], sender=ServiceCategory)
+def invalidate_categories(sender, **kwargs):
+    transaction.on_commit(lambda: catalog_cache.invalidate(ServiceCategory))
+
+
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_services(sender, **kwargs):
+    transaction.on_commit(lambda: catalog_cache.invalidate(Service))
+
+
+# =====================================================
+# 🔽 SEARCH VECTOR MAINTENANCE
+# =====================================================
+@receiver(post_save, sender=Service)
+def refresh_service_search_vector(sender, instance, **kwargs):
+    update_search_vectors(Service.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=ServiceCategory)
+def refresh_category_search_vectors(sender, instance, created, **kwargs):
+    # The category name is part of every one of its services' vectors.
+    if not created:
+        update_search_vectors(instance.services.all())
+
+
+# =====================================================
+# 🔽 CATALOG SNAPSHOT
+# =====================================================
+# Every path that changes the catalog ends in catalog_cache.invalidate,
+# including the bulk and counter updates that send no model signals.
+@receiver(catalog_invalidated)
+def rebuild_catalog_snapshot(sender, **kwargs):
+    snapshot_scheduler.schedule()
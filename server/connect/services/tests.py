@@ -1,3 +1,1328 @@
-from django.test import TestCase
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.handlers.base import BaseHandler
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from connect import instrumentation, renderers
+from connect.metrics import pool_stats
+from connect.parsers import FastJSONParser
+from connect.middleware import PerformanceMiddleware, PrimaryPinningMiddleware
+from connect.renderers import FastJSONRenderer, NDJSONRenderer
+from connect.routers import ReplicaRouter, RoutingState, reading_primary, routing_state
+from users.cache import user_cache
+from users.models import User
+
+from . import async_views, bulk, checks, search, snapshot, views
+from .management.commands import loadtest
+from .cache import catalog_cache
+from .models import ServiceCategory, Service
+from .serializers import (
+    FastReadSerializer,
+    FastServiceCategorySerializer,
+    FastServiceSerializer,
+    ServiceCategorySerializer,
+    ServiceSerializer,
+)
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        catalog_cache.reset_stats()
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = ServiceCategory.objects.create(category_name="Plumbing")
+            Service.objects.create(category=self.category, service_name="Leak repair")
+
+    def test_second_read_is_served_from_cache(self):
+        url = reverse("get-all-service-categories")
+        first = self.client.get(url)
+        # The conditional GET validator is a cache read too.
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(catalog_cache.stats()["hits"], 1)
+        self.assertEqual(catalog_cache.stats()["misses"], 1)
+
+    def test_orm_save_invalidates_categories(self):
+        url = reverse("get-all-service-categories")
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.category_name = "Plumbing & Drains"
+            self.category.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()[0]["category_name"], "Plumbing & Drains")
+
+    def test_category_rename_invalidates_services(self):
+        views.GetServices(self.factory.get("/"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.category_name = "Drains"
+            self.category.save()
+
+        response = views.GetServices(self.factory.get("/"))
+        self.assertEqual(response.data[0]["category_name"], "Drains")
+
+    def test_delete_invalidates_service_by_id(self):
+        service = Service.objects.get()
+        self.assertEqual(views.GetServiceById(self.factory.get("/"), pk=service.pk).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            service.delete()
+
+        self.assertEqual(views.GetServiceById(self.factory.get("/"), pk=service.pk).status_code, 404)
+
+    @override_settings(WEB_CONCURRENCY=2)
+    def test_process_local_cache_fails_checks_with_several_workers(self):
+        self.assertEqual([error.id for error in checks.check_catalog_cache(None)], ["services.E001"])
+
+    @override_settings(WEB_CONCURRENCY=2, DEBUG=False, CACHES={
+        **settings.CACHES,
+        "catalog": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://127.0.0.1:6379/1"},
+    })
+    def test_shared_cache_passes_checks(self):
+        self.assertEqual(checks.check_catalog_cache(None), [])
+
+    @override_settings(UNCONFIGURED_CACHES={"catalog": "CATALOG_CACHE_URL"})
+    def test_unset_cache_url_fails_checks_without_debug(self):
+        self.assertEqual([error.id for error in checks.check_catalog_cache(None)], ["services.E002"])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.client = APIClient()
+        self.url = reverse("get-all-service-categories")
+        self.category = ServiceCategory.objects.create(category_name="Plumbing")
+
+    def test_matching_etag_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertIn("ETag", first)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], first["ETag"])
+
+    def test_matching_last_modified_returns_304(self):
+        url = reverse("get-category", args=[self.category.pk])
+        first = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_revalidates_on_etag_only(self):
+        newest = ServiceCategory.objects.create(category_name="Electrical")
+        first = self.client.get(self.url)
+        self.assertFalse(first.has_header("Last-Modified"))
+
+        # Deleting the newest row moves Max(updated_at) back in time.
+        with self.captureOnCommitCallbacks(execute=True):
+            newest.delete()
+        since = http_date(time.time() + 60)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_change_produces_new_etag(self):
+        first = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceCategory.objects.create(category_name="Electrical")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_list_revalidation_runs_no_queries(self):
+        for url in (self.url, reverse("get-all-services") + "?is_active=true"):
+            first = self.client.get(url)
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(response.status_code, 304)
+
+    def test_missing_category_is_not_conditional(self):
+        response = views.GetServiceCategoryById(APIRequestFactory().get("/"), pk=999)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header("ETag"))
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.factory = APIRequestFactory()
+        categories = [
+            ServiceCategory.objects.create(category_name=name)
+            for name in ("Cleaning", "Plumbing")
+        ]
+        # Duplicate names across categories exercise the id tie-breaker.
+        for category in categories:
+            for name in ("Alpha", "Bravo", "Charlie"):
+                Service.objects.create(category=category, service_name=name)
+        self.expected = list(
+            Service.objects.order_by("service_name", "id").values_list("id", flat=True)
+        )
+
+    def get(self, query):
+        response = views.GetServices(self.factory.get("/services/", query))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def cursor(self, link):
+        return dict(part.split("=", 1) for part in link.split("?", 1)[1].split("&"))["cursor"]
+
+    def test_plain_list_without_opt_in(self):
+        self.assertIsInstance(self.get({}), list)
+
+    def test_walks_forward_and_back(self):
+        page = self.get({"page_size": 4})
+        self.assertIsNone(page["previous"])
+        seen = [row["id"] for row in page["results"]]
+
+        page = self.get({"page_size": 4, "cursor": self.cursor(page["next"])})
+        self.assertIsNone(page["next"])
+        seen += [row["id"] for row in page["results"]]
+        self.assertEqual(seen, self.expected)
+
+        page = self.get({"page_size": 4, "cursor": self.cursor(page["previous"])})
+        self.assertEqual([row["id"] for row in page["results"]], self.expected[:4])
+        self.assertIsNone(page["previous"])
+
+    def test_next_after_previous_returns_every_row_once(self):
+        page = self.get({"page_size": 2})
+        while page["next"]:
+            page = self.get({"page_size": 2, "cursor": self.cursor(page["next"])})
+        self.assertEqual([row["id"] for row in page["results"]], self.expected[4:])
+
+        page = self.get({"page_size": 2, "cursor": self.cursor(page["previous"])})
+        self.assertEqual([row["id"] for row in page["results"]], self.expected[2:4])
+        page = self.get({"page_size": 2, "cursor": self.cursor(page["previous"])})
+        self.assertEqual([row["id"] for row in page["results"]], self.expected[:2])
+
+        seen = [row["id"] for row in page["results"]]
+        while page["next"]:
+            page = self.get({"page_size": 2, "cursor": self.cursor(page["next"])})
+            seen += [row["id"] for row in page["results"]]
+        self.assertEqual(seen, self.expected)
+
+    @override_settings(CATALOG_MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.get({"page_size": 100})["results"]), 2)
+
+    def test_invalid_cursor_is_404(self):
+        response = views.GetServices(self.factory.get("/services/", {"cursor": "garbage"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_is_404(self):
+        paginator = views.service_pagination
+        for position in (["a", "x"], [None, None], ["a", [1]]):
+            cursor = paginator.encode_cursor(position)
+            with self.subTest(position=position):
+                response = views.GetServices(self.factory.get("/services/", {"cursor": cursor}))
+                self.assertEqual(response.status_code, 404)
+
+
+class ActiveCatalogIndexTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.factory = APIRequestFactory()
+        self.plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+        self.retired = ServiceCategory.objects.create(category_name="Retired", is_active=False)
+        Service.objects.create(category=self.plumbing, service_name="Repair")
+        Service.objects.create(category=self.plumbing, service_name="Legacy", is_active=False)
+        Service.objects.create(category=self.retired, service_name="Gone", is_active=False)
+
+    def names(self, view, query):
+        response = view(self.factory.get("/", query))
+        self.assertEqual(response.status_code, 200)
+        rows = response.data["results"] if "page_size" in query else response.data
+        return [row.get("service_name") or row.get("category_name") for row in rows]
+
+    def test_is_active_filter(self):
+        self.assertEqual(self.names(views.GetServices, {"is_active": "true"}), ["Repair"])
+        self.assertEqual(self.names(views.GetServices, {"is_active": "false"}), ["Gone", "Legacy"])
+        self.assertEqual(
+            self.names(views.GetServices, {"is_active": "false", "category": self.plumbing.pk}), ["Legacy"]
+        )
+        self.assertEqual(self.names(views.GetServices, {"is_active": "maybe"}), ["Gone", "Legacy", "Repair"])
+        self.assertEqual(self.names(views.GetServices, {"is_active": "1", "page_size": 5}), ["Repair"])
+        self.assertEqual(self.names(views.GetServiceCategories, {"is_active": "true"}), ["Plumbing"])
+        # Filtered and unfiltered lists are cached separately.
+        self.assertEqual(self.names(views.GetServiceCategories, {}), ["Plumbing", "Retired"])
+
+
+@skipUnless(connection.vendor == "postgresql", "asserts Postgres query plans")
+class ActiveCatalogPlanTests(TestCase):
+    def setUp(self):
+        self.plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+        Service.objects.create(category=self.plumbing, service_name="Repair")
+
+    def plan(self, queryset):
+        # Tiny test tables would otherwise always be scanned sequentially.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        return queryset.explain()
+
+    def assertReadsIndex(self, queryset, index):
+        plan = self.plan(queryset)
+        self.assertIn(index, plan)
+        self.assertNotIn("Sort", plan)
+
+    def test_active_pages_read_partial_indexes_in_order(self):
+        page = views.service_pagination._page_queryset(Service.objects.filter(is_active=True), None, False)
+        self.assertReadsIndex(page[:21], "service_active_name_idx")
+        page = views.category_pagination._page_queryset(
+            ServiceCategory.objects.filter(is_active=True), None, False
+        )
+        self.assertReadsIndex(page[:21], "category_active_name_idx")
+
+    def test_category_page_reads_composite_index_in_order(self):
+        services = Service.objects.filter(category_id=self.plumbing.pk, is_active=True)
+        page = views.service_pagination._page_queryset(services, ["Legacy", 0], False)
+        self.assertReadsIndex(page[:21], "service_cat_active_name_idx")
+
+    def test_role_filter_reads_role_index(self):
+        self.assertIn("users_user_role_idx", self.plan(User.objects.filter(role="agent")))
+
+
+class CatalogSearchTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.client = APIClient()
+        self.url = reverse("catalog-search")
+        with self.captureOnCommitCallbacks(execute=True):
+            plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+            cleaning = ServiceCategory.objects.create(category_name="Cleaning")
+            Service.objects.create(
+                category=plumbing, service_name="Leak repair", description="Fix dripping taps"
+            )
+            Service.objects.create(
+                category=cleaning, service_name="Carpet cleaning", description="Deep clean"
+            )
+
+    def names(self, response):
+        return [row["service_name"] for row in response.json()["services"]]
+
+    def test_full_text_matches_description_and_category(self):
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "taps"})), ["Leak repair"])
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "plumbing"})), ["Leak repair"])
+
+    def test_prefix_mode_for_typeahead(self):
+        response = self.client.get(self.url, {"q": "car", "mode": "prefix"})
+        self.assertEqual(self.names(response), ["Carpet cleaning"])
+
+        response = self.client.get(self.url, {"q": "clea", "mode": "prefix"})
+        self.assertEqual([row["category_name"] for row in response.json()["categories"]], ["Cleaning"])
+
+    def test_results_follow_catalog_changes(self):
+        self.client.get(self.url, {"q": "boiler"})
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(
+                category=ServiceCategory.objects.get(category_name="Plumbing"),
+                service_name="Boiler service",
+            )
+        self.assertEqual(self.names(self.client.get(self.url, {"q": "boiler"})), ["Boiler service"])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+@override_settings(STREAM_CHUNK_SIZE=2)
+class CatalogTreeTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.client = APIClient()
+        self.url = reverse("catalog-tree")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+            self.cleaning = ServiceCategory.objects.create(category_name="Cleaning")
+            ServiceCategory.objects.create(category_name="Retired", is_active=False)
+            for name in ("Pipe fitting", "Leak repair"):
+                Service.objects.create(category=self.plumbing, service_name=name)
+            Service.objects.create(category=self.plumbing, service_name="Lead pipes", is_active=False)
+            Service.objects.create(category=self.cleaning, service_name="Carpet cleaning")
+
+    def names(self, tree):
+        return {
+            category["category_name"]: [service["service_name"] for service in category["services"]]
+            for category in tree
+        }
+
+    def test_nests_services_with_two_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 2)
+
+        tree = response.json()
+        self.assertEqual([c["category_name"] for c in tree], ["Cleaning", "Plumbing", "Retired"])
+        self.assertEqual(
+            self.names(tree)["Plumbing"], ["Lead pipes", "Leak repair", "Pipe fitting"]
+        )
+        self.assertEqual(tree[1]["service_count"], 3)
+        self.assertNotIn("category_name", tree[1]["services"][0])
+
+        flat = views.GetServices(APIRequestFactory().get("/", {"category": self.plumbing.pk})).data
+        expected = [{k: v for k, v in row.items() if k not in ("category", "category_name")} for row in flat]
+        self.assertEqual(tree[1]["services"], expected)
+
+    def test_is_active_filter_and_sparse_fields(self):
+        response = self.client.get(
+            self.url, {"is_active": "true", "fields": "id,category_name", "service_fields": "service_name"}
+        )
+        self.assertEqual(response.status_code, 200)
+        tree = response.json()
+        self.assertEqual(
+            self.names(tree), {"Cleaning": ["Carpet cleaning"], "Plumbing": ["Leak repair", "Pipe fitting"]}
+        )
+        self.assertEqual(set(tree[0]), {"id", "category_name", "services"})
+        self.assertEqual(tree[0]["services"], [{"service_name": "Carpet cleaning"}])
+
+        response = self.client.get(self.url, {"service_fields": "service_name,price"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Unknown fields: price"})
+
+    def test_cached_and_conditional(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).json(), first.json())
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(category=self.cleaning, service_name="Window cleaning")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Window cleaning", self.names(response.json())["Cleaning"])
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overrides = override_settings(CATALOG_SNAPSHOT_DIR=self.directory, CATALOG_SNAPSHOT_DEBOUNCE=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.url = reverse("catalog-snapshot")
+        self.plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+        Service.objects.create(category=self.plumbing, service_name="Leak repair")
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        # Exhausting streaming_content closes the file (the client wraps it).
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def tree(self):
+        return self.client.get(reverse("catalog-tree")).json()
+
+    def test_builds_on_first_request_then_serves_files_without_queries(self):
+        self.assertIsNone(snapshot.current_snapshot())
+        response, body = self.get(**{"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(body)), self.tree())
+
+        with CaptureQueriesContext(connection) as queries:
+            response, body = self.get()
+        self.assertEqual(len(queries), 0)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(json.loads(body), self.tree())
+
+    def test_negotiation_and_etags(self):
+        identity, _ = self.get()
+        gzipped, _ = self.get(**{"Accept-Encoding": "br;q=0, gzip;q=0.5, identity;q=0.1"})
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertNotEqual(gzipped["ETag"], identity["ETag"])
+        if snapshot.brotli is not None:
+            response, body = self.get(**{"Accept-Encoding": "gzip, deflate, br"})
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertEqual(json.loads(snapshot.brotli.decompress(body)), self.tree())
+
+        response, _ = self.get(**{"Accept-Encoding": "gzip", "If-None-Match": gzipped["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], gzipped["ETag"])
+
+    def test_writes_rebuild_and_prune(self):
+        first, _ = self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(category=self.plumbing, service_name="Pipe fitting")
+        second, body = self.get(**{"If-None-Match": first["ETag"]})
+        self.assertEqual(second.status_code, 200)
+        self.assertIn("Pipe fitting", body.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(category=self.plumbing, service_name="Boiler service")
+        versions = {name.split(".")[1] for name in os.listdir(self.directory) if name.startswith("catalog.")}
+        self.assertEqual(len(versions), 2)
+        self.assertNotIn(first["ETag"].strip('"'), versions)
+
+    @override_settings(CATALOG_SNAPSHOT_DEBOUNCE=2, CATALOG_SNAPSHOT_MAX_DELAY=30)
+    def test_changes_are_debounced(self):
+        scheduler = snapshot.SnapshotScheduler()
+        with mock.patch("services.snapshot.threading.Timer") as timer:
+            scheduler.schedule()
+            scheduler.schedule()
+        self.assertEqual(timer.call_count, 2)
+        timer.return_value.cancel.assert_called_once()
+        self.assertLessEqual(timer.call_args.args[0], 2)
+        self.assertIsNone(snapshot.current_snapshot())
+
+    def test_without_a_directory_serves_the_tree(self):
+        with override_settings(CATALOG_SNAPSHOT_DIR=None):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.tree())
+
+    def test_negotiate_encoding(self):
+        available = ["br", "gzip", "identity"]
+        self.assertEqual(views.negotiate_encoding("", available), "identity")
+        self.assertEqual(views.negotiate_encoding("gzip, br", available), "br")
+        self.assertEqual(views.negotiate_encoding("*", ["gzip", "identity"]), "gzip")
+        self.assertEqual(views.negotiate_encoding("gzip;q=0, *;q=0.2", ["gzip", "identity"]), "identity")
+        self.assertIsNone(views.negotiate_encoding("identity;q=0", ["identity"]))
+
+
+class StreamingListTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.client = APIClient()
+        category = ServiceCategory.objects.create(category_name="Plumbing")
+        for name in ("Boiler service", "Leak repair", "Pipe \u2028 fitting"):
+            Service.objects.create(category=category, service_name=name)
+        self.factory = APIRequestFactory()
+
+    def stream(self, query):
+        response = views.GetServices(self.factory.get("/services/", query))
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_json_stream_matches_regular_response(self):
+        regular = views.GetServices(self.factory.get("/services/"))
+        regular.render()
+        self.assertEqual(self.stream({"stream": "json"}), regular.content)
+
+    def test_formats_negotiated_by_accept_have_distinct_etags(self):
+        url = reverse("get-all-service-categories")
+        plain = self.client.get(url)
+        ndjson = self.client.get(url, HTTP_ACCEPT="application/x-ndjson")
+        self.assertTrue(ndjson.streaming)
+        self.assertNotEqual(plain["ETag"], ndjson["ETag"])
+        for response in (plain, ndjson):
+            self.assertIn("Accept", response["Vary"])
+
+        # The JSON validator must not answer an NDJSON request with a 304.
+        response = self.client.get(url, HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        response = self.client.get(url, HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=ndjson["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_ndjson_renderer(self):
+        self.assertEqual(NDJSONRenderer().render([{"a": 1}, {"b": "\u2028"}]), b'{"a":1}\n{"b":"\\u2028"}\n')
+        self.assertEqual(NDJSONRenderer().render({"detail": "x"}), b'{"detail":"x"}\n')
+
+    def test_ndjson_stream(self):
+        lines = self.stream({"stream": "ndjson"}).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)["service_name"] for line in lines],
+            ["Boiler service", "Leak repair", "Pipe \u2028 fitting"],
+        )
+
+
+class FastSerializerParityTests(TestCase):
+    def setUp(self):
+        plumbing = ServiceCategory.objects.create(category_name="Plumbing", description=None)
+        cafes = ServiceCategory.objects.create(
+            category_name="Café & bakery", description="Ünïcode “quotes”", is_active=False
+        )
+        Service.objects.create(category=plumbing, service_name="Leak repair")
+        Service.objects.create(
+            category=cafes, service_name="Crème brûlée", description="Line\nbreak", is_active=False
+        )
+
+    def assertRendersIdentically(self, serializer_class, fast_class, queryset):
+        render = JSONRenderer().render
+        expected = render(serializer_class(queryset, many=True).data)
+        actual = render(fast_class(fast_class.rows(queryset), many=True).data)
+        self.assertEqual(actual, expected)
+
+    def test_category_list(self):
+        self.assertRendersIdentically(
+            ServiceCategorySerializer, FastServiceCategorySerializer, ServiceCategory.objects.all()
+        )
+
+    def test_service_list(self):
+        self.assertRendersIdentically(
+            ServiceSerializer, FastServiceSerializer, Service.objects.select_related("category")
+        )
+
+    def test_filtered_service_list(self):
+        self.assertRendersIdentically(
+            ServiceSerializer,
+            FastServiceSerializer,
+            Service.objects.filter(category__category_name="Plumbing"),
+        )
+
+    def test_unsupported_field_is_rejected(self):
+        class WithMethodField(ServiceSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta(ServiceSerializer.Meta):
+                fields = ServiceSerializer.Meta.fields + ["label"]
+
+        class FastWithMethodField(FastReadSerializer):
+            serializer_class = WithMethodField
+
+        with self.assertRaises(TypeError):
+            FastWithMethodField.compiled()
+
+
+class FastJSONParityTests(TestCase):
+    """
+    FastJSONRenderer/FastJSONParser must be byte-for-byte interchangeable
+    with DRF's stdlib JSONRenderer/JSONParser, with and without orjson.
+    """
+
+    def assertRendersIdentically(self, data, media_type="application/json"):
+        expected = JSONRenderer().render(data, media_type)
+        self.assertEqual(FastJSONRenderer().render(data, media_type), expected)
+        with mock.patch("connect.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(data, media_type), expected)
+
+    def parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(BytesIO(body), "application/json", {"encoding": encoding})
+
+    def test_scalar_and_container_types(self):
+        tz = datetime.timezone(datetime.timedelta(hours=3))
+        self.assertRendersIdentically({
+            "utc": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "offset": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=tz),
+            "naive": datetime.datetime(2024, 5, 1, 12, 30),
+            "date": datetime.date(2024, 5, 1),
+            "time": datetime.time(8, 15, 0, 500),
+            "delta": datetime.timedelta(hours=1, seconds=5),
+            "decimal": Decimal("1234.50"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "lazy": gettext_lazy("Services"),
+            "tuple": (1, 2.5, None, True),
+            "set": {3},
+            "int keys": {1: "one", 2: "two"},
+            "bytes": b"raw",
+            "float": 0.1,
+            "large": 2 ** 63 - 1,
+        })
+
+    def test_strings(self):
+        self.assertRendersIdentically([
+            "Crème brûlée", "“quotes”", "emoji 🔧", "line\nbreak\ttab", "quote \" back\\slash",
+            "control \x00\x1f\x7f", "separators \u2028 \u2029", "</script>",
+        ])
+
+    def test_fallbacks(self):
+        # Integers beyond 64 bits and indented output go through the stdlib.
+        self.assertRendersIdentically({"big": 2 ** 70, "negative": -(2 ** 64)})
+        self.assertRendersIdentically({"a": [1, {"b": 2}]}, "application/json; indent=4")
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_floats(self):
+        floats = [
+            0.1, -2.5, 123456789012345.6, 9999999999999998.0, 1e16, -1e22, 1.5e300,
+            1.2345678901234568e17, 1.7976931348623157e308, 0.0001, 0.0001234, 1e-5,
+            2.5e-5, 1.234e-5, 1e-7, 5e-324,
+        ]
+        self.assertRendersIdentically(floats)
+        self.assertRendersIdentically({"price": 1e16, "nested": [{"ratio": 1e-7}]})
+        self.assertRendersIdentically(1e16)
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_floats_in_other_orjson_spellings(self):
+        # Older orjson releases write large floats without the exponent sign.
+        for data, spelled in (([1e16], b"[1e16]"), ({"a": 1.5e300}, b'{"a":1.5e300}'), (1e-5, b"0.00001")):
+            with self.subTest(spelled=spelled), mock.patch.object(renderers.orjson, "dumps", return_value=spelled):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_api_responses(self):
+        category = ServiceCategory.objects.create(category_name="Café", description="Ünïcode")
+        Service.objects.create(category=category, service_name="Leak repair", description="Line\nbreak")
+        user = User.objects.create_user(username="parity", password="x", email="parity@example.com")
+        client = APIClient()
+        client.force_authenticate(user)
+        for url in (
+            reverse("get-all-service-categories"),
+            reverse("catalog-tree"),
+            reverse("catalog-search") + "?q=leak",
+            reverse("service-provider-fetch"),
+        ):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parser_matches_json_parser(self):
+        for body in (
+            '{"a": [1, 2.5, -3e2, null, true], "b": {"c": "Crème \\u2028"}}',
+            '[]',
+            '"plain"',
+            '{"big": 123456789012345678901234567890}',
+        ):
+            body = body.encode()
+            self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+        latin1 = '{"name": "Crème"}'.encode("latin-1")
+        self.assertEqual(self.parse(FastJSONParser(), latin1, "latin-1"), {"name": "Crème"})
+
+    def test_parser_errors_match_json_parser(self):
+        for body in (b'{"a": 1,}', b'{"a": NaN}', b''):
+            with self.assertRaises(ParseError) as expected:
+                self.parse(JSONParser(), body)
+            with self.assertRaises(ParseError) as actual:
+                self.parse(FastJSONParser(), body)
+            self.assertEqual(str(actual.exception.detail), str(expected.exception.detail))
+
+    def test_bulk_endpoint_uses_fast_parser(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username="bulk", password="x"))
+        response = client.post(
+            reverse("service-category-bulk"), b'[{"category_name": "Heating"}]', content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(ServiceCategory.objects.filter(category_name="Heating").exists())
+
+    @override_settings(FAST_JSON=False)
+    def test_bench_json_command(self):
+        out = StringIO()
+        call_command("bench_json", "--rows", "50", "--repeat", "2", stdout=out)
+        self.assertIn("render", out.getvalue())
+        self.assertIn("parse", out.getvalue())
+
+
+class ServiceUniquenessTests(TestCase):
+    def setUp(self):
+        self.category = ServiceCategory.objects.create(category_name="Plumbing")
+        Service.objects.create(category=self.category, service_name="Leak repair")
+        self.user = User.objects.create_user(
+            username="admin@example.com", email="admin@example.com", password="x", role="admin"
+        )
+        self.factory = APIRequestFactory()
+
+    def post(self, data):
+        request = self.factory.post("/", data, format="json")
+        force_authenticate(request, user=self.user)
+        return views.CreateService(request)
+
+    def test_duplicate_differing_in_case_is_rejected(self):
+        response = self.post({"category": self.category.pk, "service_name": "LEAK Repair"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data,
+            {"non_field_errors": ["This service already exists in the selected category."]},
+        )
+        self.assertEqual(Service.objects.count(), 1)
+
+    def test_same_name_in_other_category_is_allowed(self):
+        other = ServiceCategory.objects.create(category_name="Heating")
+        response = self.post({"category": other.pk, "service_name": "Leak repair"})
+        self.assertEqual(response.status_code, 201)
+
+    def test_validation_runs_no_duplicate_query(self):
+        serializer = ServiceSerializer(data={"category": self.category.pk, "service_name": "Drains"})
+        # Only the category primary key lookup remains.
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+
+@skipUnless(connection.vendor == "postgresql", "needs concurrent writers on Postgres")
+class ConcurrentServiceCreateTests(TransactionTestCase):
+    def test_parallel_writers_create_one_row(self):
+        category = ServiceCategory.objects.create(category_name="Plumbing")
+        names = ["Leak repair", "LEAK REPAIR", "leak repair", "Leak Repair", "lEAK rEPAIR", "Leak rePair"]
+        barrier = threading.Barrier(len(names))
+        outcomes = []
+
+        def write(name):
+            try:
+                serializer = ServiceSerializer(data={"category": category.pk, "service_name": name})
+                serializer.is_valid(raise_exception=True)
+                barrier.wait()
+                serializer.save()
+                outcomes.append("created")
+            except serializers.ValidationError:
+                outcomes.append("duplicate")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=write, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ["created"] + ["duplicate"] * (len(names) - 1))
+        self.assertEqual(Service.objects.count(), 1)
+
+
+class BulkCatalogTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.user = User.objects.create_user(
+            username="admin@example.com", email="admin@example.com", password="x", role="admin"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = ServiceCategory.objects.create(category_name="Plumbing")
+        Service.objects.create(category=self.category, service_name="Leak repair")
+
+    def rows(self, n):
+        return [{"category": self.category.pk, "service_name": f"Service {i}"} for i in range(n)]
+
+    def test_create_from_json_array(self):
+        response = self.client.post(reverse("service-bulk"), self.rows(3), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(Service.objects.count(), 4)
+
+    def test_create_from_ndjson_upload(self):
+        body = "\n".join(json.dumps(row) for row in self.rows(2)) + "\n"
+        response = self.client.post(
+            reverse("service-bulk"), body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Service.objects.count(), 3)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        rows = self.rows(200)
+        with self.captureOnCommitCallbacks(execute=True):
+            created = bulk.bulk_create_services(rows[:10])
+        self.assertEqual(len(created), 10)
+        with CaptureQueriesContext(connection) as queries:
+            bulk.bulk_create_services(rows[10:])
+        selects = [q for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), 2)
+
+    def test_duplicates_are_reported_per_row_and_nothing_is_written(self):
+        rows = self.rows(2) + [
+            {"category": self.category.pk, "service_name": "LEAK REPAIR"},
+            {"category": self.category.pk, "service_name": "service 0"},
+            {"category": 999, "service_name": "Orphan"},
+        ]
+        response = self.client.post(reverse("service-bulk"), rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [2, 3, 4])
+        self.assertEqual(Service.objects.count(), 1)
+
+    def test_invalid_rows_are_reported(self):
+        response = self.client.post(
+            reverse("service-category-bulk"), [{"category_name": "Heating"}, {}], format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["index"], 1)
+        self.assertFalse(ServiceCategory.objects.filter(category_name="Heating").exists())
+
+    def test_set_active_and_delete(self):
+        service = Service.objects.get()
+        response = self.client.patch(
+            reverse("service-bulk"), [{"id": service.pk, "is_active": False}], format="json"
+        )
+        self.assertEqual(response.json(), {"updated": 1})
+        service.refresh_from_db()
+        self.assertFalse(service.is_active)
+
+        response = self.client.delete(reverse("service-bulk"), {"ids": [service.pk]}, format="json")
+        self.assertEqual(response.json(), {"deleted": 1})
+        self.assertFalse(Service.objects.exists())
+
+    def test_bulk_create_invalidates_catalog_cache(self):
+        url = reverse("get-all-service-categories")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("service-category-bulk"), [{"category_name": "Heating"}], format="json")
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+
+class ServiceCountTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.plumbing = ServiceCategory.objects.create(category_name="Plumbing")
+        self.cleaning = ServiceCategory.objects.create(category_name="Cleaning")
+
+    def counts(self, category):
+        category.refresh_from_db()
+        return category.service_count, category.active_service_count
+
+    def test_instance_writes(self):
+        service = Service.objects.create(category=self.plumbing, service_name="Leak repair")
+        Service.objects.create(category=self.plumbing, service_name="Old", is_active=False)
+        self.assertEqual(self.counts(self.plumbing), (2, 1))
+
+        service.is_active = False
+        service.save()
+        self.assertEqual(self.counts(self.plumbing), (2, 0))
+
+        service.category = self.cleaning
+        service.save(update_fields=["category"])
+        self.assertEqual(self.counts(self.plumbing), (1, 0))
+        self.assertEqual(self.counts(self.cleaning), (1, 0))
+
+        service.delete()
+        self.assertEqual(self.counts(self.cleaning), (0, 0))
+
+    def test_bulk_writes(self):
+        created = bulk.bulk_create_services([
+            {"category": self.plumbing.pk, "service_name": f"Service {i}", "is_active": i % 2 == 0}
+            for i in range(4)
+        ])
+        self.assertEqual(self.counts(self.plumbing), (4, 2))
+
+        bulk.bulk_set_active(Service, [{"id": s.pk, "is_active": True} for s in created])
+        self.assertEqual(self.counts(self.plumbing), (4, 4))
+
+        Service.objects.filter(pk=created[0].pk).update(category=self.cleaning, is_active=False)
+        self.assertEqual(self.counts(self.plumbing), (3, 3))
+        self.assertEqual(self.counts(self.cleaning), (1, 0))
+
+        bulk.bulk_delete(Service, [s.pk for s in created[:2]])
+        self.assertEqual(self.counts(self.plumbing), (2, 2))
+        self.assertEqual(self.counts(self.cleaning), (0, 0))
+
+    def test_stale_category_save_keeps_counts(self):
+        stale = ServiceCategory.objects.get(pk=self.plumbing.pk)
+        Service.objects.create(category=self.plumbing, service_name="Leak repair")
+        stale.description = "Pipes"
+        stale.save()
+        self.assertEqual(self.counts(self.plumbing), (1, 1))
+
+    def test_counts_are_listed_and_change_the_etag(self):
+        client = APIClient()
+        first = client.get(reverse("get-all-service-categories"))
+        self.assertEqual(first.json()[1]["service_count"], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(category=self.plumbing, service_name="Leak repair")
+        second = client.get(reverse("get-all-service-categories"))
+        self.assertNotEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.json()[1]["service_count"], 1)
+        self.assertEqual(second.json()[1]["active_service_count"], 1)
+
+    def test_reconcile_repairs_drift(self):
+        Service.objects.create(category=self.plumbing, service_name="Leak repair")
+        ServiceCategory.objects.filter(pk=self.cleaning.pk).update(service_count=5)
+
+        out = StringIO()
+        call_command("reconcile_service_counts", "--dry-run", stdout=out)
+        self.assertIn(f"category {self.cleaning.pk}: service_count 5 -> 0", out.getvalue())
+        self.assertEqual(self.counts(self.cleaning), (5, 0))
+
+        call_command("reconcile_service_counts", stdout=StringIO())
+        self.assertEqual(self.counts(self.cleaning), (0, 0))
+        self.assertEqual(self.counts(self.plumbing), (1, 1))
+
+
+class AsyncCatalogViewTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        self.factory = AsyncRequestFactory()
+        with self.captureOnCommitCallbacks(execute=True):
+            category = ServiceCategory.objects.create(category_name="Plumbing")
+            for name in ("Boiler service", "Leak repair", "Pipe fitting"):
+                Service.objects.create(category=category, service_name=name)
+        self.service = Service.objects.get(service_name="Leak repair")
+
+    async def sync_json(self, view, query=None, **kwargs):
+        response = await sync_to_async(view)(APIRequestFactory().get("/", query), **kwargs)
+        return json.loads(response.render().content), response
+
+    async def test_lists_match_sync_views(self):
+        for sync_view, async_view, query in (
+            (views.GetServiceCategories, async_views.GetServiceCategories, None),
+            (views.GetServices, async_views.GetServices, None),
+            (views.GetServices, async_views.GetServices, {"category": self.service.category_id}),
+            (views.GetServices, async_views.GetServices, {"page_size": 2}),
+            (views.GetServices, async_views.GetServices, {"is_active": "true"}),
+            (views.GetServiceCategories, async_views.GetServiceCategories, {"is_active": "false"}),
+        ):
+            expected, sync_response = await self.sync_json(sync_view, query)
+            response = await async_view(self.factory.get("/", query))
+            self.assertEqual(response.status_code, 200)
+            # Same renderer, so the same bytes, not just equal JSON.
+            self.assertEqual(response.content, sync_response.content)
+            self.assertEqual(response["Content-Type"], sync_response["Content-Type"])
+            self.assertEqual(response["ETag"], sync_response["ETag"])
+            self.assertIn("Accept", response["Vary"])
+
+    async def test_service_by_id_and_missing_service(self):
+        _, expected = await self.sync_json(views.GetServiceById, pk=self.service.pk)
+        response = await async_views.GetServiceById(self.factory.get("/"), pk=self.service.pk)
+        self.assertEqual(response.content, expected.content)
+
+        _, expected = await self.sync_json(views.GetServiceById, pk=999)
+        response = await async_views.GetServiceById(self.factory.get("/"), pk=999)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_head_is_answered_like_the_sync_views(self):
+        for sync_view, async_view, kwargs in (
+            (views.GetServiceCategories, async_views.GetServiceCategories, {}),
+            (views.GetServices, async_views.GetServices, {}),
+            (views.GetServiceById, async_views.GetServiceById, {"pk": self.service.pk}),
+        ):
+            expected = await sync_to_async(sync_view)(APIRequestFactory().head("/"), **kwargs)
+            response = await async_view(self.factory.head("/"), **kwargs)
+            self.assertEqual(expected.status_code, 200)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["ETag"], expected["ETag"])
+
+    async def test_unacceptable_accept_is_406(self):
+        response = await async_views.GetServiceCategories(self.factory.get("/", headers={"Accept": "image/png"}))
+        self.assertEqual(response.status_code, 406)
+
+    def test_every_read_is_routed(self):
+        self.assertEqual(resolve(reverse("get-all-services")).func, views.GetServices)
+        self.assertEqual(
+            resolve(reverse("get-service", args=[self.service.pk])).func, views.GetServiceById
+        )
+
+    async def test_matching_etag_returns_304(self):
+        first = await async_views.GetServiceCategories(self.factory.get("/"))
+        response = await async_views.GetServiceCategories(
+            self.factory.get("/", headers={"If-None-Match": first["ETag"]})
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_stream_and_invalid_cursor(self):
+        response = await async_views.GetServices(self.factory.get("/", {"stream": "ndjson"}))
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(
+            [json.loads(row)["service_name"] for row in b"".join(lines).decode().splitlines()],
+            ["Boiler service", "Leak repair", "Pipe fitting"],
+        )
+
+        response = await async_views.GetServices(self.factory.get("/", {"cursor": "!!"}))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(METRICS_TOKEN="metrics-secret")
+class DatabasePoolMetricsTests(TestCase):
+    def test_only_the_metrics_token_sees_pool_stats(self):
+        url = reverse("db-pool-metrics")
+        # The peer address proves nothing behind a reverse proxy.
+        self.assertEqual(APIClient(REMOTE_ADDR="127.0.0.1").get(url).status_code, 404)
+        self.assertEqual(APIClient(HTTP_X_METRICS_TOKEN="wrong").get(url).status_code, 404)
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(APIClient(HTTP_X_METRICS_TOKEN="").get(url).status_code, 404)
+
+        response = APIClient(HTTP_X_METRICS_TOKEN="metrics-secret").get(url)
+        self.assertEqual(response.status_code, 200)
+        # Pools only exist when DATABASES OPTIONS["pool"] is set (DB_POOL).
+        self.assertEqual(response.json(), {"pools": pool_stats()})
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1", "replica_2"], REPLICA_SELECTION="round_robin")
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def route(self, state, model=Service):
+        token = routing_state.set(state)
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            routing_state.reset(token)
+
+    def test_safe_reads_rotate_over_replicas(self):
+        state = RoutingState()
+        self.assertEqual(
+            [self.route(state) for _ in range(3)], ["replica_1", "replica_2", "replica_1"]
+        )
+
+    def test_primary_outside_requests_for_other_apps_and_when_pinned(self):
+        self.assertEqual(self.router.db_for_read(Service), "default")
+        self.assertEqual(self.route(RoutingState(), model=Session), "default")
+        self.assertEqual(self.route(RoutingState(use_primary=True)), "default")
+
+    def test_write_pins_rest_of_request(self):
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            self.assertEqual(self.router.db_for_write(Service), "default")
+            self.assertEqual(self.router.db_for_read(Service), "default")
+        finally:
+            routing_state.reset(token)
+        self.assertTrue(state.wrote)
+
+    @override_settings(REPLICA_SELECTION="least_lag", REPLICA_MAX_LAG=5.0)
+    def test_least_lag_skips_replicas_that_are_behind(self):
+        lags = {"replica_1": 2.0, "replica_2": 0.5}
+        with mock.patch("connect.routers.measure_lag", side_effect=lags.__getitem__):
+            self.assertEqual(self.route(RoutingState()), "replica_2")
+            self.router._lag.clear()
+            lags.update(replica_1=0.1, replica_2=60.0)
+            self.assertEqual(self.route(RoutingState()), "replica_1")
+            self.router._lag.clear()
+            lags.update(replica_1=float("inf"))
+            self.assertEqual(self.route(RoutingState()), "default")
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "services"))
+        self.assertFalse(self.router.allow_migrate("replica_1", "services"))
+
+
+# "lagging_replica" isn't a configured database, so any read routed to it
+# fails instead of quietly returning rows from before the last write.
+@override_settings(DATABASE_REPLICAS=["lagging_replica"], REPLICA_SELECTION="round_robin")
+class CacheFillsReadPrimaryTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        user_cache.clear_local()
+        self.category = ServiceCategory.objects.create(category_name="Plumbing")
+        self.user = User.objects.create_user(
+            username="fill@example.com", email="fill@example.com", password="x"
+        )
+        token = routing_state.set(RoutingState())
+        self.addCleanup(routing_state.reset, token)
+
+    def names(self):
+        return list(ServiceCategory.objects.values_list("category_name", flat=True))
+
+    def test_other_reads_still_go_to_the_replica(self):
+        with reading_primary():
+            self.assertEqual(ReplicaRouter().db_for_read(Service), "default")
+        self.assertEqual(ReplicaRouter().db_for_read(Service), "lagging_replica")
+
+    def test_catalog_cache_builds_after_invalidate_read_primary(self):
+        self.category.category_name = "Plumbing & heating"
+        self.category.save()
+        catalog_cache.invalidate(ServiceCategory)
+        # The write pinned this request; the next one fills the cache.
+        token = routing_state.set(RoutingState())
+        self.addCleanup(routing_state.reset, token)
+        self.assertEqual(
+            catalog_cache.get_or_set("names", self.names, models=[ServiceCategory]), ["Plumbing & heating"]
+        )
+
+    async def test_async_catalog_cache_builds_read_primary(self):
+        async def build():
+            return await sync_to_async(self.names)()
+
+        # setUp's context doesn't reach the async test.
+        token = routing_state.set(RoutingState())
+        try:
+            names = await catalog_cache.aget_or_set("names", build, models=[ServiceCategory])
+        finally:
+            routing_state.reset(token)
+        self.assertEqual(names, ["Plumbing"])
+
+    def test_user_cache_loads_read_primary(self):
+        user = user_cache.get(self.user.pk, lambda: User.objects.get(pk=self.user.pk))
+        self.assertEqual(user.email, "fill@example.com")
+        email = user_cache.get_or_set(self.user.pk, "email", lambda: User.objects.get(pk=self.user.pk).email)
+        self.assertEqual(email, "fill@example.com")
+
+    def test_search_index_builds_from_primary(self):
+        index = search.InMemorySearchIndex()
+        index._ensure_current()
+        self.assertEqual(index._categories["plumbing"], {self.category.pk: search.WEIGHTS["A"]})
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class PrimaryPinningMiddlewareTests(TestCase):
+    def respond(self, request, write=False):
+        seen = {}
+
+        def get_response(request):
+            if write:
+                ReplicaRouter().db_for_write(Service)
+            seen["use_primary"] = routing_state.get().use_primary
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(get_response)(request)
+        return response, seen["use_primary"]
+
+    def test_reads_use_replicas_until_a_write_sets_the_pin_cookie(self):
+        factory = RequestFactory()
+        response, use_primary = self.respond(factory.get("/"))
+        self.assertFalse(use_primary)
+        self.assertNotIn("primary_pin", response.cookies)
+
+        response, use_primary = self.respond(factory.patch("/"), write=True)
+        self.assertTrue(use_primary)
+        self.assertEqual(response.cookies["primary_pin"]["max-age"], 10)
+
+        factory.cookies["primary_pin"] = "1"
+        _, use_primary = self.respond(factory.get("/"))
+        self.assertTrue(use_primary)
+        self.assertIsNone(routing_state.get())
+
+    async def test_async_chain(self):
+        async def get_response(request):
+            ReplicaRouter().db_for_write(Service)
+            return HttpResponse()
+
+        response = await PrimaryPinningMiddleware(get_response)(AsyncRequestFactory().get("/"))
+        self.assertIn("primary_pin", response.cookies)
+
+
+@override_settings(METRICS_TOKEN="metrics-secret")
+class PerformanceInstrumentationTests(TestCase):
+    def setUp(self):
+        catalog_cache.backend.clear()
+        for histogram in instrumentation.HISTOGRAMS.values():
+            histogram.clear()
+        ServiceCategory.objects.create(category_name="Plumbing")
+        self.client = APIClient(HTTP_X_METRICS_TOKEN="metrics-secret")
+
+    def test_server_timing_and_route_histograms(self):
+        response = self.client.get(reverse("get-all-service-categories"))
+        timing = response["Server-Timing"]
+        # The list query; the conditional GET validator is a cache read.
+        self.assertIn('desc="1 queries"', timing)
+        for metric in ("db;dur=", "serialize;dur=", "view;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+
+        series = instrumentation.HISTOGRAMS["queries"].snapshot()
+        counts, total, n = series[("get-all-service-categories", "GET")]
+        self.assertEqual((total, n), (1, 1))
+        size = instrumentation.HISTOGRAMS["size"].snapshot()[("get-all-service-categories", "GET")]
+        self.assertEqual(size[1], len(response.content))
+
+    def test_server_timing_is_internal_only(self):
+        response = APIClient().get(reverse("get-all-service-categories"))
+        self.assertFalse(response.has_header("Server-Timing"))
+        # Still recorded for the histograms.
+        series = instrumentation.HISTOGRAMS["queries"].snapshot()
+        self.assertEqual(series[("get-all-service-categories", "GET")][2], 1)
+
+    def test_prometheus_endpoint_is_internal_only(self):
+        self.client.get(reverse("get-all-service-categories"))
+        url = reverse("prometheus-metrics")
+        self.assertEqual(APIClient(REMOTE_ADDR="127.0.0.1").get(url).status_code, 404)
+
+        body = self.client.get(url).content.decode()
+        self.assertIn("# TYPE connect_request_duration_seconds histogram", body)
+        self.assertIn(
+            'connect_request_queries_bucket{route="get-all-service-categories",method="GET",le="+Inf"} 1',
+            body,
+        )
+
+    @override_settings(PERF_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_recorded(self):
+        response = self.client.get(reverse("get-all-service-categories"))
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(instrumentation.HISTOGRAMS["duration"].snapshot(), {})
+
+    def test_serializers_are_not_patched(self):
+        self.client.get(reverse("get-all-service-categories"))
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            self.assertFalse(hasattr(cls.data.fget, "__wrapped__"))
+
+    @override_settings(MIDDLEWARE=["connect.middleware.PerformanceMiddleware"])
+    def test_async_handler_runs_hooks_without_a_thread_hop(self):
+        handler = BaseHandler()
+        handler.load_middleware(is_async=True)
+        for hook in (*handler._view_middleware, *handler._template_response_middleware):
+            self.assertTrue(iscoroutinefunction(hook), hook)
+
+    async def test_async_requests_record_view_and_render_time(self):
+        response = await self.async_client.get(
+            reverse("get-all-service-categories"), headers={"X-Metrics-Token": "metrics-secret"}
+        )
+        self.assertIn("Server-Timing", response)
+        key = ("get-all-service-categories", "GET")
+        for name in ("view", "serialize"):
+            counts, total, n = instrumentation.HISTOGRAMS[name].snapshot()[key]
+            self.assertEqual(n, 1)
+            self.assertGreater(total, 0, name)
+
+    async def test_async_queries_are_attributed_to_the_request(self):
+        async def get_response(request):
+            await ServiceCategory.objects.acount()
+            return HttpResponse("ok")
+
+        request = AsyncRequestFactory().get("/", headers={"X-Metrics-Token": "metrics-secret"})
+        response = await PerformanceMiddleware(get_response)(request)
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+
+class LoadtestScenarioTests(TestCase):
+    def test_every_api_route_has_a_scenario(self):
+        from connect.urls import urlpatterns
+
+        def names(patterns):
+            for pattern in patterns:
+                if hasattr(pattern, "url_patterns"):
+                    if pattern.namespace != "admin":
+                        yield from names(pattern.url_patterns)
+                elif pattern.name and not str(pattern.pattern).startswith("internal/"):
+                    yield pattern.name
+
+        scenarios = loadtest.Command().scenarios()
+        routes = {name.partition(":")[0] for name, *_ in scenarios}
+        self.assertEqual(set(names(urlpatterns)) - routes, set())
+
+
+class LoadtestBaselineTests(TestCase):
+    def compare(self, result, base, threshold=0.2, run=None, recorded=None):
+        baseline = {"get-all-service-categories": base}
+        if recorded:
+            baseline["_run"] = recorded
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fh:
+            json.dump(baseline, fh)
+        self.addCleanup(os.unlink, fh.name)
+        command = loadtest.Command(stdout=StringIO(), stderr=StringIO())
+        command.compare({"get-all-service-categories": result}, fh.name, threshold, run)
+        return command
+
+    def test_regressions_fail_the_run(self):
+        base = {"throughput": 100.0, "p95_ms": 10.0, "queries": 2.0, "errors": 0}
+        self.compare({**base, "p95_ms": 11.9, "throughput": 81.0}, base)
+
+        for worse in ({"p95_ms": 12.5}, {"throughput": 70.0}, {"queries": 3.0}, {"errors": 1}):
+            with self.subTest(worse=worse), self.assertRaises(CommandError):
+                self.compare({**base, **worse}, base)
+
+    def test_baselines_from_other_settings_are_flagged(self):
+        base = {"throughput": 100.0, "p95_ms": 10.0, "queries": 2.0, "errors": 0}
+        run = {"requests": 200, "concurrency": 8}
+        command = self.compare(base, base, run=run, recorded=run)
+        self.assertEqual(command.stderr.getvalue(), "")
+
+        command = self.compare(base, base, run=run, recorded={**run, "concurrency": 16})
+        self.assertIn("different concurrency", command.stderr.getvalue())
@@ -0,0 +1,107 @@
+import copy
+from itertools import groupby
+
+from rest_framework import serializers
+
+from .models import ServiceCategory, Service
+from .serializers import FastServiceCategorySerializer, FastServiceSerializer
+
+# Nested services sit under their category, so the category reference and
+# name they carry in the flat list would only repeat their parent.
+NESTED_SERVICE_EXCLUDED = ("category", "category_name")
+
+
+class UnknownFields(ValueError):
+    pass
+
+
+def category_fields():
+    keys, _, _ = FastServiceCategorySerializer.compiled()
+    return keys
+
+
+def service_fields():
+    keys, _, _ = FastServiceSerializer.compiled()
+    return tuple(key for key in keys if key not in NESTED_SERVICE_EXCLUDED)
+
+
+def parse_fields(value, allowed):
+    """
+    ``?fields=a,b`` as a tuple in serializer order; ``None`` (or empty)
+    selects every allowed field. Raises UnknownFields for anything else.
+    """
+    if not value:
+        return allowed
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise UnknownFields(", ".join(sorted(unknown)))
+    return tuple(name for name in allowed if name in requested)
+
+
+def _projection(serializer_class, fields):
+    """
+    values_list lookups and converters for ``fields`` of a fast serializer,
+    so sparse requests also read fewer columns.
+    """
+    keys, lookups, converters = serializer_class.compiled()
+    lookup = dict(zip(keys, lookups))
+    converters = [(key, _pin_timezone(convert)) for key, convert in converters if key in fields]
+    return [lookup[key] for key in fields], converters
+
+
+def _pin_timezone(convert):
+    """
+    DateTimeField looks the current timezone up again for every value,
+    which dominates a 100k-row tree; resolve it once per build instead.
+    """
+    field = convert.__self__
+    if not isinstance(field, serializers.DateTimeField) or hasattr(field, "timezone"):
+        return convert
+    field = copy.copy(field)
+    field.timezone = field.default_timezone()
+    return field.to_representation
+
+
+def _render(keys, converters, row):
+    item = dict(zip(keys, row))
+    for key, convert in converters:
+        if item[key] is not None:
+            item[key] = convert(item[key])
+    return item
+
+
+def build_catalog_tree(filters=None, categories_fields=None, services_fields=None):
+    """
+    Every category, in list order, with its services nested under
+    ``"services"``, read with exactly two queries: the categories, then
+    all of their services ordered by category so they can be grouped in
+    one pass. ``filters`` (see views.active_filter) applies at both
+    levels; the field tuples select sparse output.
+    """
+    filters = filters or {}
+    categories_fields = categories_fields or category_fields()
+    services_fields = services_fields or service_fields()
+
+    category_lookups, category_converters = _projection(FastServiceCategorySerializer, categories_fields)
+    service_lookups, service_converters = _projection(FastServiceSerializer, services_fields)
+
+    categories = ServiceCategory.objects.filter(**filters).values_list("pk", *category_lookups)
+    services = (
+        Service.objects.filter(**filters)
+        .order_by("category_id", "service_name", "id")
+        .values_list("category_id", *service_lookups)
+    )
+
+    tree, by_id = [], {}
+    for row in categories:
+        item = _render(categories_fields, category_converters, row[1:])
+        item["services"] = by_id[row[0]] = []
+        tree.append(item)
+    # Services of categories the filter left out are skipped here rather
+    # than joined away in SQL, which keeps the services read a plain scan.
+    for category_id, rows in groupby(services.iterator(chunk_size=5000), key=lambda row: row[0]):
+        nested = by_id.get(category_id)
+        if nested is not None:
+            nested.extend(_render(services_fields, service_converters, row[1:]) for row in rows)
+    return tree
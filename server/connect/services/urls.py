@@ -1,13 +1,40 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Public catalog reads; ASYNC_VIEWS swaps in the async ORM variants
+# (serve with connect.asgi).
+if settings.ASYNC_VIEWS:
+    get_service_categories = async_views.GetServiceCategories
+    get_services = async_views.GetServices
+    get_service_by_id = async_views.GetServiceById
+else:
+    get_service_categories = views.GetServiceCategories
+    get_services = views.GetServices
+    get_service_by_id = views.GetServiceById
 
 urlpatterns = [
      # ===========================
     # Service Categories
     # ===========================
     path('add-new-category/', views.CreateServiceCategory, name='service-category-create'),
-    path('get-all-categories/', views.GetServiceCategories, name='get-all-service-categories'),
-    path("get-category/<int:pk>/", views.GetServiceCategoryById),
-    path("categories/<int:pk>/update/", views.UpdateServiceCategory),
-    path("categories/<int:pk>/delete/", views.DeleteServiceCategory),
+    path('get-all-categories/', get_service_categories, name='get-all-service-categories'),
+    path("get-category/<int:pk>/", views.GetServiceCategoryById, name="get-category"),
+    path("categories/<int:pk>/update/", views.UpdateServiceCategory, name="update-category"),
+    path("categories/<int:pk>/delete/", views.DeleteServiceCategory, name="delete-category"),
+    path("categories/bulk/", views.BulkServiceCategories, name="service-category-bulk"),
+
+    # ===========================
+    # Services
+    # ===========================
+    path("get-all-services/", get_services, name="get-all-services"),
+    path("get-service/<int:pk>/", get_service_by_id, name="get-service"),
+    path("bulk/", views.BulkServices, name="service-bulk"),
+    path("catalog-tree/", views.GetCatalogTree, name="catalog-tree"),
+    path("catalog-snapshot/", views.GetCatalogSnapshot, name="catalog-snapshot"),
+
+    # ===========================
+    # Search
+    # ===========================
+    path("search/", views.SearchCatalog, name="catalog-search"),
 ]
\ No newline at end of file
@@ -1,22 +1,139 @@
-from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_safe
+from rest_framework.decorators import api_view, parser_classes, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework import status
 
+from connect.conditional import conditional_view
+from connect.parsers import FastJSONParser, NDJSONParser
+from connect.renderers import NDJSONRenderer
+from connect.streaming import STREAM_VARY, requested_stream_format, stream_list
+
+from .bulk import (
+    BulkError,
+    bulk_create_categories,
+    bulk_create_services,
+    bulk_delete,
+    bulk_set_active,
+)
+from .cache import catalog_cache
 from .models import ServiceCategory, Service
-from .serializers import ServiceCategorySerializer, ServiceSerializer
+from .pagination import KeysetPagination
+from .search import search_catalog
+from .snapshot import snapshot_scheduler
+from .tree import UnknownFields, build_catalog_tree, category_fields, parse_fields, service_fields
+from .serializers import (
+    ServiceCategorySerializer,
+    ServiceSerializer,
+    FastServiceCategorySerializer,
+    FastServiceSerializer,
+)
+
+
+# =====================================================
+# 🔽 LIST FILTERS
+# =====================================================
+BOOLEAN_PARAMS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def active_filter(params):
+    """
+    ``?is_active=true|false`` as filter kwargs for the catalog lists. Active
+    reads are served by the partial indexes on ``is_active``; any other
+    value is ignored and everything is listed.
+    """
+    value = BOOLEAN_PARAMS.get(params.get("is_active", "").lower())
+    return {} if value is None else {"is_active": value}
+
+
+# =====================================================
+# 🔽 CONDITIONAL GET VALIDATORS
+# =====================================================
+# Cheap queries describing the current state of what a read view would
+# return; see connect.conditional.conditional_view. The list validators are
+# the catalog cache versions, which move on every committed catalog write
+# (deletes included) and cost a cache read each, so a cache hit or a 304
+# scans no table. The ETag adds the query string to them. Versions say
+# nothing about time, so lists send no Last-Modified.
+
+def categories_state(request):
+    return None, catalog_cache.version(ServiceCategory)
+
+
+def category_state(request, pk):
+    last_modified = ServiceCategory.objects.filter(pk=pk).values_list(
+        "updated_at", flat=True
+    ).first()
+    return (last_modified,) if last_modified else None
+
+
+def services_state(request):
+    # Category renames change the embedded category_name, so they count too.
+    return None, catalog_cache.version(ServiceCategory), catalog_cache.version(Service)
+
+
+def catalog_tree_state(request):
+    return None, catalog_cache.version(ServiceCategory), catalog_cache.version(Service)
+
+
+def service_state(request, pk):
+    row = Service.objects.filter(pk=pk).values_list(
+        "updated_at", "category__updated_at"
+    ).first()
+    return (max(row),) if row else None
+
+
+# Opt-in keyset pagination, ordered like Meta.ordering plus the PK.
+category_pagination = KeysetPagination(ordering=("category_name", "id"))
+service_pagination = KeysetPagination(ordering=("service_name", "id"))
 
 
 # =====================================================
 # 🔽 SERVICE CATEGORY VIEWS
 # =====================================================
 
-@api_view(['GET'])
+@api_view(['GET', 'HEAD'])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer])
 @permission_classes([AllowAny])
+@conditional_view(categories_state, vary=STREAM_VARY)
 def GetServiceCategories(request):
-    categories = ServiceCategory.objects.all()
-    serializer = ServiceCategorySerializer(categories, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # List reads go through the values_list-based fast serializer.
+    filters = active_filter(request.query_params)
+    categories = FastServiceCategorySerializer.rows(ServiceCategory.objects.filter(**filters))
+
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        return stream_list(
+            categories,
+            FastServiceCategorySerializer.to_representation,
+            stream_format,
+        )
+
+    if category_pagination.is_requested(request):
+        page = catalog_cache.get_or_set(
+            "categories-page",
+            lambda: category_pagination.get_page(
+                categories, request, FastServiceCategorySerializer
+            ),
+            models=(ServiceCategory,),
+            params={
+                "is_active": filters.get("is_active", ""),
+                **category_pagination.cache_params(request),
+            },
+        )
+        return category_pagination.get_paginated_response(request, page)
+
+    data = catalog_cache.get_or_set(
+        "categories",
+        lambda: FastServiceCategorySerializer(categories, many=True).data,
+        models=(ServiceCategory,),
+        params={"is_active": filters.get("is_active", "")},
+    )
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -79,33 +196,63 @@ def DeleteServiceCategory(request, pk):
 # =====================================================
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional_view(category_state)
 def GetServiceCategoryById(request, pk):
     try:
-        category = ServiceCategory.objects.get(pk=pk)
+        data = catalog_cache.get_or_set(
+            f"category:{pk}",
+            lambda: ServiceCategorySerializer(ServiceCategory.objects.get(pk=pk)).data,
+            models=(ServiceCategory,),
+        )
     except ServiceCategory.DoesNotExist:
         return Response(
             {"error": "Service category not found"},
             status=status.HTTP_404_NOT_FOUND
         )
 
-    serializer = ServiceCategorySerializer(category)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
 
 # =====================================================
 # 🔽 SERVICE VIEWS
 # =====================================================
 
-@api_view(['GET'])
+@api_view(['GET', 'HEAD'])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer])
 @permission_classes([AllowAny])
+@conditional_view(services_state, vary=STREAM_VARY)
 def GetServices(request):
-    services = Service.objects.select_related("category").all()
-
     category_id = request.query_params.get("category")
+    filters = active_filter(request.query_params)
+
+    services = Service.objects.filter(**filters)
     if category_id:
         services = services.filter(category_id=category_id)
+    services = FastServiceSerializer.rows(services)
+
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        return stream_list(services, FastServiceSerializer.to_representation, stream_format)
+
+    if service_pagination.is_requested(request):
+        page = catalog_cache.get_or_set(
+            "services-page",
+            lambda: service_pagination.get_page(services, request, FastServiceSerializer),
+            models=(ServiceCategory, Service),
+            params={
+                "category": category_id or "",
+                "is_active": filters.get("is_active", ""),
+                **service_pagination.cache_params(request),
+            },
+        )
+        return service_pagination.get_paginated_response(request, page)
 
-    serializer = ServiceSerializer(services, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    data = catalog_cache.get_or_set(
+        "services",
+        lambda: FastServiceSerializer(services, many=True).data,
+        models=(ServiceCategory, Service),
+        params={"category": category_id or "", "is_active": filters.get("is_active", "")},
+    )
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -166,16 +313,188 @@ def DeleteService(request, pk):
 # =====================================================
 # 🔽 GET SERVICE BY ID
 # =====================================================
-@api_view(['GET'])
+@api_view(['GET', 'HEAD'])
 @permission_classes([AllowAny])
+@conditional_view(service_state)
 def GetServiceById(request, pk):
     try:
-        service = Service.objects.select_related("category").get(pk=pk)
+        data = catalog_cache.get_or_set(
+            f"service:{pk}",
+            lambda: ServiceSerializer(Service.objects.select_related("category").get(pk=pk)).data,
+            models=(ServiceCategory, Service),
+        )
     except Service.DoesNotExist:
         return Response(
             {"error": "Service not found"},
             status=status.HTTP_404_NOT_FOUND
         )
 
-    serializer = ServiceSerializer(service)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+
+# =====================================================
+# 🔽 CATALOG SEARCH
+# =====================================================
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def SearchCatalog(request):
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return Response(
+            {"error": "Query parameter 'q' is required"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    prefix = request.query_params.get("mode") == "prefix"
+    try:
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        limit = 20
+    limit = max(1, min(limit, settings.CATALOG_SEARCH_MAX_RESULTS))
+
+    def build():
+        categories, services = search_catalog(query, prefix=prefix, limit=limit)
+        return {
+            "categories": ServiceCategorySerializer(categories, many=True).data,
+            "services": ServiceSerializer(services, many=True).data,
+        }
+
+    data = catalog_cache.get_or_set(
+        "search",
+        build,
+        models=(ServiceCategory, Service),
+        params={"q": query.lower(), "prefix": prefix, "limit": limit},
+    )
+    return Response(data, status=status.HTTP_200_OK)
+
+
+# =====================================================
+# 🔽 CATALOG TREE
+# =====================================================
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional_view(catalog_tree_state)
+def GetCatalogTree(request):
+    # One request (and two queries) instead of a GetServices call per category.
+    try:
+        categories_fields = parse_fields(request.query_params.get("fields"), category_fields())
+        services_fields = parse_fields(request.query_params.get("service_fields"), service_fields())
+    except UnknownFields as exc:
+        return Response(
+            {"error": f"Unknown fields: {exc}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    filters = active_filter(request.query_params)
+    data = catalog_cache.get_or_set(
+        "catalog-tree",
+        lambda: build_catalog_tree(filters, categories_fields, services_fields),
+        models=(ServiceCategory, Service),
+        params={
+            "is_active": filters.get("is_active", ""),
+            "fields": ",".join(categories_fields),
+            "service_fields": ",".join(services_fields),
+        },
+    )
+    return Response(data, status=status.HTTP_200_OK)
+
+
+# =====================================================
+# 🔽 CATALOG SNAPSHOT
+# =====================================================
+def accepted_encodings(header):
+    """
+    ``Accept-Encoding`` as ``{coding: q}``; identity stays acceptable
+    unless refused explicitly (RFC 9110, 12.5.3).
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    accepted.setdefault("identity", accepted.get("*", 1.0))
+    return accepted
+
+
+def negotiate_encoding(header, available):
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    # ``available`` is in server preference order; the client's q wins.
+    candidates = [(accepted.get(coding, wildcard), -i, coding) for i, coding in enumerate(available)]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+@require_safe
+def GetCatalogSnapshot(request):
+    # Anonymous catalog reads from prebuilt files: no queries, no
+    # serializers. Workers hand the file to the server's sendfile through
+    # wsgi.file_wrapper.
+    if not settings.CATALOG_SNAPSHOT_DIR:
+        return GetCatalogTree(request)
+
+    snapshot = snapshot_scheduler.ensure()
+    available = snapshot.encodings()
+    encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), available)
+    if encoding is None:
+        encoding = "identity"
+
+    etag = snapshot.etag(encoding)
+    tags = {tag.strip().removeprefix("W/") for tag in request.META.get("HTTP_IF_NONE_MATCH", "").split(",")}
+    if tags & {snapshot.etag(other) for other in available} or "*" in tags:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(snapshot.path(encoding).open("rb"), content_type="application/json")
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept-Encoding",))
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+# =====================================================
+# 🔽 BULK VIEWS
+# =====================================================
+# POST creates from a JSON array or NDJSON upload, PATCH sets is_active
+# from [{"id", "is_active"}, ...], DELETE removes {"ids": [...]}. Each
+# batch is validated up front and written in one transaction; any invalid
+# row rejects the whole batch with per-row errors.
+def _bulk_response(request, model, create):
+    try:
+        if request.method == 'POST':
+            created = create(request.data)
+            return Response(
+                {"created": len(created), "ids": [obj.pk for obj in created]},
+                status=status.HTTP_201_CREATED
+            )
+        if request.method == 'PATCH':
+            return Response({"updated": bulk_set_active(model, request.data)}, status=status.HTTP_200_OK)
+
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        return Response({"deleted": bulk_delete(model, ids)}, status=status.HTTP_200_OK)
+    except BulkError as exc:
+        return Response({"errors": exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@parser_classes([FastJSONParser, NDJSONParser])
+def BulkServiceCategories(request):
+    return _bulk_response(request, ServiceCategory, bulk_create_categories)
+
+
+@api_view(['POST', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@parser_classes([FastJSONParser, NDJSONParser])
+def BulkServices(request):
+    return _bulk_response(request, Service, bulk_create_services)
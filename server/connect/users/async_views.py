@@ -0,0 +1,244 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import update_last_login
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
+from rest_framework import exceptions
+from rest_framework_simplejwt.settings import api_settings
+
+from connect.conditional import conditional_view
+from connect.renderers import render_response
+
+from .authentication import CachedJWTAuthentication
+from .cache import user_cache
+from .hashing import HashingPoolSaturated, hashing_pool
+from .models import User
+from .serializers import (
+    ServiceProviderSerializer,
+    SystemManagerSerializer,
+    MyTokenObtainPairSerializer,
+    UpdatePasswordSerializer,
+    AuthenticatedUserSerializer,
+)
+
+# Async variants of the endpoints that hash passwords, and of the profile
+# read, selected in users/urls.py when ASYNC_VIEWS is on. Hashing runs in
+# users.hashing's bounded pool, so under ASGI the event loop keeps serving
+# other requests during a login spike; responses are rendered like the DRF
+# views' (connect.renderers.render_response).
+
+WWW_AUTHENTICATE = {"WWW-Authenticate": 'Bearer realm="api"'}
+
+
+# =====================================================
+# 🔽 HELPERS
+# =====================================================
+def parse_json(request):
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as exc:
+        return None, render_response(request, {"detail": f"JSON parse error - {exc}"}, status=400)
+    if not isinstance(data, dict):
+        return None, render_response(
+            request, {"non_field_errors": ["Invalid data. Expected a dictionary."]}, status=400
+        )
+    return data, None
+
+
+def busy(request):
+    return render_response(
+        request,
+        {"error": "Server is busy, please retry shortly."},
+        status=503,
+        headers={"Retry-After": "1"},
+    )
+
+
+async def authenticate(request):
+    """
+    Run CachedJWTAuthentication; return ``(user, None)`` or ``(None, response)``.
+    """
+    try:
+        result = await CachedJWTAuthentication().aauthenticate(request)
+    except exceptions.AuthenticationFailed as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return None, render_response(request, detail, status=exc.status_code, headers=WWW_AUTHENTICATE)
+    if result is None:
+        return None, render_response(
+            request,
+            {"detail": exceptions.NotAuthenticated.default_detail},
+            status=401,
+            headers=WWW_AUTHENTICATE,
+        )
+    return result[0], None
+
+
+def authenticated(view):
+    """
+    Set ``request.user`` from the bearer token or answer 401, like
+    ``IsAuthenticated`` on the DRF views. Place it above ``conditional_view``.
+    """
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        user, error = await authenticate(request)
+        if error:
+            return error
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapped
+
+
+async def create_with_profile(request, serializer_class, data):
+    serializer = serializer_class(data=data)
+    if not serializer.is_valid():
+        return render_response(request, serializer.errors, status=400)
+    try:
+        password_hash = await hashing_pool.make_password(serializer.validated_data['password'])
+    except HashingPoolSaturated:
+        return busy(request)
+    try:
+        instance = await sync_to_async(serializer.save)(password_hash=password_hash)
+    except exceptions.ValidationError as exc:
+        return render_response(request, exc.detail, status=400)
+    return render_response(request, serializer_class(instance).data, status=201)
+
+
+# =====================================================
+# 🔽 CREATE NEW SERVICE PROVIDER
+# =====================================================
+@csrf_exempt
+@require_POST
+async def NewServiceProvider(request):
+    data, error = parse_json(request)
+    if error:
+        return error
+    return await create_with_profile(request, ServiceProviderSerializer, data)
+
+
+# =====================================================
+# 🔽 CREATE NEW SYSTEM MANAGER (Admin/Agent)
+# =====================================================
+@csrf_exempt
+@require_POST
+@authenticated
+async def NewSystemManager(request):
+    if request.user.role != 'admin':
+        return render_response(
+            request, {"error": "You do not have permission to create system managers."}, status=403
+        )
+
+    data, error = parse_json(request)
+    if error:
+        return error
+    return await create_with_profile(request, SystemManagerSerializer, data)
+
+
+# =====================================================
+# 🔽 JWT LOGIN
+# =====================================================
+@csrf_exempt
+@require_POST
+async def MyTokenObtainPair(request):
+    data, error = parse_json(request)
+    if error:
+        return error
+    serializer = MyTokenObtainPairSerializer(data=data)
+    try:
+        attrs = serializer.to_internal_value(data)
+    except exceptions.ValidationError as exc:
+        return render_response(request, exc.detail, status=400)
+
+    user = await User.objects.filter(email=attrs['email']).afirst()
+    try:
+        if user is None:
+            # Spend the same hashing time as for a real account, as
+            # ModelBackend does, so response times don't reveal emails.
+            await hashing_pool.make_password(attrs['password'])
+            valid, new_hash = False, None
+        else:
+            valid, new_hash = await hashing_pool.verify_password(attrs['password'], user.password)
+    except HashingPoolSaturated:
+        return busy(request)
+
+    if not valid or not api_settings.USER_AUTHENTICATION_RULE(user):
+        return render_response(
+            request,
+            {"detail": serializer.error_messages['no_active_account']},
+            status=401,
+            headers=WWW_AUTHENTICATE,
+        )
+
+    if new_hash:
+        user.password = new_hash
+        await user.asave(update_fields=['password'])
+
+    refresh = await sync_to_async(serializer.get_token)(user)
+    if api_settings.UPDATE_LAST_LOGIN:
+        await sync_to_async(update_last_login)(None, user)
+
+    return render_response(request, {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'email': user.email,
+        'role': user.role,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    })
+
+
+# =====================================================
+# 🔽 FETCH LOGGED-IN SERVICE PROVIDER DATA
+# =====================================================
+async def profile_state(request):
+    # Profile saves touch User.updated_at (see users.signals).
+    return request.user.updated_at, request.user.pk
+
+
+@require_safe
+@authenticated
+@conditional_view(profile_state, vary=('Authorization',))
+async def FetchUserData(request):
+    async def build():
+        user = await User.objects.select_related('service_profile', 'system_profile').aget(pk=request.user.pk)
+        return AuthenticatedUserSerializer(user).data
+
+    data = await user_cache.aget_or_set(request.user.pk, 'profile', build)
+    return render_response(request, data)
+
+
+# =====================================================
+# 🔽 UPDATE USER PASSWORD
+# =====================================================
+@csrf_exempt
+@require_http_methods(['PATCH'])
+@authenticated
+async def UpdateUserPassword(request):
+    user = request.user
+    data, error = parse_json(request)
+    if error:
+        return error
+
+    try:
+        # Field checks only; the hash comparison below replaces validate().
+        attrs = UpdatePasswordSerializer().to_internal_value(data)
+    except exceptions.ValidationError as exc:
+        return render_response(request, exc.detail, status=400)
+
+    try:
+        valid, _ = await hashing_pool.verify_password(attrs['previous_password'], user.password)
+        if not valid:
+            return render_response(request, {"previous_password": ["Previous password is incorrect."]}, status=400)
+        if attrs['new_password'] != attrs['confirm_password']:
+            return render_response(
+                request,
+                {"confirm_password": ["New password and confirm password do not match."]}, status=400
+            )
+        user.password = await hashing_pool.make_password(attrs['new_password'])
+    except HashingPoolSaturated:
+        return busy(request)
+
+    # request.user is the cached copy; only the password is ours to write.
+    await user.asave(update_fields=['password'])
+    return render_response(request, {"message": "Password updated successfully."})
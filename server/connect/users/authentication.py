@@ -0,0 +1,70 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that serves ``request.user`` from ``user_cache``
+    instead of selecting it on every request. The token signature and
+    expiry are still verified each time; only the user row is cached, and
+    the same active/revocation checks run against the cached copy.
+    """
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def _check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+
+        def load():
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+
+        try:
+            user = user_cache.get(user_id, load)
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        return self._check_user(user, validated_token)
+
+    # -------------------------------------------------
+    # Async views (users.async_views, services.async_views)
+    # -------------------------------------------------
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+
+        async def load():
+            return await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+
+        try:
+            user = await user_cache.aget(user_id, load)
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        return self._check_user(user, validated_token)
@@ -0,0 +1,201 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from connect.routers import reading_primary
+
+_MISSING = object()
+
+
+class UserCache:
+    """
+    Cache of authenticated ``User`` rows for the JWT backend.
+
+    Entries are keyed by ``user_id`` and that user's current version, so
+    bumping the version on save/delete makes every cached copy unreachable.
+    A bounded per-process LRU sits in front of ``CACHES[alias]``, and the
+    version is read from ``CACHES[alias]`` on every lookup. Workers only see
+    each other's invalidations when that backend is shared (Redis,
+    Memcached, the production default); users.checks rejects a
+    local-memory one with several workers. Local entries also expire after
+    ``AUTH_USER_LOCAL_TIMEOUT`` seconds, which bounds how long a missed
+    invalidation can keep a deactivated user or an old password hash
+    authenticated. Values derived from the user, such as the serialized
+    profile, share the same version (see ``get_or_set``). Loads read from
+    the primary, as in the catalog cache.
+    """
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _version_key(self, user_id):
+        return f"auth:user:version:{user_id}"
+
+    def version(self, user_id):
+        key = self._version_key(user_id)
+        version = self.backend.get(key)
+        if version is None:
+            # Seeded from the clock, as in the catalog cache, so an evicted
+            # version never comes back at a number old entries were built with.
+            self.backend.add(key, time.time_ns(), timeout=None)
+            version = self.backend.get(key)
+        return version
+
+    async def aversion(self, user_id):
+        key = self._version_key(user_id)
+        version = await self.backend.aget(key)
+        if version is None:
+            await self.backend.aadd(key, time.time_ns(), timeout=None)
+            version = await self.backend.aget(key)
+        return version
+
+    def invalidate(self, user_id):
+        key = self._version_key(user_id)
+        try:
+            self.backend.incr(key)
+        except ValueError:
+            self.backend.add(key, time.time_ns(), timeout=None)
+
+    def get(self, user_id, load):
+        """
+        Return a private copy of the user, calling ``load`` on a miss.
+        Exceptions raised by ``load`` propagate and nothing is cached.
+        """
+        user_id = str(user_id)
+        key = (user_id, self.version(user_id))
+
+        user = self._recall(key)
+        if user is None:
+            shared_key = f"auth:user:{user_id}:{key[1]}"
+            user = self.backend.get(shared_key, _MISSING)
+            if user is _MISSING:
+                with reading_primary():
+                    user = load()
+                self.backend.set(shared_key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            self._remember(key, user)
+
+        # Views mutate request.user (profile edits, password changes), which
+        # must never reach the cached instance.
+        return copy.copy(user)
+
+    async def aget(self, user_id, load):
+        """
+        Async ``get``; ``load`` is a coroutine function.
+        """
+        user_id = str(user_id)
+        key = (user_id, await self.aversion(user_id))
+
+        user = self._recall(key)
+        if user is None:
+            shared_key = f"auth:user:{user_id}:{key[1]}"
+            user = await self.backend.aget(shared_key, _MISSING)
+            if user is _MISSING:
+                with reading_primary():
+                    user = await load()
+                await self.backend.aset(shared_key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            self._remember(key, user)
+        return copy.copy(user)
+
+    def get_or_set(self, user_id, name, build):
+        """
+        Cache a value derived from the user (e.g. a serialized profile) in
+        the shared cache under the same per-user version, so whatever
+        invalidates the user invalidates it too.
+        """
+        key = f"auth:user:{user_id}:{self.version(user_id)}:{name}"
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            with reading_primary():
+                value = build()
+            self.backend.set(key, value, settings.AUTH_USER_CACHE_TIMEOUT)
+        return value
+
+    async def aget_or_set(self, user_id, name, build):
+        key = f"auth:user:{user_id}:{await self.aversion(user_id)}:{name}"
+        value = await self.backend.aget(key, _MISSING)
+        if value is _MISSING:
+            with reading_primary():
+                value = await build()
+            await self.backend.aset(key, value, settings.AUTH_USER_CACHE_TIMEOUT)
+        return value
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def _remember(self, key, user):
+        with self._lock:
+            self.misses += 1
+            self._local[key] = (user, time.monotonic() + settings.AUTH_USER_LOCAL_TIMEOUT)
+            self._local.move_to_end(key)
+            while len(self._local) > settings.AUTH_USER_CACHE_SIZE:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "local_entries": len(self._local)}
+
+
+user_cache = UserCache()
+
+
+class TokenRevocationCache:
+    """
+    Shared-cache mirror of the refresh-token blacklist, keyed by ``jti``.
+
+    A live token maps to the id of its ``OutstandingToken`` row and a
+    blacklisted one to ``REVOKED``; entries expire with the token itself.
+    ``users.signals`` keeps it in step with every write to the blacklist
+    tables, so refreshing only falls back to the database for tokens the
+    cache has never seen.
+    """
+    REVOKED = "revoked"
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, jti):
+        return f"auth:token:{jti}"
+
+    def get(self, jti):
+        return self.backend.get(self._key(jti))
+
+    def set(self, jti, state, expires_at):
+        timeout = int(expires_at.timestamp() - time.time())
+        if timeout > 0:
+            self.backend.set(self._key(jti), state, timeout)
+
+    def forget(self, jti):
+        self.backend.delete(self._key(jti))
+
+
+revocation_cache = TokenRevocationCache()
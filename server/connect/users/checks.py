@@ -0,0 +1,10 @@
+from django.core.checks import register
+
+from connect.checks import shared_cache_errors
+
+from .cache import user_cache
+
+
+@register()
+def check_user_cache(app_configs, **kwargs):
+    return shared_cache_errors(user_cache.alias, "the authenticated-user cache", "users")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with its cost taken from settings (ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST in KiB, ARGON2_PARALLELISM). Existing hashes with a
+    different cost are rehashed on the next successful login.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+# =====================================================
+# 🔽 PASSWORD HASHING WORKERS
+# =====================================================
+# Kept free of model imports so spawned worker processes can unpickle these
+# functions before the app registry is ready.
+def init_worker():
+    django.setup()
+
+
+def hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def verify_password(password, encoded):
+    """
+    Return ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    uses an outdated hasher or cost and should be replaced.
+    """
+    upgraded = []
+    valid = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return valid, (upgraded[0] if upgraded else None)
+
+
+# =====================================================
+# 🔽 BOUNDED HASHING POOL (ASYNC VIEWS)
+# =====================================================
+class HashingPoolSaturated(Exception):
+    pass
+
+
+class HashingPool:
+    """
+    Thread pool that runs password hashing off the event loop for the
+    async auth views. PBKDF2 (hashlib) and Argon2 (argon2-cffi) release the
+    GIL while hashing, so threads give real parallelism.
+
+    At most ``PASSWORD_HASHING_WORKERS`` hashes run at once and at most
+    ``PASSWORD_HASHING_QUEUE`` more wait; beyond that ``run`` raises
+    ``HashingPoolSaturated`` immediately so the view can answer 503 instead
+    of letting a login spike queue up unbounded work.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = settings.PASSWORD_HASHING_WORKERS
+                    self._slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_QUEUE)
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix="password-hashing"
+                    )
+
+    async def run(self, func, *args):
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._slots.release()
+
+    async def make_password(self, password):
+        return await self.run(make_password, password)
+
+    async def verify_password(self, password, encoded):
+        return await self.run(verify_password, password, encoded)
+
+
+hashing_pool = HashingPool()
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import CachedJWTAuthentication
+from users.cache import user_cache
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and queries per request of JWTAuthentication "
+        "and CachedJWTAuthentication. Runs inside a transaction that is "
+        "rolled back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        n = options["requests"]
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username="bench-auth@example.com",
+                email="bench-auth@example.com",
+                password="bench-password",
+                role="service_provider",
+            )
+            header = f"Bearer {AccessToken.for_user(user)}"
+            request = Request(APIRequestFactory().get("/", HTTP_AUTHORIZATION=header))
+
+            for label, backend in (
+                ("JWTAuthentication", JWTAuthentication()),
+                ("CachedJWTAuthentication", CachedJWTAuthentication()),
+            ):
+                backend.authenticate(request)  # warm up
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for _ in range(n):
+                        backend.authenticate(request)
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{label:<24} {n / elapsed:10.1f} req/s  "
+                    f"{len(queries.captured_queries) / n:.2f} queries/request"
+                )
+            transaction.set_rollback(True)
+
+        user_cache.invalidate(user.pk)
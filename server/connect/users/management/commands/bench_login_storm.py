@@ -0,0 +1,92 @@
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory
+
+from services import views as service_views
+from users import async_views
+from users.models import User
+from users.views import MyTokenObtainPairView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure catalog read latency while a login storm is in flight, with "
+        "the sync DRF login view and with the async one. Views are dispatched "
+        "the way Django's ASGI handler does it: sync views through "
+        "sync_to_async on the shared thread, async views on the event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--probe-interval", type=float, default=0.01)
+
+    def handle(self, *args, **options):
+        self.factory = AsyncRequestFactory()
+        email = f"bench-login-{uuid.uuid4().hex}@example.com"
+        user = User.objects.create_user(username=email, email=email, password="bench-password", role="client")
+        self.credentials = json.dumps({"email": email, "password": "bench-password"})
+        try:
+            for label, login in (
+                ("no logins", None),
+                ("sync login view", sync_to_async(MyTokenObtainPairView.as_view())),
+                ("async login view", async_views.MyTokenObtainPair),
+            ):
+                caches["catalog"].clear()
+                result = async_to_sync(self.run_scenario)(login, options)
+                self.report(label, *result)
+        finally:
+            user.delete()
+
+    async def run_scenario(self, login, options):
+        probe_view = sync_to_async(service_views.GetServiceCategories)
+        probes, logins = [], []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await probe_view(self.factory.get("/"))
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(options["probe_interval"])
+
+        async def storm():
+            if login is None:
+                await asyncio.sleep(2)
+                return
+            semaphore = asyncio.Semaphore(options["concurrency"])
+
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    request = self.factory.post("/", self.credentials, content_type="application/json")
+                    response = await login(request)
+                    assert response.status_code in (200, 503), response.status_code
+                    logins.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(one() for _ in range(options["logins"])))
+
+        started = time.perf_counter()
+        prober = asyncio.create_task(probe())
+        await storm()
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+        return probes, logins, elapsed
+
+    def report(self, label, probes, logins, elapsed):
+        probes.sort()
+        line = (
+            f"{label:<18} catalog p50 {statistics.median(probes) * 1000:7.1f} ms  "
+            f"p99 {probes[int(len(probes) * 0.99)] * 1000:7.1f} ms"
+        )
+        if logins:
+            line += f"  |  {len(logins) / elapsed:6.1f} logins/s"
+        self.stdout.write(line)
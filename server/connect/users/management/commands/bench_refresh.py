@@ -0,0 +1,92 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+from users.serializers import MyTokenRefreshSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed expired historical refresh tokens, compare refresh latency of "
+        "simplejwt's TokenRefreshSerializer and MyTokenRefreshSerializer, then "
+        "time prune_tokens removing the history. Writes real rows, so run it "
+        "against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--history", type=int, default=100000)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.user = User.objects.create_user(
+            username=f"bench-refresh-{uuid.uuid4().hex}@example.com",
+            email=f"bench-refresh-{uuid.uuid4().hex}@example.com",
+            password="bench-password",
+            role="service_provider",
+        )
+        try:
+            self.seed(options["history"])
+            for serializer_class in (TokenRefreshSerializer, MyTokenRefreshSerializer):
+                self.run_refreshes(serializer_class, options["requests"])
+
+            start = time.perf_counter()
+            call_command("prune_tokens", "--batch-size", "10000", stdout=open("/dev/null", "w"))
+            self.stdout.write(
+                f"prune_tokens: {options['history']} expired tokens in {time.perf_counter() - start:.1f}s"
+            )
+        finally:
+            OutstandingToken.objects.filter(user=self.user).delete()
+            self.user.delete()
+
+    def seed(self, n):
+        expired = timezone.now() - timedelta(days=1)
+        for offset in range(0, n, 10000):
+            tokens = OutstandingToken.objects.bulk_create(
+                OutstandingToken(
+                    user=self.user,
+                    jti=uuid.uuid4().hex,
+                    token="",
+                    created_at=expired - timedelta(days=1),
+                    expires_at=expired,
+                )
+                for _ in range(min(10000, n - offset))
+            )
+            BlacklistedToken.objects.bulk_create(
+                BlacklistedToken(token=token) for token in tokens[::2]
+            )
+        self.stdout.write(f"History: {n} expired outstanding tokens, {n // 2 + n % 2} blacklisted")
+
+    def run_refreshes(self, serializer_class, n):
+        token = str(RefreshToken.for_user(self.user))
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(n):
+                start = time.perf_counter()
+                serializer = serializer_class(data={"refresh": token})
+                serializer.is_valid(raise_exception=True)
+                timings.append(time.perf_counter() - start)
+                token = serializer.validated_data["refresh"]
+
+        timings.sort()
+        # Count table access only, not BEGIN/COMMIT/SAVEPOINT bookkeeping.
+        statements = [
+            q for q in queries.captured_queries
+            if q["sql"].split(None, 1)[0] in ("SELECT", "INSERT", "UPDATE", "DELETE")
+        ]
+        self.stdout.write(
+            f"{serializer_class.__name__:<26} "
+            f"p50 {statistics.median(timings) * 1000:6.2f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95)] * 1000:6.2f} ms  "
+            f"{len(statements) / n:.1f} queries/refresh"
+        )
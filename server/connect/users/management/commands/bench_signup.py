@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from users import views
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure signups/sec and queries per signup of the service provider "
+        "signup view. Runs inside a transaction that is rolled back, so the "
+        "database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--signups", type=int, default=200)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        n = options["signups"]
+
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for i in range(n):
+                    request = factory.post("/", {
+                        "first_name": "Bench",
+                        "last_name": f"User{i}",
+                        "email": f"bench-signup-{i}@example.com",
+                        "password": "bench-password",
+                        "phone_number": "0700000000",
+                    }, format="json")
+                    response = views.NewServiceProvider(request)
+                    assert response.status_code == 201, response.data
+                elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        # Savepoint bookkeeping is only issued because the benchmark itself
+        # runs inside a transaction.
+        statements = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.stdout.write(
+            f"NewServiceProvider: {n / elapsed:8.1f} signups/s, "
+            f"{len(statements) / n:.1f} queries/signup"
+        )
@@ -0,0 +1,203 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from users.hashing import hash_passwords, init_worker
+from users.models import User, ServiceProvider
+from users.serializers import ServiceProviderSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Import service providers from a CSV or NDJSON file with columns "
+        "first_name, last_name, email, password, phone_number, company_name. "
+        "Passwords are hashed in a process pool and rows are inserted with "
+        "bulk_create in batches; progress is checkpointed so an interrupted "
+        "import can be resumed by running the same command again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "ndjson"))
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file (default: <path>.checkpoint).",
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore an existing checkpoint and start from the first record.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+
+        fmt = options["format"] or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint"
+        skip = 0 if options["restart"] else self.read_checkpoint(checkpoint)
+        if skip:
+            self.stdout.write(f"Resuming after record {skip} from {checkpoint}")
+
+        self.totals = {"created": 0, "existing": 0, "invalid": 0}
+        consumed = skip
+        started = time.perf_counter()
+
+        # Workers are spawned, not forked, so they never share the parent's
+        # database sockets; they only need settings for the password hashers.
+        pool = ProcessPoolExecutor(
+            max_workers=options["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+        with pool:
+            with open(path, newline="", encoding="utf-8") as handle:
+                records = islice(self.read_records(handle, fmt), skip, None)
+                while True:
+                    batch = list(islice(records, options["batch_size"]))
+                    if not batch:
+                        break
+                    self.import_batch(batch, pool, options["workers"])
+                    consumed += len(batch)
+                    self.write_checkpoint(checkpoint, consumed)
+                    self.report(consumed, skip, started)
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {self.totals['created']} created, {self.totals['existing']} already present, "
+            f"{self.totals['invalid']} invalid"
+        ))
+
+    # -------------------------------------------------
+    # Input
+    # -------------------------------------------------
+    def read_records(self, handle, fmt):
+        """
+        Yield ``(record_number, row)`` pairs without loading the file.
+        """
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(handle), start=1):
+                yield number, row
+            return
+        number = 0
+        for line in handle:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError as exc:
+                yield number, exc
+
+    # -------------------------------------------------
+    # Checkpoints
+    # -------------------------------------------------
+    def read_checkpoint(self, checkpoint):
+        try:
+            with open(checkpoint) as handle:
+                return int(handle.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, checkpoint, consumed):
+        tmp = f"{checkpoint}.tmp"
+        with open(tmp, "w") as handle:
+            handle.write(str(consumed))
+        os.replace(tmp, checkpoint)
+
+    # -------------------------------------------------
+    # Import
+    # -------------------------------------------------
+    def validate(self, batch):
+        valid = []
+        for number, row in batch:
+            if isinstance(row, Exception):
+                self.reject(number, {"non_field_errors": [str(row)]})
+                continue
+            serializer = ServiceProviderSerializer(data=row)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                self.reject(number, serializer.errors)
+        return valid
+
+    def reject(self, number, errors):
+        self.totals["invalid"] += 1
+        self.stderr.write(f"record {number}: {errors}")
+
+    def import_batch(self, batch, pool, workers):
+        rows = self.validate(batch)
+
+        # One lookup per batch, case-insensitive like the unique email
+        # constraint (and served by its index); rows already present (for
+        # example from a run that died after committing but before
+        # checkpointing) are skipped.
+        emails = {row["email"].lower() for row in rows}
+        existing = set(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails)
+            .values_list("email_lower", flat=True)
+        )
+        fresh, seen = [], set()
+        for row in rows:
+            email = row["email"].lower()
+            if email in existing or email in seen:
+                self.totals["existing"] += 1
+                continue
+            seen.add(email)
+            fresh.append(row)
+        if not fresh:
+            return
+
+        passwords = [row["password"] for row in fresh]
+        chunk = -(-len(passwords) // workers)
+        hashes = [
+            hashed
+            for hashed_chunk in pool.map(
+                hash_passwords,
+                [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)],
+            )
+            for hashed in hashed_chunk
+        ]
+
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    username=row["email"],
+                    email=row["email"],
+                    first_name=row["first_name"],
+                    last_name=row["last_name"],
+                    role="service_provider",
+                    password=hashed,
+                )
+                for row, hashed in zip(fresh, hashes)
+            ])
+            ServiceProvider.objects.bulk_create([
+                ServiceProvider(
+                    user=user,
+                    phone_number=row.get("phone_number"),
+                    company_name=row.get("company_name"),
+                )
+                for user, row in zip(users, fresh)
+            ])
+        self.totals["created"] += len(users)
+
+    def report(self, consumed, skip, started):
+        elapsed = time.perf_counter() - started
+        rate = (consumed - skip) / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{consumed} records processed ({self.totals['created']} created, "
+            f"{self.totals['existing']} existing, {self.totals['invalid']} invalid) "
+            f"- {rate:.0f} records/s"
+        )
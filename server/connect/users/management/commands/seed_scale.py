@@ -0,0 +1,213 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from services.cache import catalog_cache
+from services.counters import reconcile_service_counts
+from services.models import ServiceCategory, Service
+from services.search import update_search_vectors
+from users.models import User, ServiceProvider, SystemManager
+
+FIRST_NAMES = (
+    "Amina", "Brian", "Caro", "David", "Esther", "Faith", "George", "Hassan", "Irene", "James",
+    "Kevin", "Lucy", "Mary", "Njeri", "Otieno", "Peter", "Queen", "Rose", "Samuel", "Tabitha",
+    "Umar", "Vivian", "Wanjiru", "Xavier", "Yusuf", "Zawadi",
+)
+LAST_NAMES = (
+    "Achieng", "Barasa", "Chebet", "Gitau", "Kamau", "Kariuki", "Kiprop", "Macharia", "Mohamed",
+    "Muthoni", "Mwangi", "Njoroge", "Ochieng", "Odhiambo", "Omondi", "Onyango", "Wafula", "Wambui",
+)
+TRADES = (
+    "Plumbing", "Electrical", "Carpentry", "Painting", "Cleaning", "Landscaping", "Roofing",
+    "Masonry", "Welding", "Pest Control", "Appliance Repair", "Moving", "Tiling", "Glazing",
+    "Security Systems", "Solar Installation", "Interior Design", "Upholstery", "Car Repair",
+    "Tutoring", "Catering", "Photography", "Tailoring", "IT Support", "Laundry",
+)
+SERVICE_KINDS = (
+    "repair", "installation", "inspection", "maintenance", "replacement", "consultation",
+    "emergency call-out", "quote",
+)
+COMPANY_SUFFIXES = ("Ltd", "Services", "& Sons", "Enterprises", "Works", "Solutions")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic scale dataset of users (with service "
+        "provider and system manager profiles), categories and services. "
+        "Every user gets the same precomputed password hash. Rows are "
+        "loaded with COPY on Postgres and batched bulk_create elsewhere, "
+        "with explicit ids so profiles and services link without lookups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--providers", type=int, default=800_000)
+        parser.add_argument("--managers", type=int, default=5_000)
+        parser.add_argument("--clients", type=int, default=195_000)
+        parser.add_argument("--categories", type=int, default=200)
+        parser.add_argument("--services", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--password", default="seed-password", help="Password of every seeded user.")
+        parser.add_argument(
+            "--prefix", default="seed",
+            help="Marks seeded emails and category names; must not be in use yet.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000, help="bulk_create batch size.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        # COPY ... FROM STDIN with write_row() needs psycopg 3.
+        self.use_copy = connection.vendor == "postgresql" and connection.Database.__name__ == "psycopg"
+        prefix = options["prefix"]
+
+        if User.objects.filter(email__startswith=f"{prefix}.").exists():
+            raise CommandError(f"Users with the prefix '{prefix}' exist already; pick another --prefix.")
+        category_names = self.category_names(options["categories"])
+        if ServiceCategory.objects.filter(category_name__in=category_names).exists():
+            raise CommandError(f"Categories with the prefix '{prefix}' exist already; pick another --prefix.")
+
+        self.stdout.write(f"Loading with {'COPY' if self.use_copy else 'bulk_create'}")
+        self.password = make_password(options["password"])
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            first_user = self.next_id(User)
+            n_users = options["providers"] + options["managers"] + options["clients"]
+            self.load(User, self.user_columns(), self.user_rows(first_user), n_users)
+
+            providers = range(first_user, first_user + options["providers"])
+            managers = range(providers.stop, providers.stop + options["managers"])
+            self.load(ServiceProvider, ("id", "user_id", "phone_number", "company_name"),
+                      self.provider_rows(self.next_id(ServiceProvider), providers), len(providers))
+            self.load(SystemManager, ("id", "user_id", "phone_number"),
+                      self.manager_rows(self.next_id(SystemManager), managers), len(managers))
+
+            first_category = self.next_id(ServiceCategory)
+            self.load(ServiceCategory, ("id", "category_name", "description", "is_active", "created_at", "updated_at",
+                                        "service_count", "active_service_count"),
+                      self.category_rows(first_category, category_names), len(category_names))
+            first_service = self.next_id(Service)
+            category_ids = range(first_category, first_category + len(category_names))
+            self.load(Service, ("id", "category_id", "service_name", "description", "is_active", "created_at", "updated_at"),
+                      self.service_rows(first_service, category_ids), options["services"])
+
+            if self.use_copy:
+                # COPY bypasses ServiceQuerySet, which keeps the counters otherwise.
+                reconcile_service_counts(list(category_ids))
+            self.reset_sequences()
+            update_search_vectors(Service.objects.filter(pk__gte=first_service))
+            transaction.on_commit(lambda: catalog_cache.invalidate(ServiceCategory, Service))
+
+        if self.use_copy:
+            with connection.cursor() as cursor:
+                for model in (User, ServiceProvider, SystemManager, ServiceCategory, Service):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f}s"))
+
+    # -------------------------------------------------
+    # Loading
+    # -------------------------------------------------
+    def next_id(self, model):
+        last = model.objects.order_by("-pk").values_list("pk", flat=True).first()
+        return (last or 0) + 1
+
+    def load(self, model, columns, rows, count):
+        if not count:
+            return
+        started = time.perf_counter()
+        if self.use_copy:
+            quote = connection.ops.quote_name
+            sql = (
+                f"COPY {quote(model._meta.db_table)} ({', '.join(quote(c) for c in columns)}) FROM STDIN"
+            )
+            with connection.cursor() as cursor, cursor.copy(sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            batch_size = self.options["batch_size"]
+            objects = (model(**dict(zip(columns, row))) for row in rows)
+            while batch := list(islice(objects, batch_size)):
+                model.objects.bulk_create(batch, batch_size=batch_size)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {model.__name__:<16} {count:>10,} rows in {elapsed:6.1f}s  ({count / elapsed:,.0f} rows/s)"
+        )
+
+    def reset_sequences(self):
+        # Rows were inserted with explicit ids, which sequences don't see.
+        models = [User, ServiceProvider, SystemManager, ServiceCategory, Service]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    # -------------------------------------------------
+    # Row generators (deterministic for a given --seed)
+    # -------------------------------------------------
+    def user_columns(self):
+        return (
+            "id", "password", "last_login", "is_superuser", "username", "first_name", "last_name",
+            "email", "is_staff", "is_active", "date_joined", "role", "updated_at",
+        )
+
+    def user_rows(self, first_id):
+        options, rng, prefix = self.options, self.random, self.options["prefix"]
+        roles = (
+            ["service_provider"] * options["providers"]
+            + ["admin" if i % 10 == 0 else "agent" for i in range(options["managers"])]
+        )
+        for i in range(options["providers"] + options["managers"] + options["clients"]):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            # The index keeps emails (and usernames) unique.
+            email = f"{prefix}.{first.lower()}.{last.lower()}.{i}@example.com"
+            joined = self.now - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+            role = roles[i] if i < len(roles) else "client"
+            yield (
+                first_id + i, self.password, None, False, email, first, last,
+                email, False, True, joined, role, self.now,
+            )
+
+    def phone_number(self):
+        return f"07{self.random.randrange(10 ** 8):08d}"
+
+    def provider_rows(self, first_id, user_ids):
+        for i, user_id in enumerate(user_ids):
+            company = None
+            if self.random.random() < 0.6:
+                company = f"{self.random.choice(LAST_NAMES)} {self.random.choice(COMPANY_SUFFIXES)}"
+            yield first_id + i, user_id, self.phone_number(), company
+
+    def manager_rows(self, first_id, user_ids):
+        for i, user_id in enumerate(user_ids):
+            yield first_id + i, user_id, self.phone_number()
+
+    def category_names(self, count):
+        prefix = self.options["prefix"]
+        return [f"{TRADES[i % len(TRADES)]} ({prefix} {i // len(TRADES) + 1})" for i in range(count)]
+
+    def category_rows(self, first_id, names):
+        for i, name in enumerate(names):
+            yield first_id + i, name, f"{name} services", True, self.now, self.now, 0, 0
+
+    def service_rows(self, first_id, category_ids):
+        if not category_ids and self.options["services"]:
+            raise CommandError("Services need at least one category.")
+        for i in range(self.options["services"]):
+            category_id = category_ids[i % len(category_ids)]
+            trade = TRADES[(category_id - category_ids.start) % len(TRADES)]
+            kind = self.random.choice(SERVICE_KINDS)
+            # i is unique, so names never collide within a category.
+            name = f"{trade} {kind} #{i}"
+            yield (
+                first_id + i, category_id, name, f"{kind.capitalize()} by a vetted {trade.lower()} provider.",
+                self.random.random() < 0.9, self.now, self.now,
+            )
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+# token_blacklist ships without an index on expires_at, so pruning expired
+# rows scans the whole table. On a large production table the index can be
+# built beforehand with CREATE INDEX CONCURRENTLY under the same name; this
+# migration then leaves it alone.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_updated_at'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS token_blacklist_outstandingtoken_expires_at_idx "
+            "ON token_blacklist_outstandingtoken (expires_at)",
+            "DROP INDEX IF EXISTS token_blacklist_outstandingtoken_expires_at_idx",
+        ),
+    ]
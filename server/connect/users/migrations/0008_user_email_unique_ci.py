@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 19:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicate_emails(apps, schema_editor):
+    # Without this, AddConstraint fails with a bare IntegrityError naming
+    # neither the addresses nor what to do about them.
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+        .values_list('email_lower', flat=True)
+        .order_by('email_lower')[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add the case-insensitive email constraint: more than one "
+            f"user has each of these addresses (ignoring case): {', '.join(duplicates)}. "
+            "Merge or rename those accounts, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_role_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='users_user_email_unique_ci', violation_error_message='A user with this email already exists.'),
+        ),
+    ]
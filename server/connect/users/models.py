@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 
 
@@ -15,9 +16,23 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
 
     email = models.EmailField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        # Admin list_filter and role checks filter on role.
+        indexes = [models.Index(fields=['role'], name='users_user_role_idx')]
+        # Emails differing only in case are the same address. Signup and
+        # import_providers rely on this index instead of existence queries.
+        constraints = [
+            models.UniqueConstraint(
+                Lower('email'),
+                name='users_user_email_unique_ci',
+                violation_error_message='A user with this email already exists.',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.email}) - {self.role}"
 
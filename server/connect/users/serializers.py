@@ -1,12 +1,62 @@
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .cache import user_cache
 from .models import User, ServiceProvider, SystemManager
+from .tokens import CachedRefreshToken
+
+DUPLICATE_EMAIL_MESSAGE = 'A user with this email already exists.'
+
+
+# =====================================================
+# 🔽 SIGNUP HELPERS
+# =====================================================
+class UserProfileCreateMixin:
+    """
+    Creates the ``User`` and its profile (``Meta.model``) with one INSERT
+    each inside a single transaction. The password is hashed up front, or
+    taken from ``password_hash`` when the caller already hashed it, and the
+    unique email column replaces the old existence query.
+    """
+    profile_fields = ()
+
+    def create_user_and_profile(self, validated_data, role):
+        email = validated_data.pop('email')
+        password = validated_data.pop('password')
+        password_hash = validated_data.pop('password_hash', None) or make_password(password)
+
+        user = User(
+            username=email,
+            email=email,
+            first_name=validated_data.pop('first_name'),
+            last_name=validated_data.pop('last_name'),
+            role=role,
+            password=password_hash,
+        )
+        # Lets users.signals skip touching updated_at for the new profile.
+        user.inserted_with_profile = True
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+                return self.Meta.model.objects.create(
+                    user=user,
+                    **{field: validated_data.get(field) for field in self.profile_fields}
+                )
+        except IntegrityError:
+            # A user that was never written means the email (or the username
+            # mirroring it) is taken; anything else is unexpected.
+            if not user._state.adding:
+                raise
+            raise serializers.ValidationError({'email': [DUPLICATE_EMAIL_MESSAGE]})
 
 
 # =====================================================
 # 🔽 CREATE SERVICE PROVIDER SERIALIZER
 # =====================================================
-class ServiceProviderSerializer(serializers.ModelSerializer):
+class ServiceProviderSerializer(UserProfileCreateMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(write_only=True)
     last_name = serializers.CharField(write_only=True)
     email = serializers.EmailField(write_only=True)
@@ -17,39 +67,16 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
         model = ServiceProvider
         fields = ['id', 'first_name', 'last_name', 'email', 'password', 'phone_number', 'company_name']
 
-    def validate_email(self, email):
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError('A user with this email already exists.')
-        return email
+    profile_fields = ('phone_number', 'company_name')
 
     def create(self, validated_data):
-        first_name = validated_data.pop('first_name')
-        last_name = validated_data.pop('last_name')
-        email = validated_data.pop('email')
-        password = validated_data.pop('password')
-
-        user = User.objects.create(
-            username=email,
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            role='service_provider'
-        )
-        user.set_password(password)
-        user.save()
-
-        service_provider = ServiceProvider.objects.create(
-            user=user,
-            phone_number=validated_data.get('phone_number'),
-            company_name=validated_data.get('company_name')
-        )
-        return service_provider
+        return self.create_user_and_profile(validated_data, role='service_provider')
 
 
 # =====================================================
 # 🔽 CREATE SYSTEM MANAGER SERIALIZER
 # =====================================================
-class SystemManagerSerializer(serializers.ModelSerializer):
+class SystemManagerSerializer(UserProfileCreateMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(write_only=True)
     last_name = serializers.CharField(write_only=True)
     email = serializers.EmailField(write_only=True)
@@ -59,35 +86,12 @@ class SystemManagerSerializer(serializers.ModelSerializer):
         model = SystemManager
         fields = ['id', 'first_name', 'last_name', 'email', 'password', 'phone_number']
 
-    def validate_email(self, email):
-        if User.objects.filter(email=email).exists():
-            raise serializers.ValidationError('A user with this email already exists.')
-        return email
+    profile_fields = ('phone_number',)
 
     def create(self, validated_data):
-        first_name = validated_data.pop('first_name')
-        last_name = validated_data.pop('last_name')
-        email = validated_data.pop('email')
-        password = validated_data.pop('password')
-
         # Default role is admin unless specified
         role = validated_data.pop('role', 'admin')
-
-        user = User.objects.create(
-            username=email,
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            role=role
-        )
-        user.set_password(password)
-        user.save()
-
-        manager = SystemManager.objects.create(
-            user=user,
-            phone_number=validated_data.get('phone_number')
-        )
-        return manager
+        return self.create_user_and_profile(validated_data, role=role)
 
     def update(self, instance, validated_data):
         """
@@ -105,12 +109,19 @@ class SystemManagerSerializer(serializers.ModelSerializer):
         # Update user
         for attr, value in user_data.items():
             setattr(instance.user, attr, value)
-        instance.user.save()
 
         # Update manager
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+
+        try:
+            with transaction.atomic():
+                instance.user.save()
+                instance.save()
+        except IntegrityError:
+            if 'email' not in user_data:
+                raise
+            raise serializers.ValidationError({'email': [DUPLICATE_EMAIL_MESSAGE]})
         return instance
 
 
@@ -152,6 +163,46 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+# =====================================================
+# 🔽 JWT REFRESH SERIALIZER
+# =====================================================
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Same contract as simplejwt's refresh serializer, but the user comes from
+    ``user_cache`` and the blacklist from ``revocation_cache``, so a refresh
+    costs the two rotation INSERTs and nothing else.
+    """
+    token_class = CachedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            try:
+                user = user_cache.get(
+                    user_id, lambda: User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+                )
+            except User.DoesNotExist:
+                user = None
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            with transaction.atomic():
+                if api_settings.BLACKLIST_AFTER_ROTATION:
+                    refresh.blacklist()
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                refresh.outstand()
+            data['refresh'] = str(refresh)
+
+        return data
+
+
 # =====================================================
 # 🔽 READ SERIALIZERS
 # =====================================================
@@ -186,7 +237,7 @@ class UpdateUserInfoSerializer(serializers.ModelSerializer):
 
     def validate_email(self, email):
         user = self.instance
-        if User.objects.exclude(id=user.id).filter(email=email).exists():
+        if User.objects.exclude(id=user.id).filter(email__iexact=email).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return email
 
@@ -196,11 +247,15 @@ class UpdateUserInfoSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        # The instance is request.user, the copy from the user cache; a full
+        # save could write stale values of the other columns.
+        update_fields = [*validated_data, 'updated_at']
 
         if 'email' in validated_data:
             instance.username = validated_data['email']
+            update_fields.append('username')
 
-        instance.save()
+        instance.save(update_fields=update_fields)
 
         # Update ServiceProvider or SystemManager profile
         try:
@@ -245,5 +300,5 @@ class UpdatePasswordSerializer(serializers.Serializer):
     def save(self, **kwargs):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .cache import revocation_cache, user_cache
+from .models import User, ServiceProvider, SystemManager
+
+
+# =====================================================
+# 🔽 PROFILE CHANGES TOUCH THE OWNING USER
+# =====================================================
+# The profile endpoints use ``User.updated_at`` as their validator, so an
+# edit made to the profile row alone (e.g. in the admin) must move it too.
+@receiver([post_save, post_delete], sender=ServiceProvider)
+@receiver([post_save, post_delete], sender=SystemManager)
+def touch_profile_owner(sender, instance, created=False, **kwargs):
+    # update() sends no post_save, so the cached user and profile are
+    # dropped here; a new profile must not be hidden by a cached "none".
+    transaction.on_commit(lambda: user_cache.invalidate(instance.user_id))
+    # A profile created alongside its user at signup needs no touch: the
+    # user row was inserted in the same transaction and never served
+    # without it. Profiles added to an existing user change its payload.
+    owner = instance._state.fields_cache.get('user')
+    if created and getattr(owner, 'inserted_with_profile', False):
+        return
+    User.objects.filter(pk=instance.user_id).update(updated_at=timezone.now())
+
+
+# =====================================================
+# 🔽 AUTHENTICATION CACHE INVALIDATION
+# =====================================================
+# Saves cover profile edits, password changes and deactivation.
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+# =====================================================
+# 🔽 REFRESH TOKEN REVOCATION CACHE
+# =====================================================
+# Mirrors every blacklist-table write into revocation_cache, whether it
+# comes from a refresh, a login, the admin or prune_tokens.
+@receiver(post_save, sender=OutstandingToken)
+def cache_outstanding_token(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            lambda: revocation_cache.set(instance.jti, instance.pk, instance.expires_at)
+        )
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender, instance, **kwargs):
+    token = instance.token
+    transaction.on_commit(
+        lambda: revocation_cache.set(token.jti, revocation_cache.REVOKED, token.expires_at)
+    )
+
+
+@receiver(post_delete, sender=BlacklistedToken)
+def forget_blacklisted_token(sender, instance, origin=None, **kwargs):
+    # Rows removed together with their outstanding token (prune_tokens) are
+    # expired and their entries lapse on their own; only a token taken off
+    # the blacklist by hand needs its entry dropped.
+    if isinstance(origin, OutstandingToken) or getattr(origin, "model", None) is OutstandingToken:
+        return
+    jti = OutstandingToken.objects.filter(pk=instance.token_id).values_list("jti", flat=True).first()
+    if jti:
+        transaction.on_commit(lambda: revocation_cache.forget(jti))
@@ -1,3 +1,654 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from services.models import Service
+
+from . import async_views, checks, views
+from .cache import revocation_cache, user_cache
+from .hashing import hashing_pool
+from .models import User, ServiceProvider, SystemManager
+from .serializers import ServiceProviderSerializer, SystemManagerSerializer
+
+
+class FetchUserDataConditionalTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.user = User.objects.create_user(
+            username="jane@example.com",
+            email="jane@example.com",
+            password="s3cret-pass",
+            role="service_provider",
+        )
+        self.profile = ServiceProvider.objects.create(user=self.user, phone_number="0700000000")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("service-provider-fetch")
+
+    def test_matching_etag_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_profile_edit_changes_etag(self):
+        first = self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.company_name = "Jane's Plumbing"
+            self.profile.save()
+        self.user.refresh_from_db()
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["service_profile"]["company_name"], "Jane's Plumbing")
+
+    def test_profile_creation_changes_etag(self):
+        user = User.objects.create_user(
+            username="joe@example.com", email="joe@example.com", password="s3cret-pass", role="admin"
+        )
+        self.client.force_authenticate(user)
+        first = self.client.get(self.url)
+        self.assertIsNone(first.json()["system_profile"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SystemManager.objects.create(user=user, phone_number="0711111111")
+        user.refresh_from_db()
+        self.client.force_authenticate(user)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["system_profile"]["phone_number"], "0711111111")
+
+
+class ImportProvidersTests(TestCase):
+    header = "first_name,last_name,email,password,phone_number,company_name\n"
+
+    def write_csv(self, lines):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        handle.write(self.header + "".join(line + "\n" for line in lines))
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_providers", path, "--workers", "1", *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_rows_and_skips_existing_and_invalid(self):
+        User.objects.create_user(
+            username="taken@example.com", email="taken@example.com",
+            password="s3cret-pass", role="service_provider",
+        )
+        path = self.write_csv([
+            "Ann,One,ann@example.com,password-1,0700000001,Ann Ltd",
+            "Bob,Two,bob@example.com,password-2,0700000002,",
+            "Tim,Taken,taken@example.com,password-3,0700000003,",
+            "Bad,Row,not-an-email,short,0700000004,",
+        ])
+
+        out, err = self.run_import(path, "--batch-size", "2")
+
+        self.assertIn("2 created, 1 already present, 1 invalid", out)
+        self.assertIn("record 4", err)
+        ann = User.objects.get(email="ann@example.com")
+        self.assertEqual(ann.role, "service_provider")
+        self.assertTrue(ann.check_password("password-1"))
+        self.assertEqual(ann.service_profile.company_name, "Ann Ltd")
+        self.assertFalse(os.path.exists(path + ".checkpoint"))
+
+    def test_existing_emails_are_one_case_insensitive_query_per_batch(self):
+        User.objects.create_user(
+            username="Taken@Example.com", email="Taken@Example.com",
+            password="s3cret-pass", role="service_provider",
+        )
+        path = self.write_csv([
+            f"User,{i},user{i}@example.com,password-{i},070000000{i}," for i in range(6)
+        ] + [
+            "Tim,Taken,taken@example.COM,password-9,0700000009,",
+            "Ann,Dup,USER0@example.com,password-8,0700000008,",
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            out, _ = self.run_import(path, "--batch-size", "8")
+
+        lookups = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(lookups), 1)
+        self.assertIn("6 created, 2 already present, 0 invalid", out)
+        self.assertEqual(User.objects.filter(email__iexact="taken@example.com").count(), 1)
+
+    def test_resumes_from_checkpoint(self):
+        path = self.write_csv([
+            "Ann,One,ann@example.com,password-1,0700000001,",
+            "Bob,Two,bob@example.com,password-2,0700000002,",
+        ])
+        with open(path + ".checkpoint", "w") as handle:
+            handle.write("1")
+        self.addCleanup(lambda: os.path.exists(path + ".checkpoint") and os.remove(path + ".checkpoint"))
+
+        out, _ = self.run_import(path)
+
+        self.assertIn("Resuming after record 1", out)
+        self.assertFalse(User.objects.filter(email="ann@example.com").exists())
+        self.assertTrue(ServiceProvider.objects.filter(user__email="bob@example.com").exists())
+
+
+class SeedScaleTests(TestCase):
+    def seed(self, *args):
+        call_command(
+            "seed_scale", "--providers", "6", "--managers", "2", "--clients", "4",
+            "--categories", "3", "--services", "9", "--batch-size", "5", *args, stdout=StringIO(),
+        )
+
+    def test_seeds_linked_rows_with_one_password_hash(self):
+        self.seed("--password", "seeded-pass")
+
+        users = User.objects.filter(email__startswith="seed.")
+        self.assertEqual(users.count(), 12)
+        self.assertEqual(users.filter(role="service_provider").count(), 6)
+        self.assertEqual(users.filter(role="client").count(), 4)
+        self.assertEqual(ServiceProvider.objects.filter(user__in=users).count(), 6)
+        self.assertEqual(SystemManager.objects.filter(user__in=users).count(), 2)
+        self.assertEqual(len(set(users.values_list("password", flat=True))), 1)
+        self.assertTrue(users.first().check_password("seeded-pass"))
+        self.assertEqual(Service.objects.filter(category__category_name__contains="(seed ").count(), 9)
+
+        # Sequences were moved past the explicit ids.
+        user = User.objects.create_user(username="new@example.com", email="new@example.com", password="x")
+        self.assertGreater(user.pk, users.order_by("-pk").first().pk)
+
+    def test_same_seed_gives_same_data_and_prefix_must_be_new(self):
+        self.seed("--seed", "7", "--prefix", "one")
+        self.seed("--seed", "7", "--prefix", "two")
+
+        def names(prefix):
+            return list(
+                User.objects.filter(email__startswith=f"{prefix}.").order_by("pk")
+                .values_list("first_name", "last_name", "service_profile__phone_number")
+            )
+
+        self.assertEqual(names("one"), names("two"))
+        with self.assertRaises(CommandError):
+            self.seed("--prefix", "one")
+
+
+class SignupWriteTests(TestCase):
+    payload = {
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "email": "jane@example.com",
+        "password": "s3cret-pass",
+        "phone_number": "0700000000",
+    }
+
+    def signup(self, url_name, client=None, **overrides):
+        client = client or APIClient()
+        return client.post(reverse(url_name), {**self.payload, **overrides}, format="json")
+
+    def test_provider_signup_is_one_insert_per_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.signup("service-provider-create")
+
+        self.assertEqual(response.status_code, 201)
+        statements = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all(sql.startswith("INSERT") for sql in statements))
+        self.assertTrue(User.objects.get(email="jane@example.com").check_password("s3cret-pass"))
+
+    def test_manager_signup_is_one_insert_per_table(self):
+        admin = User.objects.create_user(username="admin@example.com", email="admin@example.com", role="admin")
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.signup("system-manager-create", client)
+
+        self.assertEqual(response.status_code, 201)
+        statements = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(SystemManager.objects.filter(user__email="jane@example.com").exists())
+
+    def test_duplicate_email_is_a_validation_error(self):
+        self.signup("service-provider-create")
+
+        response = self.signup("service-provider-create", first_name="Other")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"email": ["A user with this email already exists."]})
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(ServiceProvider.objects.count(), 1)
+
+    def test_email_differing_only_in_case_is_a_duplicate(self):
+        self.signup("service-provider-create")
+
+        response = self.signup("service-provider-create", email="JANE@example.com")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"email": ["A user with this email already exists."]})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_precomputed_password_hash_is_used(self):
+        serializer = ServiceProviderSerializer(data=self.payload)
+        self.assertTrue(serializer.is_valid())
+
+        provider = serializer.save(password_hash="md5$salt$not-a-real-hash")
+
+        self.assertEqual(provider.user.password, "md5$salt$not-a-real-hash")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        user_cache.clear_local()
+        self.user = User.objects.create_user(
+            username="jane@example.com",
+            email="jane@example.com",
+            password="s3cret-pass",
+            first_name="Jane",
+            role="service_provider",
+        )
+        ServiceProvider.objects.create(user=self.user, phone_number="0700000000")
+        self.client = APIClient()
+        token = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": "jane@example.com", "password": "s3cret-pass"},
+            format="json",
+        ).json()["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.url = reverse("service-provider-fetch")
+
+    def test_hot_path_does_not_query_the_database(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        # A revalidated request is answered from the cached user alone.
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_user_save_invalidates_cached_user(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse("update-user-info"), {"first_name": "Janet"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(self.url).json()["first_name"], "Janet")
+
+    def test_writes_through_cached_user_keep_newer_columns(self):
+        self.client.get(self.url)
+        # A queryset update sends no signal, so the cached copy goes stale.
+        User.objects.filter(pk=self.user.pk).update(last_name="Renamed")
+
+        response = self.client.patch(reverse("update-user-info"), {"first_name": "Janet"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(reverse("update-user-password"), {
+            "previous_password": "s3cret-pass", "new_password": "n3w-secret", "confirm_password": "n3w-secret",
+        }, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.last_name), ("Janet", "Renamed"))
+        self.assertTrue(self.user.check_password("n3w-secret"))
+
+    def test_local_entries_expire(self):
+        loads = []
+
+        def load():
+            loads.append(1)
+            return User.objects.get(pk=self.user.pk)
+
+        user_cache.get(self.user.pk, load)
+        user_cache.get(self.user.pk, load)
+        self.assertEqual(len(loads), 1)
+
+        # Only the local copy is left; once it expires the user is reloaded.
+        caches["default"].delete(f"auth:user:{self.user.pk}:{user_cache.version(self.user.pk)}")
+        later = time.monotonic() + settings.AUTH_USER_LOCAL_TIMEOUT + 1
+        with mock.patch("users.cache.time.monotonic", return_value=later):
+            user_cache.get(self.user.pk, load)
+        self.assertEqual(len(loads), 2)
+
+    @override_settings(WEB_CONCURRENCY=2)
+    def test_process_local_cache_fails_checks_with_several_workers(self):
+        self.assertEqual([error.id for error in checks.check_user_cache(None)], ["users.E001"])
+
+    @override_settings(UNCONFIGURED_CACHES={"default": "CACHE_URL"})
+    def test_unset_cache_url_fails_checks_without_debug(self):
+        self.assertEqual([error.id for error in checks.check_user_cache(None)], ["users.E002"])
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        first = user_cache.get(self.user.pk, lambda: User.objects.get(pk=self.user.pk))
+        first.first_name = "Changed in a view"
+
+        second = user_cache.get(self.user.pk, lambda: User.objects.get(pk=self.user.pk))
+        self.assertEqual(second.first_name, "Jane")
+
+
+class FetchProfileQueryTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+
+    def make_user(self, role, email="jane@example.com"):
+        return User.objects.create_user(username=email, email=email, password="s3cret-pass", role=role)
+
+    def test_fetch_user_data_is_one_joined_query_then_cached(self):
+        user = self.make_user("service_provider")
+        ServiceProvider.objects.create(user=user, phone_number="0700000000", company_name="Jane Ltd")
+        self.client.force_authenticate(user)
+        url = reverse("service-provider-fetch")
+
+        with self.assertNumQueries(1):
+            first = self.client.get(url)
+        self.assertEqual(first.json()["service_profile"]["company_name"], "Jane Ltd")
+        self.assertIsNone(first.json()["system_profile"])
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.json(), second.json())
+
+    def test_fetch_system_manager_data_is_one_joined_query_then_cached(self):
+        user = self.make_user("admin")
+        SystemManager.objects.create(user=user, phone_number="0700000000")
+        self.client.force_authenticate(user)
+        url = reverse("system-manager-fetch")
+
+        with self.assertNumQueries(1):
+            first = self.client.get(url)
+        self.assertEqual(first.json()["email"], "jane@example.com")
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_missing_manager_profile_is_404(self):
+        self.client.force_authenticate(self.make_user("service_provider"))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("system-manager-fetch"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_user_info_refreshes_cached_profile(self):
+        user = self.make_user("service_provider")
+        ServiceProvider.objects.create(user=user, phone_number="0700000000")
+        self.client.force_authenticate(user)
+        url = reverse("service-provider-fetch")
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse("update-user-info"), {"company_name": "New Ltd"}, format="json")
+
+        self.assertEqual(self.client.get(url).json()["service_profile"]["company_name"], "New Ltd")
+
+    def test_manager_update_refreshes_cached_profile(self):
+        user = self.make_user("admin")
+        manager = SystemManager.objects.create(user=user, phone_number="0700000000")
+        self.client.force_authenticate(user)
+        url = reverse("system-manager-fetch")
+        self.client.get(url)
+
+        serializer = SystemManagerSerializer(manager, data={"phone_number": "0711111111"}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+
+        self.assertEqual(self.client.get(url).json()["phone_number"], "0711111111")
+
+
+class RefreshTokenRevocationTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        User.objects.create_user(
+            username="jane@example.com", email="jane@example.com",
+            password="s3cret-pass", role="service_provider",
+        )
+        self.client = APIClient()
+        self.url = reverse("token_refresh")
+
+    def login(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("token_obtain_pair"),
+                {"email": "jane@example.com", "password": "s3cret-pass"},
+                format="json",
+            ).json()["refresh"]
+
+    def refresh(self, token):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {"refresh": token}, format="json")
+
+    def test_rotation_revokes_the_used_token(self):
+        token = self.login()
+
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.json()["refresh"], token)
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(first.json()["refresh"]).status_code, 200)
+
+    def test_hot_refresh_only_writes_the_rotation_rows(self):
+        token = self.refresh(self.login()).json()["refresh"]  # warms the user cache
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(token)
+
+        self.assertEqual(response.status_code, 200)
+        statements = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all(sql.startswith("INSERT") for sql in statements))
+
+    def test_cold_cache_still_rejects_revoked_tokens(self):
+        token = self.login()
+        self.refresh(token)
+
+        caches["default"].clear()
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_blacklisting_outside_a_refresh_is_mirrored(self):
+        self.login()
+        outstanding = OutstandingToken.objects.get()
+        self.assertEqual(revocation_cache.get(outstanding.jti), outstanding.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            blacklisted = BlacklistedToken.objects.create(token=outstanding)
+        self.assertEqual(revocation_cache.get(outstanding.jti), revocation_cache.REVOKED)
+        self.assertEqual(self.refresh(outstanding.token).status_code, 401)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            blacklisted.delete()
+        self.assertIsNone(revocation_cache.get(outstanding.jti))
+        self.assertEqual(self.refresh(outstanding.token).status_code, 200)
+
+    def test_prune_tokens_deletes_only_expired_rows(self):
+        self.refresh(self.login())
+        OutstandingToken.objects.filter(blacklistedtoken__isnull=False).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        call_command("prune_tokens", "--batch-size", "1", stdout=StringIO())
+
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 0)
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(
+            username="jane@example.com", email="jane@example.com",
+            password="s3cret-pass", first_name="Jane", role="admin",
+        )
+
+    def post(self, view, data, **extra):
+        return view(self.factory.post("/", data, content_type="application/json", **extra))
+
+    def bearer(self):
+        return {"headers": {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}}
+
+    async def test_login_matches_sync_response(self):
+        response = await self.post(
+            async_views.MyTokenObtainPair, {"email": "jane@example.com", "password": "s3cret-pass"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(
+            set(body), {"refresh", "access", "email", "role", "first_name", "last_name"}
+        )
+        self.assertEqual(body["first_name"], "Jane")
+
+    async def test_wrong_password_and_unknown_email_are_401(self):
+        for email, password in (("jane@example.com", "wrong-pass"), ("nobody@example.com", "s3cret-pass")):
+            response = await self.post(async_views.MyTokenObtainPair, {"email": email, "password": password})
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(
+                json.loads(response.content), {"detail": "No active account found with the given credentials"}
+            )
+
+    @override_settings(PASSWORD_HASHERS=[
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    ])
+    async def test_login_upgrades_outdated_hash(self):
+        self.user.password = make_password("s3cret-pass", hasher="pbkdf2_sha256")
+        await self.user.asave()
+
+        await self.post(async_views.MyTokenObtainPair, {"email": "jane@example.com", "password": "s3cret-pass"})
+
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+
+    async def test_saturated_pool_returns_503(self):
+        hashing_pool._ensure_started()
+        with mock.patch.object(hashing_pool, "_slots", threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = await self.post(
+                async_views.MyTokenObtainPair, {"email": "jane@example.com", "password": "s3cret-pass"}
+            )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    async def test_signup_creates_provider_and_rejects_duplicates(self):
+        payload = {
+            "first_name": "Ann", "last_name": "Lee", "email": "ann@example.com",
+            "password": "s3cret-pass", "phone_number": "0700000000",
+        }
+        response = await self.post(async_views.NewServiceProvider, payload)
+        self.assertEqual(response.status_code, 201)
+        provider = await ServiceProvider.objects.select_related("user").aget(user__email="ann@example.com")
+        self.assertTrue(provider.user.check_password("s3cret-pass"))
+
+        response = await self.post(async_views.NewServiceProvider, payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"email": ["A user with this email already exists."]})
+
+    async def test_manager_signup_requires_admin_token(self):
+        payload = {
+            "first_name": "Ann", "last_name": "Lee", "email": "ann@example.com",
+            "password": "s3cret-pass", "phone_number": "0700000000",
+        }
+        response = await self.post(async_views.NewSystemManager, payload)
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.post(async_views.NewSystemManager, payload, **self.bearer())
+        self.assertEqual(response.status_code, 201)
+
+    async def test_password_update(self):
+        request = self.factory.patch(
+            "/",
+            {"previous_password": "wrong-pass", "new_password": "n3w-secret", "confirm_password": "n3w-secret"},
+            content_type="application/json",
+            **self.bearer(),
+        )
+        response = await async_views.UpdateUserPassword(request)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("previous_password", json.loads(response.content))
+
+        request = self.factory.patch(
+            "/",
+            {"previous_password": "s3cret-pass", "new_password": "n3w-secret", "confirm_password": "n3w-secret"},
+            content_type="application/json",
+            **self.bearer(),
+        )
+        response = await async_views.UpdateUserPassword(request)
+        self.assertEqual(response.status_code, 200)
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.check_password("n3w-secret"))
+
+    async def test_password_update_keeps_newer_columns(self):
+        # Authenticating caches the user; a later queryset update leaves
+        # that copy stale.
+        await async_views.FetchUserData(self.factory.get("/", **self.bearer()))
+        await User.objects.filter(pk=self.user.pk).aupdate(first_name="Renamed")
+
+        request = self.factory.patch(
+            "/",
+            {"previous_password": "s3cret-pass", "new_password": "n3w-secret", "confirm_password": "n3w-secret"},
+            content_type="application/json",
+            **self.bearer(),
+        )
+        response = await async_views.UpdateUserPassword(request)
+        self.assertEqual(response.status_code, 200)
+        await self.user.arefresh_from_db()
+        self.assertEqual(self.user.first_name, "Renamed")
+        self.assertTrue(self.user.check_password("n3w-secret"))
+
+    async def test_fetch_user_data_matches_sync_view(self):
+        await ServiceProvider.objects.acreate(user=self.user, phone_number="0700000000")
+        await self.user.arefresh_from_db()  # the new profile touched updated_at
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, self.user)
+        expected = await sync_to_async(lambda: views.FetchUserData(request).render())()
+
+        response = await async_views.FetchUserData(self.factory.get("/", **self.bearer()))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+        response = await async_views.FetchUserData(
+            self.factory.get("/", headers={**self.bearer()["headers"], "If-None-Match": response["ETag"]})
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Authorization", response["Vary"])
+
+        response = await async_views.FetchUserData(self.factory.get("/"))
+        self.assertEqual(response.status_code, 401)
+
+        response = await async_views.FetchUserData(self.factory.head("/", **self.bearer()))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,66 @@
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .cache import revocation_cache
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    ``RefreshToken`` whose blacklist check is answered by
+    ``revocation_cache`` instead of a join over the blacklist tables, and
+    whose rotation writes exactly one row to each table instead of a
+    ``get_or_create`` (plus user lookup) per table.
+    """
+    outstanding_id = None
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        state = revocation_cache.get(jti)
+        if state is None:
+            row = (
+                OutstandingToken.objects.filter(jti=jti)
+                .values_list("pk", "blacklistedtoken")
+                .first()
+            )
+            if row is None:
+                # Not recorded yet; blacklist() falls back to get_or_create.
+                return
+            token_id, blacklisted_id = row
+            state = revocation_cache.REVOKED if blacklisted_id else token_id
+            revocation_cache.set(jti, state, datetime_from_epoch(self.payload["exp"]))
+
+        if state == revocation_cache.REVOKED:
+            raise TokenError(_("Token is blacklisted"))
+        self.outstanding_id = state
+
+    def blacklist(self):
+        if self.outstanding_id is None:
+            return super().blacklist()
+
+        # The related instance is built from the token itself so the
+        # post_save handler can read the jti without another query.
+        token = OutstandingToken(
+            pk=self.outstanding_id,
+            jti=self.payload[api_settings.JTI_CLAIM],
+            expires_at=datetime_from_epoch(self.payload["exp"]),
+        )
+        try:
+            with transaction.atomic():
+                return BlacklistedToken.objects.create(token=token), True
+        except IntegrityError:
+            # Another request rotated the same token first.
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        return OutstandingToken.objects.create(
+            user_id=self.payload.get(api_settings.USER_ID_CLAIM),
+            jti=self.payload[api_settings.JTI_CLAIM],
+            token=str(self),
+            created_at=self.current_time,
+            expires_at=datetime_from_epoch(self.payload["exp"]),
+        ), True
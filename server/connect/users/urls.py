@@ -1,29 +1,46 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import MyTokenObtainPairView
-from . import views
+from . import async_views, views
+
+# Endpoints that hash passwords, and the profile read; ASYNC_VIEWS swaps in
+# the async variants, which hash in a bounded pool off the event loop and
+# read through the async ORM (serve with connect.asgi).
+if settings.ASYNC_VIEWS:
+    new_service_provider = async_views.NewServiceProvider
+    new_system_manager = async_views.NewSystemManager
+    token_obtain_pair = async_views.MyTokenObtainPair
+    update_password = async_views.UpdateUserPassword
+    fetch_user_data = async_views.FetchUserData
+else:
+    new_service_provider = views.NewServiceProvider
+    new_system_manager = views.NewSystemManager
+    token_obtain_pair = MyTokenObtainPairView.as_view()
+    update_password = views.UpdateUserPassword
+    fetch_user_data = views.FetchUserData
 
 urlpatterns = [
     # Service Provider routes
-    path('create-service-provider/', views.NewServiceProvider, name='service-provider-create'),
+    path('create-service-provider/', new_service_provider, name='service-provider-create'),
 
     # Email + password login
-    path('auth/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('auth/token/', token_obtain_pair, name='token_obtain_pair'),
 
     # Refresh access token
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     # Fetch logged-in service provider
-    path('fetch-service-provider/', views.FetchUserData, name='service-provider-fetch'),
+    path('fetch-service-provider/', fetch_user_data, name='service-provider-fetch'),
 
     # Update user info
     path('update-info/', views.UpdateUserInfo, name='update-user-info'),
 
     # Update password
-    path('update-password/', views.UpdateUserPassword, name='update-user-password'),
+    path('update-password/', update_password, name='update-user-password'),
 
     # System Manager routes
-    path('create-system-manager/', views.NewSystemManager, name='system-manager-create'),
+    path('create-system-manager/', new_system_manager, name='system-manager-create'),
 
     # Fetch logged-in system manager (dedicated)
     path('fetch-system-manager/', views.FetchSystemManagerData, name='system-manager-fetch'),
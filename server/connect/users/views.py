@@ -1,9 +1,15 @@
-from rest_framework.decorators import api_view, permission_classes
+from django.utils.cache import patch_vary_headers
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework import status
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from connect.conditional import conditional_view
+from connect.renderers import NDJSONRenderer
+from connect.streaming import STREAM_VARY, requested_stream_format, stream_list
+
 from .serializers import (
     ServiceProviderSerializer,
     SystemManagerSerializer,
@@ -13,7 +19,8 @@ from .serializers import (
     UpdateUserInfoSerializer,
     UpdatePasswordSerializer,
 )
-from .models import SystemManager
+from .cache import user_cache
+from .models import User, SystemManager
 
 
 # =====================================================
@@ -52,14 +59,35 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 
+# =====================================================
+# 🔽 CONDITIONAL GET VALIDATOR
+# =====================================================
+def profile_state(request):
+    # Profile saves touch User.updated_at (see users.signals).
+    return request.user.updated_at, request.user.pk
+
+
+def load_profile_owner(user_id):
+    """
+    The user with both profiles joined in, so serializing either reverse
+    one-to-one (present or missing) costs no further queries.
+    """
+    return User.objects.select_related('service_profile', 'system_profile').get(pk=user_id)
+
+
 # =====================================================
 # 🔽 FETCH LOGGED-IN SERVICE PROVIDER DATA
 # =====================================================
-@api_view(['GET'])
+@api_view(['GET', 'HEAD'])
 @permission_classes([IsAuthenticated])
+@conditional_view(profile_state, vary=('Authorization',))
 def FetchUserData(request):
-    serializer = AuthenticatedUserSerializer(request.user)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    data = user_cache.get_or_set(
+        request.user.pk,
+        'profile',
+        lambda: AuthenticatedUserSerializer(load_profile_owner(request.user.pk)).data,
+    )
+    return Response(data, status=status.HTTP_200_OK)
 
 
 # =====================================================
@@ -67,14 +95,19 @@ def FetchUserData(request):
 # =====================================================
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_view(profile_state, vary=('Authorization',))
 def FetchSystemManagerData(request):
-    try:
-        manager = request.user.system_profile  # OneToOneField
-    except SystemManager.DoesNotExist:
+    def build():
+        try:
+            manager = load_profile_owner(request.user.pk).system_profile  # OneToOneField
+        except SystemManager.DoesNotExist:
+            return None
+        return SystemManagerReadSerializer(manager).data
+
+    data = user_cache.get_or_set(request.user.pk, 'system-profile', build)
+    if data is None:
         return Response({"error": "System manager profile not found."}, status=status.HTTP_404_NOT_FOUND)
-
-    serializer = SystemManagerReadSerializer(manager)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
 
 
 # =====================================================
@@ -107,14 +140,22 @@ def UpdateUserPassword(request):
 # 🔽 SYSTEM MANAGER CRUD VIEWS
 # =====================================================
 @api_view(['GET'])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer])
 @permission_classes([IsAuthenticated])
 def GetAllSystemManagers(request):
     if request.user.role != 'admin':
         return Response({"error": "You do not have permission to view managers."}, status=status.HTTP_403_FORBIDDEN)
 
     managers = SystemManager.objects.select_related('user').all()
+
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        return stream_list(managers, SystemManagerReadSerializer().to_representation, stream_format)
+
     serializer = SystemManagerReadSerializer(managers, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    response = Response(serializer.data, status=status.HTTP_200_OK)
+    patch_vary_headers(response, STREAM_VARY)
+    return response
 
 
 @api_view(['GET'])